@@ -4,7 +4,8 @@ from airflow.operators.python import PythonOperator
 import sys
 
 sys.path.append(".")
-from pipeline.data_pipeline import extract, transform, load
+from pipeline.data_pipeline import extract, transform, load, REPORT_DIR
+from pipeline.run_report import RunReport
 
 # Define default arguments
 default_args = {
@@ -28,22 +29,50 @@ dag = DAG(
 )
 
 # Define tasks
+def publish_report(report, context):
+    """Save a task's run report next to the outputs and push it to XCom"""
+    report.save(REPORT_DIR)
+    context['task_instance'].xcom_push(key='run_report', value=report.to_dict())
+
+def extract_wrapper(**context):
+    """Wrapper function to record the extract run report"""
+    report = RunReport('extract_task', run_id=context['run_id'])
+    result = extract(report)
+    publish_report(report, context)
+    return result
+
 def transform_wrapper(**context):
     """Wrapper function to handle XCom data passing"""
     ti = context['task_instance']
     tiktok_df, youtube_df = ti.xcom_pull(task_ids='extract_task')
-    return transform(tiktok_df, youtube_df)
+    report = RunReport('transform_task', run_id=context['run_id'])
+    result = transform(tiktok_df, youtube_df, report)
+    publish_report(report, context)
+    return result
 
 def load_wrapper(**context):
     """Wrapper function to handle XCom data passing"""
     ti = context['task_instance']
     combined_df = ti.xcom_pull(task_ids='transform_task')
-    load(combined_df)
+    report = RunReport('load_task', run_id=context['run_id'])
+    load(combined_df, report=report)
+    publish_report(report, context)
+
+def retrain_wrapper(**context):
+    """Incrementally refresh the trend success model with the newly loaded videos"""
+    from ml.trend_success import TrendSuccessPredictor
+    predictor = TrendSuccessPredictor()
+    predictor.load_model(for_training=True)
+    metrics = predictor.train_incremental()
+    if metrics['mode'] != 'noop':
+        predictor.save_model()
+    return metrics
 
 # Create tasks
 extract_task = PythonOperator(
     task_id='extract_task',
-    python_callable=extract,
+    python_callable=extract_wrapper,
+    provide_context=True,
     dag=dag,
 )
 
@@ -61,5 +90,12 @@ load_task = PythonOperator(
     dag=dag,
 )
 
+retrain_task = PythonOperator(
+    task_id='retrain_task',
+    python_callable=retrain_wrapper,
+    provide_context=True,
+    dag=dag,
+)
+
 # Set task dependencies
-extract_task >> transform_task >> load_task
\ No newline at end of file
+extract_task >> transform_task >> load_task >> retrain_task
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+API Response Helpers
+
+- FastJSONResponse renders JSON with orjson (numpy scalars and arrays,
+  datetimes and non-string keys included), several times faster than the
+  stdlib encoder on the nested analytics and prediction payloads. Handlers
+  return it directly to also skip FastAPI's jsonable_encoder pass. Without
+  orjson it falls back to the stdlib encoder.
+- add_compression() compresses responses of at least COMPRESS_MIN_BYTES:
+  Brotli when brotli-asgi is installed (gzip for clients without 'br'),
+  otherwise gzip.
+- ndjson_chunks() encodes rows for a streaming NDJSON response.
+- ETag / Last-Modified validators derived from a snapshot version, and
+  not_modified() to answer a client whose copy is current with a 304.
+"""
+
+import hashlib
+import json
+import os
+from decimal import Decimal
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "5"))
+# Clients may keep a copy but must revalidate it (cheap with the validators)
+CACHE_CONTROL = "no-cache"
+NDJSON_CHUNK_ROWS = 500
+
+
+def _default(obj: Any):
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        # numpy scalars and arrays
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        # BigQuery NUMERIC columns
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, with orjson when available."""
+    if orjson is None:
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def ndjson_chunks(rows: Iterable[Any], rows_per_chunk: int = NDJSON_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Newline-delimited JSON of `rows`, joined into chunks of `rows_per_chunk` lines.
+
+    A streaming response advances a sync iterator with one thread hop per
+    chunk, so per-row chunks would cost more than encoding the rows.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= rows_per_chunk:
+            chunk.append(b"")
+            yield b"\n".join(chunk)
+            chunk = []
+    if chunk:
+        chunk.append(b"")
+        yield b"\n".join(chunk)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def add_compression(app, minimum_size: int = COMPRESS_MIN_BYTES, level: int = COMPRESS_LEVEL) -> str:
+    """
+    Install response compression on an app.
+
+    Returns:
+        str: 'br' or 'gzip', whichever is used
+    """
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        from starlette.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=minimum_size, compresslevel=level)
+        return "gzip"
+    app.add_middleware(BrotliMiddleware, minimum_size=minimum_size, quality=level, gzip_fallback=True)
+    return "br"
+
+
+def etag_for(*parts) -> str:
+    """Weak ETag from the parts identifying a representation (snapshot version, query, ...)."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def validators(etag: str, last_modified: Optional[float] = None) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Whether the client's cached copy is current.
+
+    If-None-Match wins when present (weak comparison); otherwise
+    If-Modified-Since is compared with `last_modified`.
+
+    Args:
+        request (Request): Incoming request
+        etag (str): Current ETag
+        last_modified (float): Current modification time (epoch seconds)
+
+    Returns:
+        bool: True when a 304 should be sent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[float] = None) -> Response:
+    return Response(status_code=304, headers=validators(etag, last_modified))
@@ -0,0 +1,155 @@
+"""
+Local Warehouse Stand-In
+
+A minimal in-memory replacement for google.cloud.bigquery.Client, enough for
+google_bigquery.main (query/result/schema/values) to run offline. Install it
+with google_bigquery.main.set_client(FakeBigQueryClient(...)).
+"""
+
+import datetime
+import re
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+
+class FakeField:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeRow:
+    def __init__(self, values: tuple, index: Dict[str, int]):
+        self._values = values
+        self._index = index
+
+    def values(self):
+        return self._values
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+
+    def keys(self):
+        return self._index.keys()
+
+    def items(self):
+        return zip(self._index.keys(), self._values)
+
+
+class FakeRowIterator:
+    def __init__(self, columns: List[str], rows: List[tuple], page_size: int = 1000):
+        self.schema = [FakeField(name) for name in columns]
+        self._index = {name: i for i, name in enumerate(columns)}
+        self._rows = rows
+        self.total_rows = len(rows)
+        self.page_size = page_size
+
+    def __iter__(self):
+        for values in self._rows:
+            yield FakeRow(values, self._index)
+
+    @property
+    def pages(self):
+        for start in range(0, len(self._rows), self.page_size):
+            yield (FakeRow(values, self._index) for values in self._rows[start:start + self.page_size])
+
+
+class FakeQueryJob:
+    def __init__(self, result: FakeRowIterator, latency: float = 0.0, total_bytes_processed: int = 0):
+        self._result = result
+        self._latency = latency
+        self.total_bytes_processed = total_bytes_processed
+
+    def result(self, timeout: Optional[float] = None, **kwargs):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._result
+
+
+class FakeTable:
+    def __init__(self, table_id: str, modified: datetime.datetime):
+        self.table_id = table_id
+        self.modified = modified
+
+
+class FakeBigQueryClient:
+    """
+    In-memory BigQuery stand-in.
+
+    Args:
+        handler (Callable): Maps SQL text to (columns, rows); defaults to a single
+            json_data row like analyzed_data.trend_analytics
+        latency (float | Callable): Seconds each query's result() sleeps, to emulate
+            warehouse latency, or a function of the SQL text returning them
+        project (str): Reported project id
+    """
+
+    def __init__(self, handler: Optional[Callable] = None, latency: Union[float, Callable] = 0.0, project: str = "local"):
+        self.handler = handler or default_handler
+        self.latency = latency
+        self.project = project
+        self.queries = []
+        # Reported as every table's last modification; bump it to emulate an ETL load
+        self.modified = datetime.datetime(2025, 9, 13, tzinfo=datetime.timezone.utc)
+
+    def get_table(self, table_id: str) -> FakeTable:
+        return FakeTable(table_id, self.modified)
+
+    def query(self, sql: str, job_config=None, **kwargs) -> FakeQueryJob:
+        self.queries.append(sql)
+        columns, rows = self.handler(sql)
+        bytes_processed = 1024 * max(len(rows), 1)
+        if job_config is not None and getattr(job_config, 'dry_run', False):
+            return FakeQueryJob(FakeRowIterator(columns, []), 0.0, bytes_processed)
+        latency = self.latency(sql) if callable(self.latency) else self.latency
+        return FakeQueryJob(FakeRowIterator(columns, rows), latency, bytes_processed)
+
+
+SUMMARY = {
+    "trending_hashtags": [{"name": "#glassskin", "count": 120}, {"name": "#vanillagirl", "count": 95}],
+    "trending_keywords": [{"name": "glass skin", "count": 88}],
+    "trending_audios": [{"name": "Oh No", "count": 72}],
+    "generated_at": datetime.datetime(2025, 9, 13).isoformat()
+}
+
+# Rows for the dashboard queries (google_bigquery/analytics.py), by the section
+# named in their leading '-- dashboard:<section>' comment
+DASHBOARD_ROWS = {
+    "trending_hashtags": (['name', 'count'], [(e["name"], e["count"]) for e in SUMMARY["trending_hashtags"]]),
+    "trending_keywords": (['name', 'count'], [(e["name"], e["count"]) for e in SUMMARY["trending_keywords"]]),
+    "sentiment": (['source', 'videos', 'avg_transcription', 'avg_tags', 'positive', 'negative'],
+                  [("tiktok", 640, 0.21, 0.34, 310, 72), ("youtube", 410, 0.12, 0.18, 160, 55)]),
+    "demographics": (['name', 'videos', 'views', 'likes'],
+                     [("gen z", 520, 3_100_000, 410_000), ("millennials", 330, 1_900_000, 150_000)]),
+}
+
+
+def default_handler(sql: str):
+    match = re.match(r"\s*-- dashboard:(\w+)", sql)
+    if match and match.group(1) in DASHBOARD_ROWS:
+        return DASHBOARD_ROWS[match.group(1)]
+    return ['json_data'], [(SUMMARY,)]
+
+
+def rows_handler(n: int, seed: int = 0) -> Callable:
+    """
+    Handler returning `n` analyzed-video rows for any query.
+
+    Args:
+        n (int): Number of rows
+        seed (int): Random seed
+
+    Returns:
+        Callable: SQL -> (columns, rows)
+    """
+    from benchmarks.synthetic import analyzed_videos
+
+    df = analyzed_videos(n, seed)
+    df['tags'] = df['tags'].astype(str)
+    columns = list(df.columns)
+    rows = list(df.itertuples(index=False, name=None))
+    return lambda sql: (columns, rows)
@@ -0,0 +1,83 @@
+"""
+API Import-Time Budget Check
+
+Imports the API module (`main`) in fresh interpreters and fails if the
+import takes longer than the budget or pulls in any of the heavy
+dependencies that are meant to load lazily (scikit-learn, librosa,
+transformers, torch, whisper, google.cloud.bigquery).
+
+Usage (from the backend directory):
+    python benchmarks/import_budget.py --budget 2.0 --runs 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    'sklearn',
+    'librosa',
+    'transformers',
+    'torch',
+    'whisper',
+    'google.cloud.bigquery',
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import(module: str = "main") -> dict:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module (str): Module to import (relative to the backend directory)
+
+    Returns:
+        dict: Import seconds and the heavy modules it loaded
+    """
+    env = dict(os.environ, WARMUP_ON_STARTUP="0")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the API import-time budget")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--budget", type=float, default=2.0, help="Max import seconds (best of runs)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to try")
+    args = parser.parse_args(argv)
+
+    results = [measure_import(args.module) for _ in range(args.runs)]
+    best = min(result["seconds"] for result in results)
+    heavy = sorted({name for result in results for name in result["heavy"]})
+
+    print(f"import {args.module}: best {best:.3f}s over {args.runs} runs (budget {args.budget:.3f}s)")
+    failed = False
+    if best > args.budget:
+        print(f"✗ Import time over budget by {best - args.budget:.3f}s")
+        failed = True
+    if heavy:
+        print(f"✗ Heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("✓ Import budget met")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
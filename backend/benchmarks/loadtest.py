@@ -0,0 +1,256 @@
+"""
+API Load Test
+
+Drives the FastAPI app with a configurable request mix at a fixed
+concurrency and reports p50/p95/p99 latency, throughput and error rate per
+endpoint.
+
+By default the `main.app` ASGI application is driven in-process through
+httpx's ASGI transport, with BigQuery replaced by the in-memory stand-in
+from benchmarks/fakes.py, so it runs on one box with no network. Pass --url
+to drive a locally started server instead (e.g. to compare uvicorn worker
+counts or loop implementations).
+
+Usage (from the backend directory):
+    python -m benchmarks.loadtest --concurrency 32 --requests 2000 --mix predict=8,analytics=2
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --duration 30
+    python -m benchmarks.loadtest --max-p95-ms 250   # exit 1 on a latency regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+sys.path.append(".")
+
+from benchmarks import synthetic
+
+PLATFORMS = ["TikTok", "YouTube Shorts", "Instagram Reels"]
+AUDIENCES = [["Gen-Z"], ["Millennials"], ["All Ages"], ["Gen-Z", "Millennials"]]
+
+
+def predict_payloads(unique_keywords: int, seed: int = 0) -> Callable[[int], Dict]:
+    """
+    Payload generator for /recipe/predict.
+
+    Args:
+        unique_keywords (int): Distinct keywords to draw from (controls the cache hit rate)
+        seed (int): Random seed
+
+    Returns:
+        Callable[[int], Dict]: Request index -> JSON body
+    """
+    rng = np.random.default_rng(seed)
+    keywords = synthetic.tiktok_raw(unique_keywords, seed)['video_desc'].tolist()
+    platforms = rng.integers(0, len(PLATFORMS), unique_keywords)
+    audiences = rng.integers(0, len(AUDIENCES), unique_keywords)
+
+    def payload(i: int) -> Dict:
+        j = int(rng.integers(0, unique_keywords))
+        return {
+            "keyword": keywords[j],
+            "audio_path": f"pipeline/audios/{j % 50}.m4a",
+            "platform": PLATFORMS[platforms[j]],
+            "target_audience": AUDIENCES[audiences[j]]
+        }
+    return payload
+
+
+def build_mix(spec: str, unique_keywords: int) -> List[Dict]:
+    """
+    Parse a request mix like 'predict=8,analytics=2'.
+
+    Args:
+        spec (str): Comma-separated name=weight pairs
+        unique_keywords (int): Passed to the predict payload generator
+
+    Returns:
+        List[Dict]: Request kinds with method, path, payload generator and weight
+    """
+    kinds = {
+        "predict": {"method": "POST", "path": "/recipe/predict", "payload": predict_payloads(unique_keywords)},
+        "analytics": {"method": "GET", "path": "/trend/analytics", "payload": None},
+        "root": {"method": "GET", "path": "/", "payload": None},
+    }
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in kinds:
+            raise ValueError(f"Unknown request kind '{name}', expected one of {list(kinds)}")
+        mix.append(dict(kinds[name], name=name, weight=float(weight or 1)))
+    return mix
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """
+    Latency percentiles, throughput and error rate of one group of requests.
+
+    Args:
+        latencies (List[float]): Per-request seconds
+        errors (int): Failed requests (exceptions or status >= 400)
+        elapsed (float): Wall-clock seconds of the whole run
+
+    Returns:
+        Dict: count, rps, error_rate and p50/p95/p99/max latency in ms
+    """
+    count = len(latencies)
+    if not count:
+        return {"count": 0}
+    ms = np.asarray(latencies) * 1000
+    return {
+        "count": count,
+        "rps": count / elapsed,
+        "error_rate": errors / count,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max())
+    }
+
+
+async def run_load(client: httpx.AsyncClient, mix: List[Dict], concurrency: int,
+                   total_requests: Optional[int], duration: Optional[float], seed: int = 0) -> Dict:
+    """
+    Issue requests from `concurrency` workers until the request or time budget is spent.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app or server
+        mix (List[Dict]): Request kinds from build_mix()
+        concurrency (int): Concurrent in-flight requests
+        total_requests (int): Stop after this many requests (if set)
+        duration (float): Stop after this many seconds (if set)
+        seed (int): Random seed for the request mix
+
+    Returns:
+        Dict: Overall and per-kind summaries
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([kind["weight"] for kind in mix])
+    weights = weights / weights.sum()
+    samples = {kind["name"]: [] for kind in mix}
+    failures = {kind["name"]: 0 for kind in mix}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal issued
+        while True:
+            if total_requests is not None and issued >= total_requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            index = issued
+            issued += 1
+            kind = mix[int(rng.choice(len(mix), p=weights))]
+            body = kind["payload"](index) if kind["payload"] else None
+            start = time.perf_counter()
+            try:
+                response = await client.request(kind["method"], kind["path"], json=body)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            samples[kind["name"]].append(time.perf_counter() - start)
+            failures[kind["name"]] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for latencies in samples.values() for latency in latencies]
+    return {
+        "elapsed_s": elapsed,
+        "overall": summarize(all_latencies, sum(failures.values()), elapsed),
+        "endpoints": {name: summarize(samples[name], failures[name], elapsed) for name in samples}
+    }
+
+
+def in_process_client(args) -> httpx.AsyncClient:
+    """
+    Client driving main.app in-process with the local warehouse stand-in.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        httpx.AsyncClient: Client over the ASGI transport
+    """
+    os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+    from benchmarks.fakes import FakeBigQueryClient
+    from google_bigquery import main as bigqueryClient
+    import main
+
+    bigqueryClient.set_client(FakeBigQueryClient(latency=args.warehouse_latency))
+    if not args.cold:
+        main.warm_up()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest",
+                             timeout=args.timeout)
+
+
+def print_report(report: Dict):
+    print(f"{'endpoint':<12} {'count':>7} {'req/s':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [("overall", report["overall"])] + list(report["endpoints"].items())
+    for name, stats in rows:
+        if not stats.get("count"):
+            continue
+        print(f"{name:<12} {stats['count']:>7} {stats['rps']:>9.1f} {stats['error_rate']:>7.2%} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the backend API")
+    parser.add_argument("--url", help="Drive a running server instead of main.app in-process")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight requests")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--mix", default="predict=8,analytics=2", help="Request mix, e.g. predict=8,analytics=2")
+    parser.add_argument("--unique-keywords", type=int, default=200, help="Distinct predict payloads")
+    parser.add_argument("--warehouse-latency", type=float, default=0.05,
+                        help="Seconds the in-process warehouse stand-in takes per query")
+    parser.add_argument("--cold", action="store_true", help="Skip the warm-up before the run")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if the overall p95 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Fail if the error rate exceeds this")
+    parser.add_argument("--output", help="Write the report JSON to this path")
+    args = parser.parse_args(argv)
+
+    mix = build_mix(args.mix, args.unique_keywords)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        client = in_process_client(args)
+
+    async def run():
+        async with client:
+            return await run_load(client, mix, args.concurrency,
+                                  None if args.duration else args.requests, args.duration, args.seed)
+
+    report = asyncio.run(run())
+    report["config"] = vars(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report saved to {args.output}")
+
+    overall = report["overall"]
+    failed = False
+    if overall.get("error_rate", 0) > args.max_error_rate:
+        print(f"✗ Error rate {overall['error_rate']:.2%} above {args.max_error_rate:.2%}")
+        failed = True
+    if args.max_p95_ms is not None and overall.get("p95_ms", 0) > args.max_p95_ms:
+        print(f"✗ p95 latency {overall['p95_ms']:.1f} ms above {args.max_p95_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
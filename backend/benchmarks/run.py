@@ -0,0 +1,298 @@
+"""
+ML and Pipeline Hot-Path Benchmarks
+
+Runs each hot path on synthetic data at several scales and reports
+throughput and peak traced memory, optionally comparing against a stored
+baseline to flag regressions.
+
+Everything runs offline: transformer sentiment is skipped unless a local
+model directory is given with --transformer-model, and BigQuery is replaced
+by the in-memory stand-in from benchmarks/fakes.py.
+
+Usage (from the backend directory):
+    python -m benchmarks.run                              # 1k, 100k, 1M rows (capped per benchmark)
+    python -m benchmarks.run --scales 1000 --only prepare_features
+    python -m benchmarks.run --save-baseline              # write benchmarks/baseline.json
+    python -m benchmarks.run --compare                    # exit 1 on regressions
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+sys.path.append(".")
+
+from benchmarks import synthetic
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SCALES = [1_000, 100_000, 1_000_000]
+
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark setup when a dependency or fixture is unavailable."""
+
+
+def benchmark(name: str, max_scale: int = None, unit: str = "rows"):
+    """
+    Register a benchmark.
+
+    The decorated function takes (scale, args), does all setup (data
+    generation, imports) and returns a callable that runs the measured work
+    once and returns the number of items processed.
+
+    Args:
+        name (str): Benchmark name
+        max_scale (int): Largest scale run unless --full is given
+        unit (str): What the scale counts ('rows' or 'clips')
+    """
+    def register(setup: Callable):
+        BENCHMARKS[name] = {'setup': setup, 'max_scale': max_scale, 'unit': unit}
+        return setup
+    return register
+
+
+def _predictor(args):
+    from ml.trend_success import TrendSuccessPredictor
+    predictor = TrendSuccessPredictor()
+    predictor.sentiment_analyzer = _local_transformer(args)
+    return predictor
+
+
+def _local_transformer(args):
+    if not args.transformer_model:
+        return None
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=args.transformer_model)
+
+
+@benchmark("calculate_success_score")
+def bench_success_score(scale, args):
+    predictor = _predictor(args)
+    df = synthetic.analyzed_videos(scale)
+    return lambda: len(df.apply(predictor.calculate_success_score, axis=1))
+
+
+@benchmark("prepare_features", max_scale=100_000)
+def bench_prepare_features(scale, args):
+    predictor = _predictor(args)
+    df = synthetic.analyzed_videos(scale)
+    return lambda: len(predictor.prepare_features(df)[0])
+
+
+@benchmark("sentiment_vader", max_scale=1_000)
+def bench_sentiment_vader(scale, args):
+    try:
+        from ml.sentiment_analysis import process_video_sentiment
+    except ImportError as e:
+        raise SkipBenchmark(str(e))
+    df = synthetic.analyzed_videos(scale)
+    return lambda: len(process_video_sentiment(df))
+
+
+@benchmark("sentiment_transformer", max_scale=1_000)
+def bench_sentiment_transformer(scale, args):
+    if not args.transformer_model:
+        raise SkipBenchmark("no --transformer-model fixture given")
+    from ml.enrichment import SentimentEnricher, enrich
+    df = synthetic.analyzed_videos(scale)
+    enrichers = [SentimentEnricher('transformer', model=args.transformer_model)]
+    return lambda: len(enrich(df, enrichers))
+
+
+@benchmark("analyze_demographics", max_scale=1_000)
+def bench_demographics(scale, args):
+    from ml.demographics_analysis import analyze_demographics
+    df = synthetic.analyzed_videos(scale)
+    return lambda: len(df.apply(analyze_demographics, axis=1))
+
+
+@benchmark("enrichment", max_scale=1_000)
+def bench_enrichment(scale, args):
+    from ml.enrichment import enrich, default_enrichers
+    df = synthetic.analyzed_videos(scale)
+    return lambda: len(enrich(df, default_enrichers()))
+
+
+@benchmark("transform_normalize")
+def bench_transform_normalize(scale, args):
+    from pipeline.normalize import normalize_sources
+    tiktok_df = synthetic.tiktok_raw(scale // 2)
+    youtube_df = synthetic.youtube_raw(scale - scale // 2)
+    return lambda: len(normalize_sources(tiktok_df, youtube_df))
+
+
+@benchmark("query_to_JSON", max_scale=100_000)
+def bench_query_to_json(scale, args):
+    from benchmarks.fakes import FakeBigQueryClient, rows_handler
+    from google_bigquery import main as bigqueryClient
+    bigqueryClient.set_client(FakeBigQueryClient(rows_handler(scale)))
+    return lambda: len(bigqueryClient.query_to_JSON("SELECT * FROM analyzed_data.trends"))
+
+
+@benchmark("extract_audio_features", unit="clips")
+def bench_audio_features(scale, args):
+    try:
+        import librosa  # noqa: F401
+    except ImportError:
+        raise SkipBenchmark("librosa not installed")
+    from ml.audio_store import AudioStore, set_shared_store
+    predictor = _predictor(args)
+    clip_dir = tempfile.mkdtemp(prefix="bench_audio_")
+    set_shared_store(AudioStore(os.path.join(clip_dir, "decoded")))
+    clips = [synthetic.write_audio_clip(os.path.join(clip_dir, f"clip_{i}.wav"), args.clip_seconds, seed=i)
+             for i in range(scale)]
+    return lambda: len([predictor.extract_audio_features(clip) for clip in clips])
+
+
+def run_benchmark(name: str, scale: int, args) -> Dict:
+    """
+    Time one benchmark at one scale and measure its peak traced memory.
+
+    Args:
+        name (str): Registered benchmark name
+        scale (int): Rows (or clips) to generate
+        args: Parsed command-line arguments
+
+    Returns:
+        Dict: items, best seconds, throughput and peak memory (or the skip reason)
+    """
+    try:
+        work = BENCHMARKS[name]['setup'](scale, args)
+    except SkipBenchmark as e:
+        return {'skipped': str(e)}
+
+    timings = []
+    items = 0
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        items = work()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    result = {
+        'items': items,
+        'seconds': best,
+        'throughput': items / best if best > 0 else float('inf')
+    }
+    if not args.no_memory:
+        tracemalloc.start()
+        work()
+        result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Find regressions against a baseline.
+
+    Args:
+        results (Dict): Current results keyed by 'name@scale'
+        baseline (Dict): Baseline results in the same shape
+        tolerance (float): Allowed relative slowdown / memory growth
+
+    Returns:
+        List[str]: One message per regression
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference or 'skipped' in current or 'skipped' in reference:
+            continue
+        if current['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {current['throughput']:,.0f}/s "
+                               f"vs baseline {reference['throughput']:,.0f}/s")
+        if 'peak_mb' in current and 'peak_mb' in reference and current['peak_mb'] > reference['peak_mb'] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {current['peak_mb']:.1f} MB "
+                               f"vs baseline {reference['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ML and pipeline hot paths")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma-separated row counts")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names to run")
+    parser.add_argument("--full", action="store_true", help="Ignore per-benchmark scale caps")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per benchmark (best is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced-memory run")
+    parser.add_argument("--audio-clips", type=int, default=5, help="Synthetic clips for audio benchmarks")
+    parser.add_argument("--clip-seconds", type=float, default=30.0, help="Length of each synthetic clip")
+    parser.add_argument("--transformer-model", default=os.getenv("BENCH_TRANSFORMER_MODEL"),
+                        help="Local sentiment model directory (transformer benchmarks are skipped without it)")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    names = [n for n in args.only.split(",") if n] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {unknown}. Available: {list(BENCHMARKS)}")
+
+    results = {}
+    print(f"{'benchmark':<26} {'scale':>9} {'seconds':>9} {'items/s':>13} {'peak MB':>9}")
+    for name in names:
+        spec = BENCHMARKS[name]
+        if spec['unit'] == 'clips':
+            bench_scales = [args.audio_clips]
+        else:
+            bench_scales = [s for s in scales if args.full or spec['max_scale'] is None or s <= spec['max_scale']]
+        for scale in bench_scales:
+            key = f"{name}@{scale}"
+            result = results[key] = run_benchmark(name, scale, args)
+            if 'skipped' in result:
+                print(f"{name:<26} {scale:>9} skipped: {result['skipped']}")
+                continue
+            peak = f"{result['peak_mb']:>9.1f}" if 'peak_mb' in result else f"{'-':>9}"
+            print(f"{name:<26} {scale:>9} {result['seconds']:>9.3f} {result['throughput']:>13,.0f} {peak}")
+
+    report = {
+        'created_at': datetime.datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results saved to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"Error: baseline {args.baseline} not found (create it with --save-baseline)")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ Regression: {message}")
+        if regressions:
+            return 1
+        print("✓ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
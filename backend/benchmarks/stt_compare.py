@@ -0,0 +1,226 @@
+"""
+Speech-to-Text Backend Comparison
+
+Transcribes a directory of local fixture audio with each configured
+speech-to-text backend and reports model load time, throughput (audio
+seconds transcribed per wall second, i.e. the inverse real-time factor,
+overall and per core) and word error rate.
+
+WER is measured against a `<name>.txt` reference transcript next to each
+clip when one exists; otherwise against the first backend's output, which
+then reads as agreement with that baseline rather than accuracy. Clips are
+decoded once through the audio store, so decoding is not part of the timing.
+
+Usage (from the backend directory):
+    python -m benchmarks.stt_compare --fixtures path/to/clips
+    python -m benchmarks.stt_compare --fixtures path/to/clips \\
+        --backends whisper:base,faster-whisper:base:int8,faster-whisper:small:int8 --output stt.json
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(".")
+
+from ml.audio_store import AudioStore
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm", ".opus")
+DEFAULT_BACKENDS = "whisper:base,faster-whisper:base:int8"
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lower-cased words with punctuation stripped, for WER."""
+    cleaned = "".join(ch if ch.isalnum() or ch.isspace() or ch == "'" else " " for ch in text.lower())
+    return cleaned.split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word-level Levenshtein distance divided by the reference length.
+
+    Args:
+        reference (str): Reference transcript
+        hypothesis (str): Transcript to score
+
+    Returns:
+        float: WER (0.0 is a perfect match; can exceed 1.0)
+    """
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def parse_backend_spec(spec: str) -> Tuple[str, Dict]:
+    """
+    'name[:model_size[:compute_type]]' -> (name, create_backend kwargs).
+
+    Raises:
+        ValueError: for a compute_type given to a backend that has no such
+            option (e.g. 'whisper:base:int8')
+    """
+    from pipeline.stt import BACKENDS
+
+    name, *rest = spec.split(":")
+    kwargs = {}
+    if rest:
+        kwargs["model_size"] = rest[0]
+    if len(rest) > 1:
+        if name in BACKENDS and "compute_type" not in inspect.signature(BACKENDS[name]).parameters:
+            raise ValueError(f"backend '{name}' takes no compute_type (got '{rest[1]}')")
+        kwargs["compute_type"] = rest[1]
+    return name, kwargs
+
+
+def load_fixtures(fixture_dir: str, store: AudioStore) -> List[Dict]:
+    """
+    Decode every audio file in a directory (once, via the audio store).
+
+    Returns:
+        List[Dict]: name, samples, seconds and optional reference text per clip
+    """
+    clips = []
+    for filename in sorted(os.listdir(fixture_dir)):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() not in AUDIO_EXTENSIONS:
+            continue
+        path = os.path.join(fixture_dir, filename)
+        samples = store.samples(path)
+        reference_path = os.path.join(fixture_dir, f"{stem}.txt")
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path) as f:
+                reference = f.read()
+        clips.append({"name": filename, "samples": samples,
+                      "seconds": len(samples) / store.sample_rate, "reference": reference})
+    return clips
+
+
+def run_backend(spec: str, clips: List[Dict], batch: bool, repeat: int) -> Dict:
+    """
+    Load one backend and transcribe all clips with it.
+
+    Args:
+        spec (str): Backend spec (see parse_backend_spec)
+        clips (List[Dict]): Fixtures from load_fixtures()
+        batch (bool): Use transcribe_batch() instead of one call per clip
+        repeat (int): Passes over the clips; the fastest is reported
+
+    Returns:
+        Dict: load time, best pass time, throughput and per-clip texts; or
+        'skipped' (engine not installed) / 'failed' (bad spec, load or
+        transcription error), so one backend cannot abort the comparison
+    """
+    from pipeline.stt import create_backend
+
+    try:
+        name, kwargs = parse_backend_spec(spec)
+        start = time.perf_counter()
+        backend = create_backend(name, **kwargs).load()
+        load_seconds = time.perf_counter() - start
+    except ImportError as e:
+        return {"backend": spec, "skipped": f"not installed ({e.name or e})"}
+    except Exception as e:
+        return {"backend": spec, "failed": f"{type(e).__name__}: {e}"}
+
+    audio_seconds = sum(clip["seconds"] for clip in clips)
+    timings, texts = [], []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        try:
+            if batch:
+                texts = backend.transcribe_batch([clip["samples"] for clip in clips])
+            else:
+                texts = [backend.transcribe(clip["samples"]) for clip in clips]
+        except Exception as e:
+            return {"backend": spec, "failed": f"{type(e).__name__}: {e}"}
+        timings.append(time.perf_counter() - start)
+
+    seconds = min(timings)
+    speed = audio_seconds / seconds if seconds > 0 else float("inf")
+    return {
+        **backend.describe(),
+        "backend": spec,
+        "load_seconds": round(load_seconds, 3),
+        "seconds": round(seconds, 3),
+        "audio_seconds": round(audio_seconds, 1),
+        "x_realtime": round(speed, 2),
+        "x_realtime_per_core": round(speed / (os.cpu_count() or 1), 3),
+        "texts": texts
+    }
+
+
+def score(results: List[Dict], clips: List[Dict]):
+    """Add WER per result: against references where present, else against the first backend."""
+    baseline = next((result for result in results if "texts" in result), None)
+    for result in results:
+        if "texts" not in result:
+            continue
+        errors, against = [], set()
+        for clip, text, base_text in zip(clips, result["texts"], baseline["texts"]):
+            if clip["reference"] is not None:
+                errors.append(word_error_rate(clip["reference"], text))
+                against.add("reference")
+            elif result is not baseline:
+                errors.append(word_error_rate(base_text, text))
+                against.add(baseline["backend"])
+        result["wer"] = round(sum(errors) / len(errors), 4) if errors else None
+        result["wer_against"] = ", ".join(sorted(against)) or None
+
+
+def print_report(results: List[Dict]):
+    print(f"{'backend':<32} {'load s':>8} {'run s':>8} {'x realtime':>11} {'per core':>9} {'WER':>7}  against")
+    for result in results:
+        if "skipped" in result or "failed" in result:
+            status = "skipped" if "skipped" in result else "failed"
+            print(f"{result['backend']:<32} {status}: {result[status]}")
+            continue
+        wer = f"{result['wer']:.3f}" if result.get("wer") is not None else "-"
+        print(f"{result['backend']:<32} {result['load_seconds']:>8.2f} {result['seconds']:>8.2f} "
+              f"{result['x_realtime']:>11.2f} {result['x_realtime_per_core']:>9.3f} {wer:>7}  "
+              f"{result.get('wer_against') or '-'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare speech-to-text backends on local audio")
+    parser.add_argument("--fixtures", required=True, help="Directory of audio clips (+ optional <name>.txt references)")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS,
+                        help="Comma-separated name[:model_size[:compute_type]] specs; the first is the WER baseline")
+    parser.add_argument("--batch", action="store_true", help="Transcribe through transcribe_batch()")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes per backend (fastest reported)")
+    parser.add_argument("--output", help="Write the results JSON to this path")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.fixtures):
+        parser.error(f"Fixture directory not found: {args.fixtures}")
+    store = AudioStore(tempfile.mkdtemp(prefix="stt_compare_"))
+    clips = load_fixtures(args.fixtures, store)
+    if not clips:
+        parser.error(f"No audio files in {args.fixtures}")
+    print(f"📊 {len(clips)} clips, {sum(clip['seconds'] for clip in clips):.1f} s of audio, "
+          f"{sum(clip['reference'] is not None for clip in clips)} with references")
+
+    results = [run_backend(spec, clips, args.batch, args.repeat) for spec in args.backends.split(",") if spec]
+    score(results, clips)
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"clips": [clip["name"] for clip in clips], "results": results}, f, indent=2)
+        print(f"✓ Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
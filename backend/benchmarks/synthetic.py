@@ -0,0 +1,192 @@
+"""
+Synthetic Data Generators
+
+Deterministic generators for benchmark inputs that follow the schemas used
+by the pipeline:
+
+- tiktok_raw() / youtube_raw(): the raw TikTok liked-videos and YouTube
+  USvideos CSV schemas read by extract() and normalized by transform()
+- analyzed_videos(): the unified, enriched schema of
+  ml/data/analyzed_videos_with_demographics.csv
+- write_audio_clip(): synthetic WAV clips (beat + tone + noise)
+
+Everything is generated locally with numpy; nothing is downloaded.
+"""
+
+import datetime
+import os
+import wave
+
+import numpy as np
+import pandas as pd
+
+WORDS = [
+    'glass', 'skin', 'routine', 'morning', 'vibe', 'aesthetic', 'challenge', 'dance', 'tutorial',
+    'guide', 'makeup', 'vanilla', 'girl', 'korean', 'beauty', 'secrets', 'dewy', 'natural', 'life',
+    'hack', 'recipe', 'quick', 'easy', 'love', 'this', 'omg', 'lol', 'slay', 'finance', 'business',
+    'the', 'best', 'worst', 'ever', 'my', 'your', 'new', 'trend', 'viral', 'sunset', 'blush'
+]
+HASHTAGS = [
+    '#fyp', '#viral', '#glassskin', '#kbeauty', '#skincare', '#makeup', '#vanillagirl', '#grwm',
+    '#dance', '#challenge', '#lifehack', '#recipe', '#morningroutine', '#productivity', '#sunsetblush',
+    '#tutorial', '#beauty', '#trending', '#foryou', '#aesthetic'
+]
+CREATORS = [f"creator_{i}" for i in range(500)]
+SOURCES = ['tiktok', 'youtube']
+DEMOGRAPHICS = ['gen z', 'millenials', 'all age', 'unknown']
+
+
+def _sentences(rng: np.random.Generator, n: int, min_words: int, max_words: int,
+               tag_rate: float = 0.0, pool_size: int = 20000) -> np.ndarray:
+    """Sample `n` texts from a pool of generated sentences (keeps 1M-row inputs cheap)."""
+    pool_size = min(pool_size, n)
+    lengths = rng.integers(min_words, max_words + 1, pool_size)
+    words = rng.choice(WORDS, lengths.sum())
+    tags = rng.choice(HASHTAGS, lengths.sum())
+    use_tag = rng.random(lengths.sum()) < tag_rate
+    tokens = np.where(use_tag, tags, words)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    pool = np.array([' '.join(tokens[offsets[i]:offsets[i + 1]]) for i in range(pool_size)], dtype=object)
+    return pool[rng.integers(0, pool_size, n)]
+
+
+def tiktok_raw(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Rows in the tiktok_collected_liked_videos.csv schema.
+
+    Args:
+        n (int): Number of rows
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Raw TikTok data
+    """
+    rng = np.random.default_rng(seed)
+    video_ids = rng.integers(6_900_000_000_000_000_000, 7_000_000_000_000_000_000, n, dtype=np.int64)
+    users = rng.choice(CREATORS, n)
+    plays = rng.integers(1_000, 50_000_000, n)
+    return pd.DataFrame({
+        'user_name': users,
+        'user_id': rng.integers(6_000_000_000_000_000_000, 7_000_000_000_000_000_000, n, dtype=np.int64),
+        'video_id': video_ids,
+        'video_desc': _sentences(rng, n, 3, 15, tag_rate=0.3),
+        'video_time': rng.integers(1_600_000_000, 1_700_000_000, n),
+        'video_length': rng.integers(5, 180, n),
+        'video_link': [f"https://www.tiktok.com/@{u}/video/{v}?lang=en" for u, v in zip(users, video_ids)],
+        'n_likes': (plays * rng.uniform(0.01, 0.3, n)).astype(np.int64),
+        'n_shares': (plays * rng.uniform(0.0, 0.01, n)).astype(np.int64),
+        'n_comments': (plays * rng.uniform(0.0, 0.01, n)).astype(np.int64),
+        'n_plays': plays
+    })
+
+
+def youtube_raw(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Rows in the USvideos.csv schema (columns used by transform() plus the usual extras).
+
+    Args:
+        n (int): Number of rows
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Raw YouTube data
+    """
+    rng = np.random.default_rng(seed + 1)
+    alphabet = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'))
+    ids = [''.join(chars) for chars in rng.choice(alphabet, (n, 11))]
+    views = rng.integers(1_000, 20_000_000, n)
+    tag_counts = rng.integers(0, 8, n)
+    tag_words = rng.choice(WORDS, tag_counts.sum())
+    offsets = np.concatenate([[0], np.cumsum(tag_counts)])
+    tags = ['|'.join(f'"{w}"' for w in tag_words[offsets[i]:offsets[i + 1]]) or '[none]' for i in range(n)]
+    publish = pd.to_datetime(rng.integers(1_500_000_000, 1_530_000_000, n), unit='s', utc=True)
+    return pd.DataFrame({
+        'video_id': ids,
+        'trending_date': publish.strftime('%y.%d.%m'),
+        'title': _sentences(rng, n, 3, 12),
+        'channel_title': rng.choice(CREATORS, n),
+        'category_id': rng.integers(1, 30, n),
+        'publish_time': publish.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'tags': tags,
+        'views': views,
+        'likes': (views * rng.uniform(0.01, 0.1, n)).astype(np.int64),
+        'dislikes': (views * rng.uniform(0.0, 0.01, n)).astype(np.int64),
+        'comment_count': (views * rng.uniform(0.0, 0.01, n)).astype(np.int64),
+        'thumbnail_link': [f"https://i.ytimg.com/vi/{i}/default.jpg" for i in ids],
+        'comments_disabled': False,
+        'ratings_disabled': False,
+        'video_error_or_removed': False,
+        'description': _sentences(rng, n, 5, 30)
+    })
+
+
+def analyzed_videos(n: int, seed: int = 0, transcription_rate: float = 0.3) -> pd.DataFrame:
+    """
+    Rows in the analyzed_videos_with_demographics.csv schema, as produced by load().
+
+    Args:
+        n (int): Number of rows
+        seed (int): Random seed
+        transcription_rate (float): Fraction of rows with a transcription
+
+    Returns:
+        pd.DataFrame: Enriched video data (tags as Python lists)
+    """
+    rng = np.random.default_rng(seed + 2)
+    source = rng.choice(SOURCES, n)
+    views = rng.integers(1_000, 20_000_000, n)
+    description = _sentences(rng, n, 3, 15, tag_rate=0.3)
+    transcription = _sentences(rng, n, 20, 120, pool_size=2000)
+    has_transcription = rng.random(n) < transcription_rate
+    tags = [[token for token in text.split() if token.startswith('#')] for text in description]
+    shares = (views * rng.uniform(0.0, 0.01, n)).astype(np.float64)
+    shares[source == 'youtube'] = np.nan
+    return pd.DataFrame({
+        'video_id': np.arange(n).astype(str),
+        'creator': rng.choice(CREATORS, n),
+        'description': description,
+        'publish_time': pd.to_datetime(rng.integers(1_500_000_000, 1_700_000_000, n), unit='s', utc=True),
+        'duration': rng.integers(5, 900, n),
+        'url': [f"https://example.com/v/{i}" for i in range(n)],
+        'likes': (views * rng.uniform(0.01, 0.3, n)).astype(np.int64),
+        'shares': shares,
+        'comments': (views * rng.uniform(0.0, 0.01, n)).astype(np.int64),
+        'views': views,
+        'source': source,
+        'transcription': np.where(has_transcription, transcription, None),
+        'tags': tags,
+        'sentiment_transcription': np.round(rng.uniform(-1, 1, n), 4),
+        'sentiment_tags': np.round(rng.uniform(-1, 1, n), 4),
+        'timestamp': datetime.datetime(2025, 9, 13, 12, 0, 0),
+        'demographics': rng.choice(DEMOGRAPHICS, n)
+    })
+
+
+def write_audio_clip(path: str, seconds: float, sr: int = 22050, seed: int = 0) -> str:
+    """
+    Write a mono 16-bit WAV clip with a beat, a tone and noise.
+
+    Args:
+        path (str): Output path
+        seconds (float): Clip length
+        sr (int): Sample rate
+        seed (int): Random seed
+
+    Returns:
+        str: The path written
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tempo = rng.uniform(80, 160)
+    beat = (np.sin(2 * np.pi * t * tempo / 60) > 0.95).astype(np.float64)
+    tone = 0.3 * np.sin(2 * np.pi * rng.uniform(200, 800) * t)
+    signal = 0.5 * beat + tone + 0.05 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        f.writeframes(pcm.tobytes())
+    return path
@@ -0,0 +1,175 @@
+"""
+Dashboard Analytics
+
+The trend dashboard's sections, each backed by one warehouse query:
+
+- trending_hashtags / trending_keywords: most used '#' tags and plain tags
+- trending_audios: from the precomputed analyzed_data.trend_analytics
+  summary (the trends table has no audio column)
+- sentiment: average transcription and tag sentiment per source, with
+  positive / negative video counts
+- demographics: videos, views and likes per inferred audience
+
+dashboard() issues all the queries at once on the warehouse's thread pool
+and awaits them together, each with its own timeout, so the response takes
+as long as the slowest query rather than the sum. A section whose query
+fails or times out is returned as None with its error, and the other
+sections are still served.
+
+snapshot_version() is the last modification time of the tables behind the
+dashboard; the API derives its ETag / Last-Modified from it, so clients
+holding the current dashboard get a 304 without any query being run.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from ml.metrics import BIGQUERY_ERRORS
+from google_bigquery.main import rows_to_JSON, warehouse
+
+TRENDS_TABLE = os.getenv("BIGQUERY_TRENDS_TABLE", "analyzed_data.trends")
+SUMMARY_TABLE = os.getenv("BIGQUERY_SUMMARY_TABLE", "analyzed_data.trend_analytics")
+QUERY_TIMEOUT = float(os.getenv("ANALYTICS_QUERY_TIMEOUT", "5"))
+# Seconds between checks of the tables' modification time
+SNAPSHOT_TTL = float(os.getenv("ANALYTICS_SNAPSHOT_TTL", "60"))
+DEFAULT_DAYS = 7
+DEFAULT_LIMIT = 10
+# Bounds of the API parameters
+MAX_DAYS = 365
+MAX_LIMIT = 100
+MAX_TIMEOUT = 60.0
+
+# Tags are stored as the Python list repr, e.g. "['#glassskin', 'skincare']"
+_TAGS = r"""UNNEST(REGEXP_EXTRACT_ALL(tags, r"'([^']+)'"))"""
+_RECENT = "SAFE_CAST(publish_time AS TIMESTAMP) >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)"
+
+
+def _tag_query(section: str, hashtags: bool) -> str:
+    condition = "STARTS_WITH(tag, '#')" if hashtags else "NOT STARTS_WITH(tag, '#')"
+    return f"""-- dashboard:{section}
+    SELECT LOWER(tag) AS name, COUNT(*) AS count
+    FROM {TRENDS_TABLE}, {_TAGS} AS tag
+    WHERE {_RECENT} AND {condition}
+    GROUP BY name ORDER BY count DESC LIMIT {{limit}}
+    """
+
+
+# Section -> SQL template (formatted with days and limit); the leading comment
+# names the section for the local warehouse stand-in
+QUERIES = {
+    "trending_hashtags": _tag_query("trending_hashtags", hashtags=True),
+    "trending_keywords": _tag_query("trending_keywords", hashtags=False),
+    "trending_audios": f"""-- dashboard:trending_audios
+    SELECT json_data FROM {SUMMARY_TABLE} LIMIT 1
+    """,
+    "sentiment": f"""-- dashboard:sentiment
+    SELECT source, COUNT(*) AS videos,
+           AVG(sentiment_transcription) AS avg_transcription,
+           AVG(sentiment_tags) AS avg_tags,
+           COUNTIF(sentiment_transcription > 0.05) AS positive,
+           COUNTIF(sentiment_transcription < -0.05) AS negative
+    FROM {TRENDS_TABLE}
+    WHERE {_RECENT}
+    GROUP BY source ORDER BY videos DESC
+    """,
+    "demographics": f"""-- dashboard:demographics
+    SELECT demographics AS name, COUNT(*) AS videos, SUM(views) AS views, SUM(likes) AS likes
+    FROM {TRENDS_TABLE}
+    WHERE {_RECENT}
+    GROUP BY name ORDER BY videos DESC LIMIT {{limit}}
+    """,
+}
+
+
+def _audios_from_summary(rows):
+    summary = rows_to_JSON(rows)
+    if not summary:
+        return []
+    json_data = summary[0].get("json_data")
+    if isinstance(json_data, str):
+        json_data = json.loads(json_data)
+    return (json_data or {}).get("trending_audios", [])
+
+
+CONVERTERS = {"trending_audios": _audios_from_summary}
+
+
+def dashboard_queries(days: int = DEFAULT_DAYS, limit: int = DEFAULT_LIMIT) -> Dict[str, str]:
+    """
+    SQL per dashboard section.
+
+    Args:
+        days (int): Look-back window in days
+        limit (int): Entries per ranked section
+
+    Returns:
+        Dict[str, str]: Section -> query text
+    """
+    return {section: sql.format(days=int(days), limit=int(limit)) for section, sql in QUERIES.items()}
+
+
+_snapshot = {"checked_at": None, "modified": None}
+
+
+def _tables_modified() -> Optional[float]:
+    try:
+        return max(warehouse.client.get_table(table).modified.timestamp() for table in (TRENDS_TABLE, SUMMARY_TABLE))
+    except Exception as e:
+        print(f"Warning: could not read table metadata: {e}")
+        return None
+
+
+async def snapshot_version() -> Optional[float]:
+    """
+    Last modification of the dashboard's tables, re-read at most every SNAPSHOT_TTL seconds.
+
+    Returns:
+        float: Epoch seconds, or None when the table metadata is unavailable
+    """
+    checked_at = _snapshot["checked_at"]
+    if checked_at is None or time.monotonic() - checked_at >= SNAPSHOT_TTL:
+        modified = await asyncio.to_thread(_tables_modified)
+        _snapshot.update(checked_at=time.monotonic(), modified=modified)
+    return _snapshot["modified"]
+
+
+async def _section(name: str, sql: str, timeout: Optional[float]):
+    start = time.perf_counter()
+    try:
+        data = await warehouse.run_async(sql, timeout=timeout, convert=CONVERTERS.get(name, rows_to_JSON))
+        error = None
+    except asyncio.TimeoutError:
+        data, error = None, f"timed out after {timeout:g}s"
+    except Exception as e:
+        data, error = None, str(e) or type(e).__name__
+    if error is not None:
+        BIGQUERY_ERRORS.inc(1, f"dashboard_{name}")
+    return name, data, error, (time.perf_counter() - start) * 1000
+
+
+async def dashboard(days: int = DEFAULT_DAYS, limit: int = DEFAULT_LIMIT,
+                    timeout: Optional[float] = QUERY_TIMEOUT) -> Dict:
+    """
+    All dashboard sections, queried concurrently.
+
+    Args:
+        days (int): Look-back window in days
+        limit (int): Entries per ranked section
+        timeout (float): Seconds each query may take (no limit if None)
+
+    Returns:
+        Dict: 'data' (section -> rows, None when failed), 'errors' (section -> message),
+            'partial' and per-section 'timings_ms'
+    """
+    queries = dashboard_queries(days, limit)
+    sections = await asyncio.gather(*(_section(name, sql, timeout) for name, sql in queries.items()))
+    errors = {name: error for name, _, error, _ in sections if error is not None}
+    return {
+        "data": {name: data for name, data, _, _ in sections},
+        "errors": errors,
+        "partial": bool(errors),
+        "timings_ms": {name: round(ms, 1) for name, _, _, ms in sections},
+    }
@@ -1,21 +1,32 @@
 # to query data
 from dotenv import load_dotenv
-from google.cloud import bigquery
 from datetime import datetime
 import csv
-import os
+
+from ml.metrics import BIGQUERY_SECONDS, BIGQUERY_ERRORS, timed
+from google_bigquery.warehouse import shared_warehouse
 
 
 load_dotenv()
 
 
-client = bigquery.Client.from_service_account_json(os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
+# The BigQuery client (and google.cloud.bigquery itself) is created on first use;
+# budget checks and concurrent queries live in google_bigquery/warehouse.py
+warehouse = shared_warehouse()
 
 
-def query_to_JSON(query) -> list[dict]:
-    listofJSON = []
-    results = client.query(query).result()
+def get_client():
+    """Return the shared BigQuery client, creating it on first use."""
+    return warehouse.client
+
 
+def set_client(client):
+    """Replace the shared client, e.g. with a local stand-in."""
+    warehouse.set_client(client)
+
+
+def rows_to_JSON(results) -> list[dict]:
+    listofJSON = []
     i = 0
     for rows in results:
         j = 0
@@ -30,9 +41,15 @@ def query_to_JSON(query) -> list[dict]:
         i += 1
 
     return listofJSON
+
+
+@timed(BIGQUERY_SECONDS, "query_to_JSON", errors=BIGQUERY_ERRORS)
+def query_to_JSON(query) -> list[dict]:
+    return rows_to_JSON(warehouse.run(query))
         
+@timed(BIGQUERY_SECONDS, "query_to_csv", errors=BIGQUERY_ERRORS)
 def query_to_csv(query, output_path):
-    results = client.query(query).result()
+    results = warehouse.run(query)
     with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow([field.name for field in results.schema])  # header
@@ -40,9 +57,10 @@ def query_to_csv(query, output_path):
             writer.writerow(list(row.values()))
     print(f"Results saved to {output_path}")
 
+@timed(BIGQUERY_SECONDS, "query", errors=BIGQUERY_ERRORS)
 def query(query):
     listofJSON = []
-    results = client.query(query).result()
+    results = warehouse.run(query)
     for rows in results:
         listofJSON.append(rows.values())
     
@@ -50,3 +68,23 @@ def query(query):
         
     # print()
     # return results
+
+
+@timed(BIGQUERY_SECONDS, "query_many_to_JSON", errors=BIGQUERY_ERRORS)
+def query_many_to_JSON(queries, timeout=None, return_exceptions=False):
+    """
+    Run several queries concurrently and convert each result like query_to_JSON.
+
+    Args:
+        queries (dict | list): Query texts, by name or in order
+        timeout (float): Seconds to wait for all of them
+        return_exceptions (bool): Put failures in place of their results instead of raising
+
+    Returns:
+        dict | list: JSON rows per query, in the same shape as `queries`
+    """
+    results = warehouse.run_many(queries, timeout=timeout, return_exceptions=return_exceptions)
+    convert = lambda rows: rows if isinstance(rows, Exception) else rows_to_JSON(rows)
+    if isinstance(results, dict):
+        return {name: convert(rows) for name, rows in results.items()}
+    return [convert(rows) for rows in results]
@@ -0,0 +1,176 @@
+"""
+Analyzed Videos Listing
+
+Reads rows of the analyzed videos table (analyzed_data.trends) with
+server-side filters on source, demographics, publish date range and tag.
+
+Pages use keyset pagination on (publish_time, video_id), newest first: the
+cursor returned with a page holds the last row's sort key and the next page
+asks for rows strictly after it, so every page costs the same however deep
+it is and rows loaded between requests do not shift pages. Rows without a
+publish time sort last (as 1970-01-01).
+
+Exports run the same query without a row limit and iterate the warehouse
+result page by page (EXPORT_PAGE_SIZE rows per fetch), so an export holds
+one page in memory whatever its size. Filter values are passed as query
+parameters, never formatted into the SQL.
+"""
+
+import base64
+import datetime
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from google_bigquery.analytics import TRENDS_TABLE
+from google_bigquery.main import warehouse
+from google_bigquery.warehouse import query_parameter
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_PAGE_SIZE = int(os.getenv("VIDEOS_EXPORT_PAGE_SIZE", "5000"))
+QUERY_TIMEOUT = float(os.getenv("VIDEOS_QUERY_TIMEOUT", "30"))
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_PUBLISHED = "IFNULL(SAFE_CAST(publish_time AS TIMESTAMP), TIMESTAMP '1970-01-01')"
+# Tags are stored as the Python list repr, e.g. "['#glassskin', 'skincare']"
+_TAGS = r"""REGEXP_EXTRACT_ALL(LOWER(tags), r"'([^']+)'")"""
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by this module."""
+
+
+def encode_cursor(published: datetime.datetime, video_id: str) -> str:
+    payload = json.dumps([published.isoformat(), str(video_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, str]:
+    """
+    (publish time, video id) of a cursor.
+
+    Raises:
+        InvalidCursor: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published, video_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.datetime.fromisoformat(published), str(video_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def _published_of(value) -> datetime.datetime:
+    """Sort-key publish time of a row, as the SQL computes it."""
+    if value is None or value == "":
+        return _EPOCH
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return _EPOCH
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def videos_query(source: Optional[str] = None, demographics: Optional[str] = None,
+                 since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None,
+                 tag: Optional[str] = None, cursor: Optional[str] = None,
+                 limit: Optional[int] = None) -> Tuple[str, List]:
+    """
+    SQL and parameters for a filtered, keyset-ordered read of the videos table.
+
+    Args:
+        source (str): 'tiktok' or 'youtube'
+        demographics (str): Inferred audience, e.g. 'gen z'
+        since (datetime): Published at or after
+        until (datetime): Published before
+        tag (str): Hashtag ('#glassskin') or keyword tag, case-insensitive
+        cursor (str): next_cursor of the previous page
+        limit (int): Rows to return (all if None)
+
+    Returns:
+        Tuple[str, List]: Query text and its parameters
+    """
+    conditions, params = [], []
+    if source:
+        conditions.append("source = @source")
+        params.append(query_parameter("source", "STRING", source))
+    if demographics:
+        conditions.append("demographics = @demographics")
+        params.append(query_parameter("demographics", "STRING", demographics))
+    if since:
+        conditions.append(f"{_PUBLISHED} >= @since")
+        params.append(query_parameter("since", "TIMESTAMP", since))
+    if until:
+        conditions.append(f"{_PUBLISHED} < @until")
+        params.append(query_parameter("until", "TIMESTAMP", until))
+    if tag:
+        conditions.append(f"@tag IN UNNEST({_TAGS})")
+        params.append(query_parameter("tag", "STRING", tag.lower()))
+    if cursor:
+        after_published, after_id = decode_cursor(cursor)
+        conditions.append(f"({_PUBLISHED} < @after_published "
+                          f"OR ({_PUBLISHED} = @after_published AND video_id < @after_id))")
+        params.append(query_parameter("after_published", "TIMESTAMP", after_published))
+        params.append(query_parameter("after_id", "STRING", after_id))
+
+    sql = f"SELECT * FROM {TRENDS_TABLE}"
+    if conditions:
+        sql += "\nWHERE " + "\n  AND ".join(conditions)
+    sql += f"\nORDER BY {_PUBLISHED} DESC, video_id DESC"
+    if limit is not None:
+        sql += f"\nLIMIT {int(limit)}"
+    return sql, params
+
+
+def _row_dict(row) -> Dict:
+    return dict(row.items())
+
+
+def page(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, **filters) -> Dict:
+    """
+    One page of videos.
+
+    Args:
+        limit (int): Rows per page (capped at MAX_PAGE_SIZE)
+        cursor (str): next_cursor of the previous page
+        **filters: source, demographics, since, until, tag (see videos_query)
+
+    Returns:
+        Dict: 'data' (rows) and 'next_cursor' (None on the last page)
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    # One extra row tells whether another page follows
+    sql, params = videos_query(cursor=cursor, limit=limit + 1, **filters)
+    rows = warehouse.run(sql, timeout=QUERY_TIMEOUT, params=params)
+    data = [_row_dict(row) for row in islice(rows, limit + 1)]
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        last = data[-1]
+        next_cursor = encode_cursor(_published_of(last.get("publish_time")), last.get("video_id"))
+    return {"data": data, "next_cursor": next_cursor}
+
+
+def export(cursor: Optional[str] = None, limit: Optional[int] = None, **filters) -> Iterator[Dict]:
+    """
+    Stream matching videos row by row.
+
+    The query is started (and its errors raised) when this is called; rows
+    are then fetched page by page while the iterator is consumed.
+
+    Args:
+        cursor (str): Start after this cursor
+        limit (int): Maximum rows (all if None)
+        **filters: source, demographics, since, until, tag (see videos_query)
+
+    Returns:
+        Iterator[Dict]: One dict per row
+    """
+    sql, params = videos_query(cursor=cursor, limit=limit, **filters)
+    rows = warehouse.run(sql, timeout=QUERY_TIMEOUT, params=params, page_size=EXPORT_PAGE_SIZE)
+    return (_row_dict(row) for row in rows)
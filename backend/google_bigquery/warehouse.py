@@ -0,0 +1,301 @@
+"""
+Warehouse Client Manager
+
+One lazily created, reused BigQuery client for the whole process, with:
+
+- a connection pool sized for `max_concurrent` jobs, so concurrent queries
+  do not queue on the HTTP session's default ten connections
+- an optional cost guard: with a byte budget (BIGQUERY_MAX_BYTES) each query
+  is first dry-run to estimate the bytes it would scan, queries over the
+  budget raise QueryBudgetExceeded without running, and the budget is also
+  set as the job's maximum_bytes_billed so BigQuery enforces it server-side.
+  Estimates are cached per SQL text for `estimate_ttl` seconds
+- run_many() (threads) and run_async() (event loop), which run several
+  queries at once on a small thread pool, so a dashboard needing N queries
+  waits for the slowest one instead of the sum
+
+The client is created by `factory` on first use; set_client() injects a
+ready one instead (e.g. benchmarks/fakes.py's FakeBigQueryClient).
+"""
+
+import asyncio
+import os
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Union
+
+from ml.metrics import BIGQUERY_SECONDS, BIGQUERY_ERRORS
+
+MAX_BYTES = int(os.getenv("BIGQUERY_MAX_BYTES", "0")) or None
+MAX_CONCURRENT = int(os.getenv("BIGQUERY_MAX_CONCURRENT", "32"))
+ESTIMATE_TTL = float(os.getenv("BIGQUERY_ESTIMATE_TTL", "600"))
+
+
+class QueryBudgetExceeded(ValueError):
+    """Raised when a query's dry-run estimate is over the byte budget."""
+
+    def __init__(self, sql: str, estimated_bytes: int, max_bytes: int):
+        super().__init__(f"Query would scan {estimated_bytes:,} bytes, over the budget of {max_bytes:,} bytes")
+        self.sql = sql
+        self.estimated_bytes = estimated_bytes
+        self.max_bytes = max_bytes
+
+
+def default_client_factory(max_connections: int = MAX_CONCURRENT):
+    """
+    BigQuery client from GOOGLE_APPLICATION_CREDENTIALS with a connection pool
+    of `max_connections`.
+    """
+    from google.cloud import bigquery
+
+    client = bigquery.Client.from_service_account_json(os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
+    try:
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        client._http.mount("https://", adapter)
+    except (ImportError, AttributeError):
+        pass
+    return client
+
+
+def job_config(**options):
+    """
+    QueryJobConfig with the given options.
+
+    Without google-cloud-bigquery installed (only possible with an injected
+    stand-in client) the options are returned as a plain namespace.
+    """
+    try:
+        from google.cloud import bigquery
+    except ImportError:
+        return types.SimpleNamespace(**options)
+    return bigquery.QueryJobConfig(**options)
+
+
+def query_parameter(name: str, type_: str, value):
+    """
+    Named scalar query parameter (@name in the SQL), e.g. ('source', 'STRING', 'tiktok').
+
+    Falls back to a plain namespace like job_config().
+    """
+    try:
+        from google.cloud import bigquery
+    except ImportError:
+        return types.SimpleNamespace(name=name, type_=type_, value=value)
+    return bigquery.ScalarQueryParameter(name, type_, value)
+
+
+class Warehouse:
+    """
+    Shared BigQuery client with a dry-run byte budget and concurrent queries.
+
+    Args:
+        factory (Callable): Creates the client on first use (takes the pool size)
+        max_bytes (int): Byte budget per query; None disables the dry run
+        max_concurrent (int): Queries run at once by run_many()
+        estimate_ttl (float): Seconds a dry-run estimate is reused
+    """
+
+    def __init__(self, factory: Callable = default_client_factory, max_bytes: Optional[int] = MAX_BYTES,
+                 max_concurrent: int = MAX_CONCURRENT, estimate_ttl: float = ESTIMATE_TTL):
+        self.factory = factory
+        self.max_bytes = max_bytes
+        self.max_concurrent = max(1, max_concurrent)
+        self.estimate_ttl = estimate_ttl
+        self._client = None
+        self._lock = threading.Lock()
+        self._estimates: Dict[str, tuple] = {}
+        self._pool = None
+
+    @property
+    def client(self):
+        """The client, created on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self.factory(self.max_concurrent)
+        return self._client
+
+    def set_client(self, client):
+        """Replace the client, e.g. with a local stand-in; clears cached estimates."""
+        with self._lock:
+            self._client = client
+            self._estimates.clear()
+
+    def estimate_bytes(self, sql: str, params: Optional[List] = None) -> int:
+        """
+        Bytes the query would scan, from a (cached) dry run.
+
+        The estimate is cached per SQL text: parameter values change which
+        rows match, not which columns are scanned.
+
+        Args:
+            sql (str): Query text
+            params (List): Query parameters (see query_parameter)
+
+        Returns:
+            int: total_bytes_processed of the dry-run job
+        """
+        cached = self._estimates.get(sql)
+        if cached is not None and time.monotonic() - cached[1] < self.estimate_ttl:
+            return cached[0]
+        with BIGQUERY_SECONDS.time("dry_run"):
+            job = self.client.query(sql, job_config=job_config(dry_run=True, use_query_cache=False,
+                                                               query_parameters=params or []))
+        estimate = int(job.total_bytes_processed or 0)
+        self._estimates[sql] = (estimate, time.monotonic())
+        return estimate
+
+    def check_budget(self, sql: str, max_bytes: Optional[int] = None, params: Optional[List] = None) -> Optional[int]:
+        """
+        Raise QueryBudgetExceeded if the query is over the budget.
+
+        Args:
+            sql (str): Query text
+            max_bytes (int): Budget for this query (the warehouse's if None)
+            params (List): Query parameters
+
+        Returns:
+            int: The estimate, or None when no budget applies
+        """
+        max_bytes = max_bytes or self.max_bytes
+        if not max_bytes:
+            return None
+        estimate = self.estimate_bytes(sql, params)
+        if estimate > max_bytes:
+            BIGQUERY_ERRORS.inc(1, "budget")
+            raise QueryBudgetExceeded(sql, estimate, max_bytes)
+        return estimate
+
+    def submit(self, sql: str, max_bytes: Optional[int] = None, params: Optional[List] = None):
+        """
+        Start a query job after the budget check.
+
+        Args:
+            sql (str): Query text
+            max_bytes (int): Budget for this query (the warehouse's if None)
+            params (List): Query parameters (see query_parameter)
+
+        Returns:
+            QueryJob: The running job
+        """
+        max_bytes = max_bytes or self.max_bytes
+        options = {"query_parameters": params} if params else {}
+        if max_bytes:
+            self.check_budget(sql, max_bytes, params)
+            options["maximum_bytes_billed"] = max_bytes
+        if not options:
+            return self.client.query(sql)
+        return self.client.query(sql, job_config=job_config(**options))
+
+    def run(self, sql: str, timeout: Optional[float] = None, max_bytes: Optional[int] = None,
+            params: Optional[List] = None, page_size: Optional[int] = None):
+        """
+        Run a query and wait for its rows.
+
+        Args:
+            sql (str): Query text
+            timeout (float): Seconds to wait for the result; the job is
+                cancelled when it runs over
+            max_bytes (int): Budget for this query (the warehouse's if None)
+            params (List): Query parameters (see query_parameter)
+            page_size (int): Rows fetched per page while iterating the result
+
+        Returns:
+            RowIterator: The query's rows (with .schema)
+        """
+        job = self.submit(sql, max_bytes, params)
+        try:
+            if page_size:
+                return job.result(timeout=timeout, page_size=page_size)
+            return job.result(timeout=timeout)
+        except FutureTimeoutError:
+            cancel = getattr(job, "cancel", None)
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+            raise
+
+    def run_many(self, queries: Union[Dict[str, str], List[str]], timeout: Optional[float] = None,
+                 max_bytes: Optional[int] = None, return_exceptions: bool = False):
+        """
+        Run several queries concurrently and gather their rows.
+
+        Args:
+            queries (Dict[str, str] | List[str]): Query texts, by name or in order
+            timeout (float): Seconds to wait for all of them
+            max_bytes (int): Budget per query (the warehouse's if None)
+            return_exceptions (bool): Put each failure (including timeouts) in
+                place of its result instead of raising the first one
+
+        Returns:
+            Dict | List: Rows per query, in the same shape as `queries`
+        """
+        names = list(queries) if isinstance(queries, dict) else list(range(len(queries)))
+        texts = [queries[name] for name in names]
+        pool = self._executor()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        futures = [pool.submit(self.run, sql, timeout, max_bytes) for sql in texts]
+
+        results = []
+        for future in futures:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            try:
+                results.append(future.result(timeout=remaining))
+            except Exception as e:
+                BIGQUERY_ERRORS.inc(1, "run_many")
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        if isinstance(queries, dict):
+            return dict(zip(names, results))
+        return results
+
+    async def run_async(self, sql: str, timeout: Optional[float] = None, max_bytes: Optional[int] = None,
+                        convert: Optional[Callable] = None):
+        """
+        Awaitable run() on the warehouse's thread pool.
+
+        An event loop can await several of these at once; at most
+        `max_concurrent` queries run at a time across all callers.
+
+        Args:
+            sql (str): Query text
+            timeout (float): Seconds to wait (raises asyncio.TimeoutError)
+            max_bytes (int): Budget for this query (the warehouse's if None)
+            convert (Callable): Applied to the rows in the worker thread, since
+                iterating a result fetches its pages (e.g. rows_to_JSON)
+
+        Returns:
+            The query's rows, or convert(rows)
+        """
+        def work():
+            rows = self.run(sql, timeout, max_bytes)
+            return convert(rows) if convert is not None else rows
+
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self._executor(), work), timeout)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_concurrent, thread_name_prefix="bigquery")
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+_warehouse = Warehouse()
+
+
+def shared_warehouse() -> Warehouse:
+    """The process-wide warehouse."""
+    return _warehouse
@@ -1,21 +1,86 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import uvicorn
-from typing import List
+import threading
+import datetime
+import time
+import os
+from typing import List, Optional
 from pydantic import BaseModel
-from google_bigquery import main as bigqueryClient
+from google_bigquery import analytics, videos
 from ml.trend_success import TrendSuccessPredictor
-
-app = FastAPI(title="Modular Backend API")
+from ml import metrics
+from ml.trend_aggregates import shared_aggregates, AGGREGATES_PATH
+from api.responses import (FastJSONResponse, add_compression, ndjson_chunks, etag_for, validators, not_modified,
+                           not_modified_response)
 
 
 class ContentRequest(BaseModel):
     keyword: str
     audio_path: str
-    platform: str 
+    platform: str
     target_audience: List[str]
 
 successPredictor = TrendSuccessPredictor()
 
+for _name in ("hits", "misses", "coalesced"):
+    metrics.callback(f"prediction_cache_{_name}_total", f"Prediction cache {_name}",
+                     lambda name=_name: successPredictor.prediction_cache.stats()[name], kind="counter")
+metrics.callback("prediction_cache_hit_ratio", "Share of prediction lookups served from the cache",
+                 lambda: successPredictor.prediction_cache.stats()["hit_ratio"])
+metrics.callback("prediction_cache_size", "Entries in the prediction cache",
+                 lambda: successPredictor.prediction_cache.stats()["size"])
+
+# Heavy models load lazily; warm_up() front-loads them and flips readiness
+_warmup_lock = threading.Lock()
+_warmup_state = {"ready": False, "timings": None, "error": None}
+
+
+def warm_up():
+    """
+    Load the prediction model and its heavy dependencies once.
+    Safe to call from several threads; later calls only check (at most every
+    MODEL_RELOAD_SECONDS) whether a retrained model was saved, and load it.
+    """
+    if _warmup_state["ready"]:
+        successPredictor.reload_if_changed()
+        return _warmup_state
+    with _warmup_lock:
+        if not _warmup_state["ready"]:
+            try:
+                _warmup_state["timings"] = successPredictor.warm_up()
+                _warmup_state["ready"] = successPredictor.is_trained
+                _warmup_state["error"] = None if successPredictor.is_trained else "model not loaded"
+            except Exception as e:
+                _warmup_state["error"] = str(e)
+    return _warmup_state
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the process starts serving liveness checks immediately
+    if os.getenv("WARMUP_ON_STARTUP", "1") == "1":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Modular Backend API", lifespan=lifespan, default_response_class=FastJSONResponse)
+add_compression(app)
+
+
+if metrics.ENABLED:
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # Label by route template, not raw path, to keep the series bounded
+        route = request.scope.get("route")
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - start, request.method,
+                                     getattr(route, "path", "unmatched"), str(response.status_code))
+        return response
+
+
 @app.get("/")
 def read_root():
     """
@@ -24,28 +89,129 @@ def read_root():
     """
     return {"message": "Welcome to the main backend app!"}
 
+@app.get("/ready")
+def readiness():
+    """
+    Readiness probe: 200 once the model is loaded, 503 until then.
+    """
+    body = {"ready": _warmup_state["ready"],
+            "timings": _warmup_state["timings"],
+            "error": _warmup_state["error"]}
+    return JSONResponse(body, status_code=200 if _warmup_state["ready"] else 503)
+
+@app.post("/warmup")
+def trigger_warm_up():
+    """
+    Explicitly warm up the model (blocks until loaded).
+    """
+    state = warm_up()
+    return JSONResponse(dict(state), status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint (404 when METRICS_ENABLED=0).
+    """
+    if not metrics.ENABLED:
+        return JSONResponse({"detail": "metrics disabled"}, status_code=404)
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/trend/analytics")
-def trend_analysis():
-    query = """
-    SELECT json_data FROM analyzed_data.trend_analytics LIMIT 1
+async def trend_analysis(request: Request,
+                         days: int = Query(analytics.DEFAULT_DAYS, ge=1, le=analytics.MAX_DAYS),
+                         limit: int = Query(analytics.DEFAULT_LIMIT, ge=1, le=analytics.MAX_LIMIT),
+                         timeout: float = Query(analytics.QUERY_TIMEOUT, gt=0, le=analytics.MAX_TIMEOUT)):
+    """
+    Dashboard analytics: trending hashtags, keywords and audios, sentiment and
+    demographics breakdowns. The queries run concurrently, each limited to
+    `timeout` seconds; sections that fail are null and listed in `errors`.
+    Complete responses carry an ETag / Last-Modified from the tables' snapshot;
+    a client holding the current one gets a 304 without any query being run.
+    """
+    etag = last_modified = None
+    snapshot = await analytics.snapshot_version()
+    if snapshot is not None:
+        # The look-back window also moves with the calendar day
+        today = datetime.datetime.now(datetime.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        last_modified = max(snapshot, today.timestamp())
+        etag = etag_for("analytics", last_modified, days, limit)
+        if not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    result = await analytics.dashboard(days, limit, timeout)
+    if len(result["errors"]) == len(result["data"]):
+        return FastJSONResponse({**result, "message": "warehouse unavailable"}, status_code=503)
+    headers = validators(etag, last_modified) if etag is not None and not result["partial"] else None
+    return FastJSONResponse({**result, "message": "partial" if result["partial"] else "ok"}, headers=headers)
+
+
+@app.get("/trend/aggregates")
+def trend_aggregates(request: Request, window: str = "24h", dimension: str = "hashtag", source: str = None,
+                     demographic: str = None, limit: int = 10):
     """
-    data = bigqueryClient.query(query)
-    # print(type(data)) # dict
-    return {"data":data,
-            "message": "ok"}
+    Top hashtags, keywords, creators or audio over a sliding window (1h, 24h, 7d),
+    optionally for one source and demographic. Validated by the saved state's
+    modification time (ETag / Last-Modified, 304 when unchanged).
+    """
+    aggregates = shared_aggregates()
+    if aggregates is None:
+        return JSONResponse({"detail": "trend aggregates not built yet"}, status_code=404)
+    last_modified = os.path.getmtime(AGGREGATES_PATH)
+    etag = etag_for("aggregates", last_modified, window, dimension, source, demographic, limit)
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    try:
+        data = aggregates.top(window, dimension, source, demographic, limit)
+    except ValueError as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return FastJSONResponse({"data": data,
+                             "window": window,
+                             "watermark_hour": aggregates.watermark,
+                             "message": "ok"}, headers=validators(etag, last_modified))
+
+
+@app.get("/videos")
+def list_videos(source: str = None, demographics: str = None, since: Optional[datetime.datetime] = None,
+                until: Optional[datetime.datetime] = None, tag: str = None, cursor: str = None,
+                limit: int = videos.DEFAULT_PAGE_SIZE, format: str = "json"):
+    """
+    Analyzed videos, newest first, filtered by source, demographics, publish
+    date range [since, until) and tag.
+
+    format=json returns one page (`limit` rows, at most 1000) and a
+    `next_cursor` to pass back for the next one. format=ndjson streams every
+    matching row (after `cursor`, if given) as one JSON object per line.
+    """
+    filters = {"source": source, "demographics": demographics, "since": since, "until": until, "tag": tag}
+    try:
+        if format == "ndjson":
+            rows = videos.export(cursor=cursor, **filters)
+            return StreamingResponse(ndjson_chunks(rows), media_type="application/x-ndjson")
+        if format != "json":
+            return JSONResponse({"detail": "format must be 'json' or 'ndjson'"}, status_code=400)
+        result = videos.page(limit, cursor, **filters)
+    except videos.InvalidCursor as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    return FastJSONResponse({**result, "message": "ok"})
 
 
 @app.post("/recipe/predict")
-async def predict_recipe_success(request: ContentRequest):
-    successPredictor.load_model()
+def predict_recipe_success(request: ContentRequest):
+    warm_up()
     results = successPredictor.predict_trend_success(request.keyword,
                                            request.audio_path,
                                            request.platform,
                                            request.target_audience)
-    return results
+    return FastJSONResponse(results)
+
+@app.get("/recipe/predict/cache")
+def prediction_cache_stats():
+    """
+    Hit, miss and coalesced-request counters of the prediction cache.
+    """
+    return successPredictor.prediction_cache.stats()
 
 
 
 if __name__ == "__main__":
-    successPredictor.load_model()
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
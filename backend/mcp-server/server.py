@@ -1,10 +1,17 @@
 # mcp-server/server.py
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
+import asyncio
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 
+sys.path.append(".")
+from trend_store import TrendStore
+from ml.trend_success import TrendSuccessPredictor
+from ml.trend_aggregates import shared_aggregates
+
 # Initialize server
 server = Server("glowpulse-gcp-server")
 
@@ -46,7 +53,46 @@ MOCK_TRENDS_DATA = {
     ]
 }
 
-# Tool: Get top trends from mock data
+# Trends served from memory; the mock data fills in what the pipeline output does not cover
+# (all of it until the pipeline has run, and audio trends after)
+TRENDS_PATH = os.getenv("TRENDS_PATH", "ml/data/analyzed_videos_with_demographics.csv")
+trend_store = TrendStore(TRENDS_PATH,
+                         seed=MOCK_TRENDS_DATA["trends"],
+                         country=os.getenv("TRENDS_COUNTRY") or None,
+                         min_refresh_interval=float(os.getenv("TRENDS_REFRESH_SECONDS", "30")))
+trend_store.refresh(force=True)
+
+# Warm predictor kept in process so tool calls skip the HTTP API and model load
+AUDIENCES = {"Gen Z": ["Gen Z"], "Millennials": ["Millennials"], "All": ["All Ages"]}
+predictor = TrendSuccessPredictor()
+predictor.warm_up()
+
+
+def refresh_model():
+    """Load the model if it was missing at startup, or a retrained one once it is saved."""
+    if not predictor.is_trained:
+        predictor.load_model()
+    else:
+        predictor.reload_if_changed()
+
+
+def recipe_request(recipe):
+    """Map a tool recipe (audio/keyword names, platform, demographic) to a predictor request."""
+    return {
+        "keyword": recipe["keyword_name"],
+        # Audio trends are referenced by name; features are derived from it when no file exists
+        "audio_path": recipe.get("audio_name"),
+        "platform": recipe.get("platform", "TikTok"),
+        "target_audience": AUDIENCES.get(recipe.get("demographic"), ["All Ages"])
+    }
+
+
+def describe_prediction(recipe, prediction):
+    return (f"The predicted success score for '{recipe.get('audio_name')}' + '{recipe['keyword_name']}' "
+            f"on {recipe.get('platform', 'TikTok')} targeting {recipe.get('demographic', 'All')} "
+            f"is {prediction['success_score']}%.")
+
+# Tool: Get top trends from the trend store
 @server.list_tools()
 async def list_tools():
     return [
@@ -65,13 +111,37 @@ async def list_tools():
                         "type": "number",
                         "description": "Number of top trends to return per category.",
                         "default": 5
+                    },
+                    "type": {
+                        "type": "string",
+                        "enum": ["audio", "keyword", "hashtag"],
+                        "description": "Only return trends of this type."
+                    },
+                    "platform": {
+                        "type": "string",
+                        "enum": ["TikTok", "Instagram Reels", "YouTube Shorts"],
+                        "description": "Only return trends on this platform."
                     }
                 }
             }
         },
+        {
+            "name": "get_trend_window",
+            "description": "Get the top hashtags, keywords, creators or audios by video count over a recent time window (1h, 24h or 7d).",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "window": {"type": "string", "enum": ["1h", "24h", "7d"], "default": "24h"},
+                    "dimension": {"type": "string", "enum": ["hashtag", "keyword", "creator", "audio"], "default": "hashtag"},
+                    "source": {"type": "string", "enum": ["tiktok", "youtube"], "description": "Only count videos from this source."},
+                    "demographic": {"type": "string", "enum": ["gen z", "millenials", "all age"], "description": "Only count videos for this audience."},
+                    "limit": {"type": "number", "default": 10}
+                }
+            }
+        },
         {
             "name": "predict_success_score",
-            "description": "Predict a success score (%) for a trend recipe by querying historical performance data.",
+            "description": "Predict a success score (%) for a trend recipe with the trained trend success model.",
             "inputSchema": {
                 "type": "object",
                 "properties": {
@@ -82,6 +152,29 @@ async def list_tools():
                 },
                 "required": ["audio_name", "keyword_name", "platform", "demographic"]
             }
+        },
+        {
+            "name": "predict_success_scores",
+            "description": "Predict success scores (%) for several trend recipes in one call.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "recipes": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "audio_name": {"type": "string"},
+                                "keyword_name": {"type": "string"},
+                                "platform": {"type": "string", "enum": ["TikTok", "Instagram Reels", "YouTube Shorts"]},
+                                "demographic": {"type": "string", "enum": ["Gen Z", "Millennials", "All"]}
+                            },
+                            "required": ["audio_name", "keyword_name", "platform", "demographic"]
+                        }
+                    }
+                },
+                "required": ["recipes"]
+            }
         }
     ]
 
@@ -91,33 +184,43 @@ async def call_tool(name, arguments):
         country_code = arguments.get("country_code", "MY")
         limit = arguments.get("limit", 5)
         
-        # Filter mock data by country
-        filtered_trends = [t for t in MOCK_TRENDS_DATA["trends"] if t["country"] == country_code]
-        sorted_trends = sorted(filtered_trends, key=lambda x: x["growth_score"], reverse=True)[:limit]
+        # Pick up new pipeline output (cheap mtime check, rate limited), then read the index
+        await asyncio.to_thread(trend_store.refresh)
+        sorted_trends = trend_store.top(country=country_code,
+                                        type=arguments.get("type"),
+                                        platform=arguments.get("platform"),
+                                        limit=limit)
         
         return {"result": json.dumps(sorted_trends, indent=2)}
     
-    elif name == "predict_success_score":
-        # Simulate a prediction based on mock data
-        audio_name = arguments["audio_name"]
-        keyword_name = arguments["keyword_name"]
-        platform = arguments["platform"]
-        demographic = arguments["demographic"]
+    elif name == "get_trend_window":
+        aggregates = shared_aggregates()
+        if aggregates is None:
+            return {"result": "No trend aggregates yet; they are built by the ETL load."}
+        top = aggregates.top(arguments.get("window", "24h"),
+                             arguments.get("dimension", "hashtag"),
+                             arguments.get("source"),
+                             arguments.get("demographic"),
+                             int(arguments.get("limit", 10)))
+        return {"result": json.dumps(top, indent=2)}
+    
+    elif name in ("predict_success_score", "predict_success_scores"):
+        # Cheap stamp check (rate limited), off the event loop since a reload reads the artifact
+        await asyncio.to_thread(refresh_model)
+        if not predictor.is_trained:
+            return {"result": "The trend success model is not available; train it with ml/trend_success.py first."}
         
-        # Simple heuristic for demo
-        base_score = 50
-        if "Oh No" in audio_name:
-            base_score += 20
-        if "Glass Skin" in keyword_name:
-            base_score += 15
-        if platform == "TikTok":
-            base_score += 10
-        if demographic == "Gen Z":
-            base_score += 5
-            
-        success_score = min(100, base_score)
+        recipes = arguments["recipes"] if name == "predict_success_scores" else [arguments]
+        # Scored off the event loop; repeated recipes are served from the prediction cache
+        predictions = await asyncio.to_thread(predictor.predict_many, [recipe_request(r) for r in recipes])
         
-        return {"result": f"The predicted success score for '{audio_name}' + '{keyword_name}' on {platform} targeting {demographic} is {success_score}%."}
+        if name == "predict_success_score":
+            return {"result": describe_prediction(arguments, predictions[0])}
+        return {"result": json.dumps([
+            {**recipe, "success_score": prediction["success_score"],
+             "recommendations": prediction["recommendations"]}
+            for recipe, prediction in zip(recipes, predictions)
+        ], indent=2)}
     
     else:
         raise ValueError(f"Unknown tool: {name}")
@@ -0,0 +1,295 @@
+"""
+Indexed Trend Store
+
+In-memory store of trend records (name, type, platform, growth_score,
+country, date) for the MCP tools. Every record is indexed under each
+combination of its country, type and platform (and a wildcard for each), in
+lists kept sorted by growth score, so a top-k query is one dict lookup and a
+slice of k items regardless of how many trends are stored.
+
+Records come from the pipeline outputs: either a trends CSV/JSON file with
+those columns, or the analyzed videos CSV, from which per-platform hashtag
+and keyword trends are derived. refresh() reloads the source only when its modification
+time changes and applies the difference (upserts and removals) to the
+indexes instead of rebuilding them.
+
+The videos table has no country, so derived trends carry none unless a
+country is configured; a country-less record matches every country filter.
+Seed records stay in the store for the (type, country) pairs the source
+does not cover, e.g. audio trends, which the videos table has no column for.
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice, product
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TREND_FIELDS = ("name", "type", "platform", "growth_score", "country", "date")
+PLATFORM_NAMES = {"tiktok": "TikTok", "youtube": "YouTube Shorts", "instagram": "Instagram Reels"}
+
+ANY = "*"
+
+
+def trend_key(trend: Dict) -> Tuple[str, str, str, str]:
+    """Identity of a trend: (name, type, platform, country)."""
+    return (trend["name"], trend["type"], trend["platform"], trend["country"])
+
+
+def trends_from_videos(df, country: Optional[str] = None) -> List[Dict]:
+    """
+    Derive hashtag and keyword trends from the analyzed videos table.
+
+    Each (tag, platform) pair becomes a trend whose growth score is the
+    percentile rank (0-100) of its total views among that platform's tags,
+    dated by its most recent video. '#'-prefixed tags (TikTok) are hashtags,
+    plain tags (YouTube) are keywords.
+
+    Args:
+        df (pd.DataFrame): analyzed_videos rows (needs 'tags', 'source', 'views', 'publish_time')
+        country (str): Country code to attach (the source data has none; None
+            leaves the trends country-less)
+
+    Returns:
+        List[Dict]: Trend records
+    """
+    import pandas as pd
+    from ml.enrichment import parse_tags
+
+    exploded = pd.DataFrame({
+        "name": df["tags"].map(parse_tags),
+        "platform": df["source"].str.lower().map(PLATFORM_NAMES).fillna(df["source"]),
+        "views": pd.to_numeric(df["views"], errors="coerce").fillna(0),
+        "date": pd.to_datetime(df["publish_time"], errors="coerce", utc=True, format="mixed")
+    }).explode("name").dropna(subset=["name"])
+    exploded["name"] = exploded["name"].astype(str).str.strip()
+    exploded = exploded[exploded["name"] != ""]
+    if exploded.empty:
+        return []
+
+    grouped = exploded.groupby(["name", "platform"], as_index=False).agg(views=("views", "sum"), date=("date", "max"))
+    grouped["growth_score"] = (grouped.groupby("platform")["views"].rank(pct=True) * 100).round().astype(int)
+    return [
+        {
+            "name": name,
+            "type": "hashtag" if name.startswith("#") else "keyword",
+            "platform": platform,
+            "growth_score": int(score),
+            "country": country,
+            "date": date.date().isoformat() if not pd.isna(date) else None
+        }
+        for name, platform, score, date in zip(grouped["name"], grouped["platform"], grouped["growth_score"], grouped["date"])
+    ]
+
+
+def read_trends(path: str, country: Optional[str] = None) -> List[Dict]:
+    """
+    Read trend records from a pipeline output file.
+
+    Args:
+        path (str): Trends JSON ({"trends": [...]} or a list), trends CSV, or analyzed videos CSV
+        country (str): Country for trends derived from videos
+
+    Returns:
+        List[Dict]: Trend records
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        return list(data["trends"] if isinstance(data, dict) else data)
+
+    import pandas as pd
+    df = pd.read_csv(path)
+    if "growth_score" in df.columns:
+        df = df[list(TREND_FIELDS)].astype(object).where(df.notna(), None)
+        return df.to_dict("records")
+    return trends_from_videos(df, country)
+
+
+class TrendStore:
+    """
+    Trend records with precomputed top-k indexes per country, type and platform.
+
+    Args:
+        source_path (str): Pipeline output to load (see read_trends); optional
+        seed (Iterable[Dict]): Records kept for the (type, country) pairs the
+            source does not cover (all of them when it is missing or empty)
+        country (str): Country for trends derived from videos (None: country-less)
+        min_refresh_interval (float): Seconds between source modification checks
+    """
+
+    def __init__(self, source_path: Optional[str] = None, seed: Iterable[Dict] = (),
+                 country: Optional[str] = None, min_refresh_interval: float = 30.0):
+        self.source_path = source_path
+        self.seed = [dict(trend) for trend in seed]
+        self.country = country
+        self.min_refresh_interval = min_refresh_interval
+        self._records: Dict[Tuple, Dict] = {}
+        self._indexes: Dict[Tuple[str, str, str], List[Tuple]] = {}
+        self._lock = threading.Lock()
+        self._source_mtime = None
+        self._last_check = 0.0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def _index_keys(trend: Dict) -> Iterable[Tuple[str, str, str]]:
+        return product((trend["country"], ANY), (trend["type"], ANY), (trend["platform"], ANY))
+
+    @staticmethod
+    def _entry(key: Tuple, trend: Dict) -> Tuple:
+        # Highest growth first; ties broken by key for a stable order (a
+        # country-less key compares as country '')
+        return (-float(trend["growth_score"] or 0), tuple(part or "" for part in key), key)
+
+    def _insert(self, key: Tuple, trend: Dict):
+        entry = self._entry(key, trend)
+        for index_key in self._index_keys(trend):
+            insort(self._indexes.setdefault(index_key, []), entry)
+
+    def _remove(self, key: Tuple, trend: Dict):
+        entry = self._entry(key, trend)
+        for index_key in self._index_keys(trend):
+            index = self._indexes[index_key]
+            del index[bisect_left(index, entry)]
+            if not index:
+                del self._indexes[index_key]
+
+    def upsert(self, trends: Iterable[Dict]) -> int:
+        """
+        Add or update trends, touching only the indexes of changed records.
+
+        Args:
+            trends (Iterable[Dict]): Trend records
+
+        Returns:
+            int: Number of records added or changed
+        """
+        changed = 0
+        with self._lock:
+            if not self._records:
+                return self._bulk_load(trends)
+            for trend in trends:
+                trend = {field: trend.get(field) for field in TREND_FIELDS}
+                key = trend_key(trend)
+                current = self._records.get(key)
+                if current == trend:
+                    continue
+                if current is not None:
+                    self._remove(key, current)
+                self._records[key] = trend
+                self._insert(key, trend)
+                changed += 1
+        return changed
+
+    def _bulk_load(self, trends: Iterable[Dict]) -> int:
+        # Initial load: sort each index once instead of inserting one by one
+        for trend in trends:
+            trend = {field: trend.get(field) for field in TREND_FIELDS}
+            self._records[trend_key(trend)] = trend
+        for key, trend in self._records.items():
+            entry = self._entry(key, trend)
+            for index_key in self._index_keys(trend):
+                self._indexes.setdefault(index_key, []).append(entry)
+        for index in self._indexes.values():
+            index.sort()
+        return len(self._records)
+
+    def remove(self, keys: Iterable[Tuple]) -> int:
+        """
+        Drop trends by key (see trend_key).
+
+        Returns:
+            int: Number of records removed
+        """
+        removed = 0
+        with self._lock:
+            for key in keys:
+                trend = self._records.pop(key, None)
+                if trend is not None:
+                    self._remove(key, trend)
+                    removed += 1
+        return removed
+
+    def replace(self, trends: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Make the store hold exactly `trends`, applying only the difference.
+
+        Returns:
+            Dict[str, int]: Counts of 'changed' and 'removed' records
+        """
+        trends = list(trends)
+        incoming = {trend_key(trend) for trend in trends}
+        removed = self.remove([key for key in list(self._records) if key not in incoming])
+        return {"changed": self.upsert(trends), "removed": removed}
+
+    def refresh(self, force: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Reload the source if it changed since the last load.
+
+        Falls back to the seed records when the source is missing or empty.
+        Checks the file at most every `min_refresh_interval` seconds unless forced.
+
+        Args:
+            force (bool): Check and reload regardless of interval and mtime
+
+        Returns:
+            Dict[str, int]: Change counts, or None if nothing was reloaded
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.min_refresh_interval:
+            return None
+        self._last_check = now
+
+        mtime = None
+        if self.source_path and os.path.exists(self.source_path):
+            mtime = os.path.getmtime(self.source_path)
+        if not force and self._source_mtime is not None and mtime == self._source_mtime:
+            return None
+
+        trends = []
+        if mtime is not None:
+            try:
+                trends = read_trends(self.source_path, self.country)
+            except Exception as e:
+                print(f"Warning: Could not read trends from {self.source_path}: {e}")
+                if self._records:
+                    return None
+        self._source_mtime = mtime if mtime is not None else -1
+        return self.replace(self._with_seed(trends))
+
+    def _with_seed(self, trends: List[Dict]) -> List[Dict]:
+        # Seed records for the (type, country) pairs the source has nothing
+        # for; a country-less source type covers that type for every country
+        covered = {(trend.get("type"), trend.get("country")) for trend in trends}
+        return trends + [trend for trend in self.seed
+                         if (trend["type"], trend["country"]) not in covered and (trend["type"], None) not in covered]
+
+    def top(self, country: Optional[str] = None, type: Optional[str] = None,
+            platform: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """
+        Highest-growth trends matching the filters, in O(limit).
+
+        Country-less records match every country.
+
+        Args:
+            country (str): Country code (any if None)
+            type (str): 'audio', 'keyword' or 'hashtag' (any if None)
+            platform (str): Platform name (any if None)
+            limit (int): Number of trends to return
+
+        Returns:
+            List[Dict]: Trend records sorted by growth score, highest first
+        """
+        limit = max(0, int(limit))
+        index_key = (country or ANY, type or ANY, platform or ANY)
+        with self._lock:
+            entries = self._indexes.get(index_key, [])[:limit]
+            if country:
+                countryless = self._indexes.get((None, type or ANY, platform or ANY), [])[:limit]
+                entries = list(islice(heapq.merge(entries, countryless), limit))
+            return [dict(self._records[key]) for _, _, key in entries]
@@ -0,0 +1,266 @@
+"""
+Decoded Audio Store
+
+Decodes each audio file once into mono float32 samples at a canonical
+sample rate (16 kHz, Whisper's native rate) and keeps the result as an
+uncompressed .npy file next to the downloads. Later readers memory-map the
+file instead of running ffmpeg again, so transcription and audio feature
+extraction share one decode, and concurrent workers share the same
+page-cache pages.
+
+load() returns a read-only memory-mapped view (slicing by offset/duration
+copies nothing); a different sample rate is produced on the fly by
+polyphase resampling of just the requested span.
+
+Only samples() writes to the store; the ETL calls it for every downloaded
+file it transcribes. A load() of a span of a file that has no decode yet
+(e.g. an API request scoring an arbitrary file) decodes just that span in
+memory and stores nothing, so scoring never fills the disk with full-length
+decodes.
+
+Decoding uses the stdlib wave module for PCM WAV files and ffmpeg for
+everything else (falling back to librosa when ffmpeg is not installed).
+"""
+
+import os
+import subprocess
+import threading
+import wave
+from math import gcd
+from typing import Dict, Optional
+
+import numpy as np
+
+from ml.prediction_cache import audio_fingerprint
+
+SAMPLE_RATE = 16000
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "pipeline/audios/decoded")
+
+
+class AudioDecodeError(RuntimeError):
+    """Raised when an audio file cannot be decoded by any available decoder."""
+
+
+def _decode_wav(path: str, sample_rate: int, offset: float = 0.0,
+                duration: Optional[float] = None) -> Optional[np.ndarray]:
+    try:
+        with wave.open(path, "rb") as f:
+            channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+            start = min(int(offset * rate), f.getnframes())
+            count = f.getnframes() - start
+            if duration is not None:
+                count = min(count, int(duration * rate))
+            f.setpos(start)
+            frames = f.readframes(count)
+    except (wave.Error, EOFError):
+        return None
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+    else:
+        return None
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate, sample_rate)
+
+
+def _decode_ffmpeg(path: str, sample_rate: int, offset: float = 0.0,
+                   duration: Optional[float] = None) -> Optional[np.ndarray]:
+    command = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if offset:
+        command += ["-ss", str(offset)]
+    command += ["-i", path]
+    if duration is not None:
+        command += ["-t", str(duration)]
+    command += ["-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(sample_rate), "-"]
+    try:
+        result = subprocess.run(command, capture_output=True, check=True)
+    except FileNotFoundError:
+        return None
+    except subprocess.CalledProcessError as e:
+        raise AudioDecodeError(f"ffmpeg could not decode {path}: {e.stderr.decode(errors='ignore')[-500:]}")
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def _decode_librosa(path: str, sample_rate: int, offset: float = 0.0,
+                    duration: Optional[float] = None) -> Optional[np.ndarray]:
+    try:
+        import librosa
+    except ImportError:
+        return None
+    samples, _ = librosa.load(path, sr=sample_rate, mono=True, offset=offset, duration=duration)
+    return samples
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE, offset: float = 0.0,
+                 duration: Optional[float] = None) -> np.ndarray:
+    """
+    Decode (a span of) an audio file to mono float32 samples in [-1, 1].
+
+    Args:
+        path (str): Audio file (any format ffmpeg reads)
+        sample_rate (int): Output sample rate
+        offset (float): Start of the span in seconds
+        duration (float): Length of the span in seconds (to the end if None)
+
+    Returns:
+        np.ndarray: 1-D float32 samples
+    """
+    decoders = [_decode_ffmpeg, _decode_librosa]
+    if path.lower().endswith(".wav"):
+        decoders.insert(0, _decode_wav)
+    for decoder in decoders:
+        samples = decoder(path, sample_rate, offset, duration)
+        if samples is not None:
+            return np.ascontiguousarray(samples, dtype=np.float32)
+    raise AudioDecodeError(f"No decoder available for {path} (install ffmpeg)")
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample mono samples (polyphase filter with scipy, linear interpolation without).
+
+    Args:
+        samples (np.ndarray): 1-D samples
+        orig_sr (int): Sample rate of `samples`
+        target_sr (int): Wanted sample rate
+
+    Returns:
+        np.ndarray: float32 samples at target_sr (`samples` itself if the rates match)
+    """
+    if orig_sr == target_sr or len(samples) == 0:
+        return samples
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        length = int(round(len(samples) * target_sr / orig_sr))
+        positions = np.arange(length) * (orig_sr / target_sr)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    divisor = gcd(orig_sr, target_sr)
+    return resample_poly(samples, target_sr // divisor, orig_sr // divisor).astype(np.float32)
+
+
+class AudioStore:
+    """
+    Decode-once cache of audio files as memory-mapped float32 arrays.
+
+    Args:
+        cache_dir (str): Directory for the decoded .npy files
+        sample_rate (int): Canonical sample rate of the stored samples
+    """
+
+    def __init__(self, cache_dir: str = AUDIO_CACHE_DIR, sample_rate: int = SAMPLE_RATE):
+        self.cache_dir = cache_dir
+        self.sample_rate = sample_rate
+        self.decodes = 0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def cache_path(self, audio_path: str) -> Optional[str]:
+        """
+        Path of the decoded samples, keyed by the file's content hash.
+
+        Returns:
+            str: The .npy path, or None for a file without a content hash
+            (too large to fingerprint or unreadable, see audio_fingerprint)
+        """
+        fingerprint = audio_fingerprint(audio_path)
+        if not fingerprint or not fingerprint.startswith("sha1:"):
+            return None
+        return os.path.join(self.cache_dir, f"{fingerprint[len('sha1:'):]}_{self.sample_rate}.npy")
+
+    @staticmethod
+    def _check(audio_path: str):
+        # Directories, FIFOs and devices are never decoded (a read could block)
+        if not os.path.isfile(audio_path):
+            raise FileNotFoundError(audio_path)
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def samples(self, audio_path: str) -> np.ndarray:
+        """
+        All samples of a file at the canonical rate, decoding it on first use.
+
+        Concurrent callers for the same file wait for a single decode. A file
+        without a content hash is decoded without being stored.
+
+        Args:
+            audio_path (str): Audio file
+
+        Returns:
+            np.ndarray: Read-only memory-mapped float32 samples
+
+        Raises:
+            FileNotFoundError: if the path is not a regular file
+        """
+        self._check(audio_path)
+        path = self.cache_path(audio_path)
+        if path is None:
+            return decode_audio(audio_path, self.sample_rate)
+        with self._lock(path):
+            if not os.path.exists(path):
+                decoded = decode_audio(audio_path, self.sample_rate)
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, decoded)
+                os.replace(tmp_path, path)
+                self.decodes += 1
+        return np.load(path, mmap_mode="r")
+
+    def load(self, audio_path: str, sr: Optional[int] = None, offset: float = 0.0,
+             duration: Optional[float] = None) -> np.ndarray:
+        """
+        Samples of (a span of) a file, like librosa.load(path, sr, offset, duration).
+
+        Served from the stored decode when the file has one. Otherwise a
+        bounded span (`duration` given) is decoded on its own and not
+        stored; only a full read decodes and stores the whole file.
+
+        Args:
+            audio_path (str): Audio file
+            sr (int): Wanted sample rate (the canonical rate if None)
+            offset (float): Start of the span in seconds
+            duration (float): Length of the span in seconds (to the end if None)
+
+        Returns:
+            np.ndarray: A zero-copy view at the canonical rate, otherwise a
+            resampled copy of the span
+        """
+        if duration is not None:
+            self._check(audio_path)
+            path = self.cache_path(audio_path)
+            if path is None or not os.path.exists(path):
+                return decode_audio(audio_path, sr or self.sample_rate, offset, duration)
+        samples = self.samples(audio_path)
+        start = int(offset * self.sample_rate)
+        stop = None if duration is None else start + int(duration * self.sample_rate)
+        return resample(samples[start:stop], self.sample_rate, sr or self.sample_rate)
+
+    def duration(self, audio_path: str) -> float:
+        """Length of a file in seconds."""
+        return len(self.samples(audio_path)) / self.sample_rate
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def shared_store() -> AudioStore:
+    """Process-wide AudioStore (AUDIO_CACHE_DIR, 16 kHz)."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = AudioStore()
+        return _shared_store
+
+
+def set_shared_store(store: AudioStore):
+    """Replace the process-wide store (e.g. with one in a temporary directory)."""
+    global _shared_store
+    with _shared_lock:
+        _shared_store = store
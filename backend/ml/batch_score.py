@@ -0,0 +1,299 @@
+"""
+Batch Trend Success Scoring
+
+Scores a large file of candidate recipes offline. The input is a CSV or
+Parquet file with one recipe per row: keyword, audio_path, platform and
+target_audience (a list, or labels separated by '|' or ',').
+
+The input is read in shards of `shard_rows` rows, which are scored in a
+process pool. Each worker loads the model (and the sentiment pipeline) once
+in its initializer and keeps its sentiment, audio feature and prediction
+caches across shards, so keywords and audio tracks shared by many variants
+are analyzed once per worker; decoded audio is shared between workers and
+runs through the on-disk audio store.
+
+Every shard is written as its own Parquet part (part-000000.parquet, ...)
+into the output directory, atomically, so the parts double as checkpoints:
+re-running the same command skips the shards whose part exists and scores
+only the rest. _manifest.json records the input and settings; resuming
+with a different input, shard size or model is refused unless --restart is
+given. At most two shards per worker are in flight, so memory stays flat
+whatever the input size.
+
+Usage (from the backend directory):
+    python -m ml.batch_score candidates.parquet scores/ --workers 8
+    python -m ml.batch_score candidates.csv scores/ --shard-rows 50000   # resumes if interrupted
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+sys.path.append(".")
+
+from ml.trend_success import TrendSuccessPredictor, MODEL_PATH, LEGACY_MODEL_PATH
+from ml.model_artifact import MANIFEST_FILE, hash_file
+
+INPUT_COLUMNS = ("keyword", "audio_path", "platform", "target_audience")
+DEFAULT_SHARD_ROWS = 20_000
+# Recipes per predict_many() call inside a shard
+SCORE_BATCH = 1_000
+MANIFEST = "_manifest.json"
+
+
+def parse_audience(value) -> List[str]:
+    """
+    Audience labels from a list, a list repr ("['Gen-Z']") or 'Gen-Z|Millennials'.
+    """
+    if isinstance(value, (list, tuple)):
+        return [str(label) for label in value]
+    if hasattr(value, "tolist"):
+        return [str(label) for label in value.tolist()]
+    if value is None or (isinstance(value, float) and pd.isna(value)) or not str(value).strip():
+        return ["All Ages"]
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            return [str(label) for label in ast.literal_eval(text)]
+        except (ValueError, SyntaxError):
+            pass
+    separator = "|" if "|" in text else ","
+    return [label.strip() for label in text.split(separator) if label.strip()]
+
+
+def read_shards(path: str, shard_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream the input file as DataFrames of `shard_rows` rows (the last may be shorter).
+
+    Args:
+        path (str): .csv or .parquet file
+        shard_rows (int): Rows per shard
+
+    Returns:
+        Iterator[pd.DataFrame]: Shards with the INPUT_COLUMNS present in the file
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        columns = [column for column in INPUT_COLUMNS if column in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=shard_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        reader = pd.read_csv(path, chunksize=shard_rows, dtype=str, keep_default_na=False,
+                             usecols=lambda column: column in INPUT_COLUMNS)
+        for chunk in reader:
+            yield chunk
+
+
+def count_rows(path: str) -> Optional[int]:
+    """Row count from the Parquet footer (None for CSV, which would need a full read)."""
+    if not path.endswith(".parquet"):
+        return None
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def part_path(output_dir: str, shard: int) -> str:
+    return os.path.join(output_dir, f"part-{shard:06d}.parquet")
+
+
+# Per-process predictor, loaded once by the pool initializer
+_predictor: Optional[TrendSuccessPredictor] = None
+
+
+def init_worker(model_path: str):
+    """Pool initializer: load the model and the NLP pipeline once per worker."""
+    global _predictor
+    _predictor = TrendSuccessPredictor()
+    _predictor.warm_up(model_path)
+    if not _predictor.is_trained:
+        raise RuntimeError(f"Could not load a model from {model_path}")
+
+
+def score_shard(shard: int, df: pd.DataFrame, output_dir: str) -> Dict:
+    """
+    Score one shard and write its Parquet part atomically.
+
+    Args:
+        shard (int): Shard number (names the part file)
+        df (pd.DataFrame): Recipes (INPUT_COLUMNS)
+        output_dir (str): Output directory
+
+    Returns:
+        Dict: shard, rows, seconds and the worker's cache hit ratios
+    """
+    start = time.perf_counter()
+    requests = [{
+        "keyword": str(row.get("keyword") or ""),
+        "audio_path": row.get("audio_path") or None,
+        "platform": row.get("platform") or "TikTok",
+        "target_audience": parse_audience(row.get("target_audience")),
+    } for row in df.to_dict("records")]
+
+    results = []
+    for offset in range(0, len(requests), SCORE_BATCH):
+        results.extend(_predictor.predict_many(requests[offset:offset + SCORE_BATCH]))
+
+    first_row = int(df.index[0]) if len(df) else 0
+    out = pd.DataFrame({
+        "row": range(first_row, first_row + len(df)),
+        "keyword": [request["keyword"] for request in requests],
+        "audio_path": [request["audio_path"] for request in requests],
+        "platform": [request["platform"] for request in requests],
+        "target_audience": ["|".join(request["target_audience"]) for request in requests],
+        "success_score": [result["success_score"] for result in results],
+        "confidence": [result["confidence"] for result in results],
+        "predicted_demographics": [result["input_analysis"]["predicted_demographics"] for result in results],
+        "top_recommendation": [(result["recommendations"] or [None])[0] for result in results],
+        "recommendations": [list(result["recommendations"]) for result in results],
+    })
+
+    path = part_path(output_dir, shard)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    out.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return {
+        "shard": shard,
+        "rows": len(out),
+        "seconds": time.perf_counter() - start,
+        "sentiment_hit_ratio": _predictor.sentiment_cache.stats()["hit_ratio"],
+        "audio_hit_ratio": _predictor.audio_feature_cache.stats()["hit_ratio"],
+    }
+
+
+def model_hash(model_path: str) -> Optional[str]:
+    """Content hash identifying the model load_model() would use."""
+    if os.path.isdir(model_path):
+        return hash_file(os.path.join(model_path, MANIFEST_FILE))
+    if not os.path.exists(model_path):
+        model_path = LEGACY_MODEL_PATH
+    return hash_file(model_path)
+
+
+def _manifest(input_path: str, shard_rows: int, model_path: str) -> Dict:
+    stat = os.stat(input_path)
+    return {
+        "input": os.path.abspath(input_path),
+        "input_size": stat.st_size,
+        "input_mtime": stat.st_mtime,
+        "shard_rows": shard_rows,
+        "model": model_hash(model_path),
+    }
+
+
+def check_manifest(output_dir: str, manifest: Dict, restart: bool) -> int:
+    """
+    Create, validate or reset the output directory's manifest.
+
+    Returns:
+        int: Number of existing parts that will be kept
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    parts = [name for name in os.listdir(output_dir) if name.startswith("part-") and name.endswith(".parquet")]
+    if os.path.exists(manifest_path) and not restart:
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            changed = sorted(key for key in manifest if previous.get(key) != manifest[key])
+            raise SystemExit(f"Error: {output_dir} holds a run with a different {', '.join(changed)}; "
+                             f"use --restart to discard it")
+    elif parts and not restart:
+        raise SystemExit(f"Error: {output_dir} has parts but no {MANIFEST}; use --restart to discard them")
+    if restart:
+        for name in parts:
+            os.remove(os.path.join(output_dir, name))
+        parts = []
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return len(parts)
+
+
+def run(input_path: str, output_dir: str, workers: int = os.cpu_count() or 1,
+        shard_rows: int = DEFAULT_SHARD_ROWS, model_path: str = MODEL_PATH, restart: bool = False) -> Dict:
+    """
+    Score every shard of the input that has no part yet.
+
+    Args:
+        input_path (str): Candidate recipes (.csv or .parquet)
+        output_dir (str): Directory of Parquet parts
+        workers (int): Scoring processes
+        shard_rows (int): Rows per shard / part
+        model_path (str): Model artifact
+        restart (bool): Discard existing parts instead of resuming
+
+    Returns:
+        Dict: shards scored and skipped, rows scored, seconds and rows per second
+    """
+    kept = check_manifest(output_dir, _manifest(input_path, shard_rows, model_path), restart)
+    total_rows = count_rows(input_path)
+    if kept:
+        print(f"✓ Resuming: {kept} parts already scored")
+
+    start = time.perf_counter()
+    scored = skipped = rows = 0
+    max_in_flight = 2 * max(1, workers)
+    with ProcessPoolExecutor(max(1, workers), initializer=init_worker, initargs=(model_path,)) as pool:
+        in_flight = set()
+        row_offset = 0
+
+        def drain(block: bool):
+            nonlocal scored, rows
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED) if block else (
+                {future for future in in_flight if future.done()}, None)
+            for future in done:
+                in_flight.discard(future)
+                stats = future.result()
+                scored += 1
+                rows += stats["rows"]
+                elapsed = time.perf_counter() - start
+                progress = f"/{total_rows:,}" if total_rows else ""
+                print(f"📊 part {stats['shard']:06d}: {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+                      f"({rows:,}{progress} rows, {rows / elapsed:,.0f} rows/s, "
+                      f"sentiment hits {stats['sentiment_hit_ratio']:.0%}, audio hits {stats['audio_hit_ratio']:.0%})")
+
+        for shard, df in enumerate(read_shards(input_path, shard_rows)):
+            df.index = range(row_offset, row_offset + len(df))
+            row_offset += len(df)
+            if os.path.exists(part_path(output_dir, shard)):
+                skipped += 1
+                continue
+            while len(in_flight) >= max_in_flight:
+                drain(block=True)
+            in_flight.add(pool.submit(score_shard, shard, df, output_dir))
+            drain(block=False)
+        while in_flight:
+            drain(block=True)
+
+    seconds = time.perf_counter() - start
+    return {"shards_scored": scored, "shards_skipped": skipped, "rows": rows, "seconds": round(seconds, 2),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score a file of candidate recipes with the trend success model")
+    parser.add_argument("input", help="CSV or Parquet file with keyword, audio_path, platform, target_audience")
+    parser.add_argument("output", help="Directory for the Parquet parts (re-run to resume)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS, help="Rows per shard / part file")
+    parser.add_argument("--model", default=MODEL_PATH, help="Model artifact path")
+    parser.add_argument("--restart", action="store_true", help="Discard existing parts and start over")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"Input not found: {args.input}")
+    summary = run(args.input, args.output, args.workers, args.shard_rows, args.model, args.restart)
+    print(f"✓ Scored {summary['rows']:,} rows in {summary['shards_scored']} parts "
+          f"({summary['shards_skipped']} already done) in {summary['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
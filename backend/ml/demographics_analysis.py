@@ -43,6 +43,28 @@ def load_video_data(file_path):
         print(f"Error loading data: {e}")
         sys.exit(1)
 
+GEN_Z_KEYWORDS = ['lol', 'omg', 'lit', 'fam', 'bae', 'on fleek', 'vibe', 'aesthetic', 'challenge', 'dance', 'tiktok', 'no cap', 'bet', 'vibe check', 'main character', 'simp', 'stan', 'rizz', 'bussin', 'sheesh', 'slay', 'ate', 'left no crumbs']
+MILLENNIAL_KEYWORDS = ['adulting', 'doggo', 'i can\'t even', 'yas', 'basic', 'squad', 'goals', 'fomo', 'avocado toast', 'side hustle', 'gig economy', 'life hack', 'business', 'finance', 'investing', 'marketing', 'tutorial', 'guide', 'conference', 'webinar']
+
+def guess_age_group(lower_text):
+    """
+    Guess the audience age group from lower-cased text using keyword heuristics.
+    
+    Args:
+        lower_text (str): Lower-cased text to score
+        
+    Returns:
+        str: 'gen z', 'millenials' or 'all age'
+    """
+    gen_z_score = sum(1 for keyword in GEN_Z_KEYWORDS if keyword in lower_text)
+    millennial_score = sum(1 for keyword in MILLENNIAL_KEYWORDS if keyword in lower_text)
+
+    if gen_z_score > millennial_score:
+        return 'gen z'
+    elif millennial_score > gen_z_score:
+        return 'millenials'
+    return 'all age'
+
 def analyze_demographics(row):
     """
     Analyze text from a video's data to infer demographics.
@@ -73,21 +95,7 @@ def analyze_demographics(row):
         language = 'unknown'
 
     # --- Age Group Guessing (Heuristic-based) ---
-    age_group_guess = 'all age'
-    gen_z_keywords = ['lol', 'omg', 'lit', 'fam', 'bae', 'on fleek', 'vibe', 'aesthetic', 'challenge', 'dance', 'tiktok', 'no cap', 'bet', 'vibe check', 'main character', 'simp', 'stan', 'rizz', 'bussin', 'sheesh', 'slay', 'ate', 'left no crumbs']
-    millennial_keywords = ['adulting', 'doggo', 'i can\'t even', 'yas', 'basic', 'squad', 'goals', 'fomo', 'avocado toast', 'side hustle', 'gig economy', 'life hack', 'business', 'finance', 'investing', 'marketing', 'tutorial', 'guide', 'conference', 'webinar']
-
-    lower_text = full_text.lower()
-    
-    gen_z_score = sum(1 for keyword in gen_z_keywords if keyword in lower_text)
-    millennial_score = sum(1 for keyword in millennial_keywords if keyword in lower_text)
-
-    if gen_z_score > millennial_score:
-        age_group_guess = 'gen z'
-    elif millennial_score > gen_z_score:
-        age_group_guess = 'millenials'
-    
-    return age_group_guess
+    return guess_age_group(full_text.lower())
 
 
 def save_results(df, output_path):
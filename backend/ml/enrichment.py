@@ -0,0 +1,340 @@
+"""
+Video Enrichment Stage
+
+This script enriches the combined TikTok/YouTube DataFrame in a single pass.
+Each row's text (transcription, description and tags) is normalized once into
+a RowText and handed to every registered enricher, so sentiment, language and
+demographic bucket are computed in one walk over the data instead of one full
+pass (and one DataFrame copy) per analysis module.
+
+New enrichers subclass Enricher, declare the columns they produce and are
+passed to enrich() alongside (or instead of) the defaults.
+"""
+
+import ast
+import datetime
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ml.demographics_analysis import guess_age_group
+from ml.schema import apply_schema, to_csv_frame
+
+
+@dataclass
+class RowText:
+    """Normalized text of a single video, built once per row."""
+    transcription: str
+    description: str
+    tags: List[str]
+    tags_text: str
+    full_text: str
+    lower_text: str
+
+
+def parse_tags(tags) -> List[str]:
+    """
+    Normalize a tags value to a list of strings.
+
+    Tags arrive as Python lists from transform() and as their string repr
+    when a frame has been round-tripped through CSV.
+
+    Args:
+        tags: List, list repr string, or missing value
+
+    Returns:
+        List[str]: Tags as a list (empty when missing or unparsable)
+    """
+    if isinstance(tags, list):
+        return tags
+    if isinstance(tags, (tuple, np.ndarray)):
+        return list(tags)
+    if isinstance(tags, str) and tags:
+        try:
+            parsed = ast.literal_eval(tags)
+        except (ValueError, SyntaxError):
+            return tags.split('|')
+        return list(parsed) if isinstance(parsed, (list, tuple)) else []
+    return []
+
+
+def _as_text(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value)
+
+
+def build_row_text(transcription, description, tags) -> RowText:
+    """
+    Build the normalized text shared by all enrichers for one row.
+
+    Args:
+        transcription: Raw transcription value
+        description: Raw description value
+        tags: Raw tags value
+
+    Returns:
+        RowText: Normalized text fields
+    """
+    transcription = _as_text(transcription)
+    description = _as_text(description)
+    tag_list = parse_tags(tags)
+    tags_text = ' '.join(str(tag) for tag in tag_list)
+    full_text = ' '.join(filter(None, [transcription, description, tags_text])).strip()
+    return RowText(
+        transcription=transcription,
+        description=description,
+        tags=tag_list,
+        tags_text=tags_text,
+        full_text=full_text,
+        lower_text=full_text.lower()
+    )
+
+
+class Enricher:
+    """
+    Base class for per-row enrichers.
+
+    Subclasses list the output columns in `columns`, load any heavy resources
+    in setup() and return one value per column from enrich().
+    """
+    name: str = 'enricher'
+    columns: tuple = ()
+
+    def setup(self):
+        """Load models or lexicons once before the pass starts."""
+
+    def enrich(self, text: RowText) -> Dict[str, object]:
+        """
+        Compute this enricher's columns for one row.
+
+        Args:
+            text (RowText): Normalized text of the row
+
+        Returns:
+            Dict[str, object]: Value for each column in `columns`
+        """
+        raise NotImplementedError
+
+
+class SentimentEnricher(Enricher):
+    """
+    Sentiment of the transcription and of the joined tags.
+
+    Args:
+        backend (str): 'vader' (default) or 'transformer'
+        chunk_size (int): Max characters per transformer chunk
+        model (str): Transformer model name or local path (pipeline default if None)
+    """
+    name = 'sentiment'
+    columns = ('sentiment_transcription', 'sentiment_tags')
+
+    def __init__(self, backend: str = 'vader', chunk_size: int = 512, model: str = None):
+        if backend not in ('vader', 'transformer'):
+            raise ValueError(f"Unknown sentiment backend: {backend}")
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.model = model
+        self._analyzer = None
+
+    def setup(self):
+        if self._analyzer is not None:
+            return
+        if self.backend == 'vader':
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            self._analyzer = SentimentIntensityAnalyzer()
+        else:
+            from transformers import pipeline
+            self._analyzer = pipeline("sentiment-analysis", model=self.model)
+
+    def score(self, text: str) -> float:
+        """
+        Score a piece of text.
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            float: Sentiment score (-1 to 1)
+        """
+        if not text:
+            return 0.0
+        if self.backend == 'vader':
+            return self._analyzer.polarity_scores(text)['compound']
+
+        try:
+            chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+            mapped_scores = []
+            for res in self._analyzer(chunks):
+                label = res["label"].upper()
+                if "POSITIVE" in label:
+                    mapped_scores.append(res["score"])
+                elif "NEGATIVE" in label:
+                    mapped_scores.append(-res["score"])
+                else:
+                    mapped_scores.append(0.0)
+            return float(np.mean(mapped_scores)) if mapped_scores else 0.0
+        except Exception as e:
+            print(f"Error analyzing text: {e}")
+            return 0.0
+
+    def enrich(self, text: RowText) -> Dict[str, object]:
+        return {
+            'sentiment_transcription': self.score(text.transcription),
+            'sentiment_tags': self.score(text.tags_text)
+        }
+
+
+class DemographicsEnricher(Enricher):
+    """Heuristic audience age group ('gen z', 'millenials', 'all age' or 'unknown')."""
+    name = 'demographics'
+    columns = ('demographics',)
+
+    def enrich(self, text: RowText) -> Dict[str, object]:
+        if not text.full_text:
+            return {'demographics': 'unknown'}
+        return {'demographics': guess_age_group(text.lower_text)}
+
+
+class LanguageEnricher(Enricher):
+    """Detected language code of the combined text ('unknown' if undetectable)."""
+    name = 'language'
+    columns = ('language',)
+
+    def setup(self):
+        from langdetect import detect, DetectorFactory
+        from langdetect.lang_detect_exception import LangDetectException
+        # Seed the detector for consistent results
+        DetectorFactory.seed = 0
+        self._detect = detect
+        self._error = LangDetectException
+
+    def enrich(self, text: RowText) -> Dict[str, object]:
+        if not text.full_text:
+            return {'language': 'unknown'}
+        try:
+            return {'language': self._detect(text.full_text)}
+        except self._error:
+            # This can happen for very short or ambiguous text
+            return {'language': 'unknown'}
+
+
+def default_enrichers(sentiment_backend: str = 'vader') -> List[Enricher]:
+    """
+    Build the enrichers used by the ETL load step.
+
+    Args:
+        sentiment_backend (str): 'vader' or 'transformer'
+
+    Returns:
+        List[Enricher]: Sentiment, demographics and language enrichers
+    """
+    return [SentimentEnricher(sentiment_backend), DemographicsEnricher(), LanguageEnricher()]
+
+
+def _column_or_none(df: pd.DataFrame, name: str) -> Iterable:
+    if name in df.columns:
+        return df[name]
+    return [None] * len(df)
+
+
+def enrich(df: pd.DataFrame, enrichers: Optional[List[Enricher]] = None,
+           timings: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Run all enrichers over the DataFrame in a single pass.
+
+    New columns are added to `df` in place; no copy of the frame is made.
+    A batch `timestamp` column is inserted after the sentiment columns to keep
+    the analyzed_videos column order stable.
+
+    Args:
+        df (pd.DataFrame): Combined video data from transform()
+        enrichers (List[Enricher]): Enrichers to run (defaults to default_enrichers())
+        timings (Dict[str, float]): If given, seconds spent in each enricher
+            (setup included) are accumulated into it by enricher name
+
+    Returns:
+        pd.DataFrame: The same DataFrame with enrichment columns added
+    """
+    if enrichers is None:
+        enrichers = default_enrichers()
+
+    columns = [column for enricher in enrichers for column in enricher.columns]
+    if len(columns) != len(set(columns)):
+        raise ValueError(f"Enrichers produce overlapping columns: {columns}")
+
+    timed = timings is not None
+    for enricher in enrichers:
+        start = time.perf_counter() if timed else 0.0
+        enricher.setup()
+        if timed:
+            timings[enricher.name] = timings.get(enricher.name, 0.0) + time.perf_counter() - start
+
+    outputs = {column: [] for column in columns}
+    rows = zip(
+        _column_or_none(df, 'transcription'),
+        _column_or_none(df, 'description'),
+        _column_or_none(df, 'tags')
+    )
+    for transcription, description, tags in rows:
+        text = build_row_text(transcription, description, tags)
+        for enricher in enrichers:
+            start = time.perf_counter() if timed else 0.0
+            values = enricher.enrich(text)
+            if timed:
+                timings[enricher.name] += time.perf_counter() - start
+            for column in enricher.columns:
+                outputs[column].append(values[column])
+
+    # Enrichment columns in the compact schema (categorical labels, float32 scores)
+    compact = apply_schema(pd.DataFrame(outputs, index=df.index))
+    for column in columns:
+        df[column] = compact[column]
+
+    timestamp = datetime.datetime.now()
+    if 'timestamp' in df.columns:
+        df['timestamp'] = timestamp
+    elif 'sentiment_tags' in df.columns:
+        df.insert(df.columns.get_loc('sentiment_tags') + 1, 'timestamp', timestamp)
+    else:
+        df['timestamp'] = timestamp
+
+    return df
+
+
+def main(df, enrichers=None, output_path=None, timings=None):
+    """
+    Enrich the combined video DataFrame with sentiment, demographics and language.
+
+    Args:
+        df (pd.DataFrame): Combined video data from transform()
+        enrichers (List[Enricher]): Enrichers to run (defaults to default_enrichers())
+        output_path (str): Optional CSV path to save the enriched data
+        timings (Dict[str, float]): Optional per-enricher timings, see enrich()
+
+    Returns:
+        pd.DataFrame: The enriched DataFrame
+    """
+    trans_count = df['transcription'].notna().sum() if 'transcription' in df.columns else 0
+    print(f"📊 Transcription data overview:")
+    print(f"   Records with transcriptions: {trans_count}/{len(df)}")
+    print(f"   Records without transcriptions: {len(df) - trans_count}/{len(df)}")
+
+    print("Starting enrichment...")
+    df = enrich(df, enrichers, timings)
+    print(f"✓ Enrichment completed for {len(df)} records")
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        to_csv_frame(df).to_csv(output_path, index=False)
+        print(f"✓ Results saved to {output_path}")
+
+    return df
+
+
+if __name__ == "__main__":
+    print("⚠️ This script is meant to be imported and run with a DataFrame (not standalone).")
@@ -0,0 +1,297 @@
+"""
+Heavy-Hitter Tag Sketch
+
+Fixed-memory approximate top-k counting of tags with the Space-Saving
+algorithm (Metwally et al.). The sketch monitors at most `capacity` tags;
+every reported count overestimates the true count by at most its recorded
+error, and every error is at most N / capacity for a stream of N tags, so
+any tag occurring more than N / capacity times is guaranteed to be kept.
+
+Sketches are mergeable (Agarwal et al., "Mergeable Summaries"), so daily or
+per-shard sketches can be combined, and serialize to JSON for checkpoints.
+The ETL load keeps one sketch per day under ml/data/tag_sketches; each
+checkpoint also records the ids of the videos counted that day, so a
+retried or re-run load does not count their tags twice.
+"""
+
+import datetime
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ml.enrichment import parse_tags
+
+SKETCH_DIR = "ml/data/tag_sketches"
+SKETCH_VERSION = 1
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch.
+
+    Args:
+        capacity (int): Maximum number of monitored items (memory bound);
+            counts are overestimated by at most total / capacity
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        # item -> [count, error]; the heap holds (count, item) with stale entries skipped lazily
+        self.counters: Dict[str, List[int]] = {}
+        self._heap: List[Tuple[int, str]] = []
+        # Ids of the records already counted, for idempotent checkpoint updates
+        self.seen: set = set()
+
+    @classmethod
+    def from_error(cls, epsilon: float) -> "SpaceSaving":
+        """
+        Sketch whose counts are within epsilon * total of the true counts.
+
+        Args:
+            epsilon (float): Relative error bound, e.g. 0.001
+
+        Returns:
+            SpaceSaving: Sketch with capacity ceil(1 / epsilon)
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be between 0 and 1")
+        return cls(math.ceil(1 / epsilon))
+
+    def __len__(self) -> int:
+        return len(self.counters)
+
+    @property
+    def error_bound(self) -> float:
+        """Maximum overestimate of any reported count."""
+        return self.total / self.capacity
+
+    def _min_counter(self) -> Tuple[int, str]:
+        # Skip heap entries whose count changed since they were pushed
+        while True:
+            count, item = self._heap[0]
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count, item
+            heapq.heappop(self._heap)
+
+    def _push(self, item: str, count: int):
+        heapq.heappush(self._heap, (count, item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(counter[0], key) for key, counter in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, item: str, weight: int = 1):
+        """
+        Count `weight` occurrences of `item`.
+
+        Args:
+            item (str): Item to count
+            weight (int): Number of occurrences
+        """
+        self.total += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[item] = [weight, 0]
+        else:
+            # Replace the least-counted item; the newcomer inherits its count as error
+            min_count, min_item = self._min_counter()
+            heapq.heappop(self._heap)
+            del self.counters[min_item]
+            counter = self.counters[item] = [min_count + weight, min_count]
+        self._push(item, counter[0])
+
+    def update_many(self, items: Iterable[str]):
+        """
+        Count a batch of items (pre-aggregated, so repeated items cost one update).
+
+        Args:
+            items (Iterable[str]): Items to count
+        """
+        for item, weight in Counter(items).most_common():
+            self.update(item, weight)
+
+    def estimate(self, item: str) -> Tuple[int, int]:
+        """
+        Estimated count of an item.
+
+        Returns:
+            Tuple[int, int]: (count, error); the true count is in [count - error, count].
+            Unmonitored items return (0, minimum monitored count) when the sketch is full
+        """
+        counter = self.counters.get(item)
+        if counter is not None:
+            return counter[0], counter[1]
+        if len(self.counters) < self.capacity or not self.counters:
+            return 0, 0
+        return 0, self._min_counter()[0]
+
+    def top(self, k: int = 10) -> List[Dict[str, object]]:
+        """
+        The k items with the highest estimated counts.
+
+        Args:
+            k (int): Number of items
+
+        Returns:
+            List[Dict]: item, count, error and `guaranteed` (its lower bound
+            beats the (k+1)-th count, so it is certainly in the true top k)
+        """
+        ranked = heapq.nlargest(k + 1, self.counters.items(), key=lambda entry: (entry[1][0], entry[0]))
+        threshold = ranked[k][1][0] if len(ranked) > k else 0
+        return [
+            {"item": item, "count": count, "error": error, "guaranteed": count - error >= threshold}
+            for item, (count, error) in ranked[:k]
+        ]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Combine two sketches into a new one with this sketch's capacity.
+
+        Items missing from a full sketch are credited with its minimum count
+        (as error), which keeps the Space-Saving guarantees for the combined stream.
+
+        Args:
+            other (SpaceSaving): Sketch of another shard or day
+
+        Returns:
+            SpaceSaving: Merged sketch
+        """
+        def floor(sketch):
+            if len(sketch.counters) < sketch.capacity or not sketch.counters:
+                return 0
+            return min(counter[0] for counter in sketch.counters.values())
+
+        floor_self, floor_other = floor(self), floor(other)
+        combined = {}
+        for item in self.counters.keys() | other.counters.keys():
+            count_a, error_a = self.counters.get(item, (floor_self, floor_self))
+            count_b, error_b = other.counters.get(item, (floor_other, floor_other))
+            combined[item] = [count_a + count_b, error_a + error_b]
+
+        merged = SpaceSaving(self.capacity)
+        merged.total = self.total + other.total
+        merged.seen = self.seen | other.seen
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda entry: (entry[1][0], entry[0]))
+        merged.counters = {item: counter for item, counter in kept}
+        merged._heap = [(counter[0], item) for item, counter in kept]
+        heapq.heapify(merged._heap)
+        return merged
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": SKETCH_VERSION,
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [[item, count, error] for item, (count, error) in self.counters.items()],
+            "seen": sorted(self.seen)
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "SpaceSaving":
+        if state.get("version") != SKETCH_VERSION:
+            raise ValueError(f"Unsupported sketch version: {state.get('version')}")
+        sketch = cls(state["capacity"])
+        sketch.total = state["total"]
+        sketch.counters = {item: [count, error] for item, count, error in state["counters"]}
+        sketch._heap = [(count, item) for item, count, _ in state["counters"]]
+        heapq.heapify(sketch._heap)
+        sketch.seen = set(state.get("seen", []))
+        return sketch
+
+    def save(self, path: str):
+        """Checkpoint the sketch as JSON (atomically replacing the previous file)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, capacity: int = 1000) -> "SpaceSaving":
+        """Load a checkpoint, or start an empty sketch if there is none."""
+        if not os.path.exists(path):
+            return cls(capacity)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def frame_tags(df: pd.DataFrame) -> Iterable[str]:
+    """
+    Normalized (stripped, lower-cased) tags of the transform output.
+
+    Args:
+        df (pd.DataFrame): Rows with a 'tags' column (lists or their string repr)
+
+    Returns:
+        Iterable[str]: One entry per tag occurrence
+    """
+    if "tags" not in df or df.empty:
+        return []
+    tags = df["tags"].map(parse_tags).explode().dropna().astype(str).str.strip().str.lower()
+    return tags[tags != ""]
+
+
+def daily_sketch_path(day: datetime.date, sketch_dir: str = SKETCH_DIR) -> str:
+    return os.path.join(sketch_dir, f"tags_{day.isoformat()}.json")
+
+
+def update_daily_sketch(df: pd.DataFrame, day: Optional[datetime.date] = None,
+                        sketch_dir: str = SKETCH_DIR, capacity: int = 1000) -> SpaceSaving:
+    """
+    Add the tags of a transform output to the day's checkpointed sketch.
+
+    Videos already counted in the day's sketch (by video_id) are skipped, so
+    applying the same rows again changes nothing.
+
+    Args:
+        df (pd.DataFrame): Transform output
+        day (datetime.date): Day to file the tags under (today if None)
+        sketch_dir (str): Checkpoint directory
+        capacity (int): Capacity of a new day's sketch
+
+    Returns:
+        SpaceSaving: The updated daily sketch
+    """
+    path = daily_sketch_path(day or datetime.date.today(), sketch_dir)
+    sketch = SpaceSaving.load(path, capacity)
+    if "video_id" in df:
+        video_ids = df["video_id"].astype(str)
+        df = df[~video_ids.duplicated().to_numpy() & ~video_ids.isin(sketch.seen).to_numpy()]
+        sketch.seen.update(video_ids[df.index])
+    sketch.update_many(frame_tags(df))
+    sketch.save(path)
+    return sketch
+
+
+def top_tags(k: int = 10, days: int = 7, end: Optional[datetime.date] = None,
+             sketch_dir: str = SKETCH_DIR) -> List[Dict[str, object]]:
+    """
+    Top tags over the last `days` daily sketches, merged.
+
+    Args:
+        k (int): Number of tags
+        days (int): Days to merge, ending at `end`
+        end (datetime.date): Last day (today if None)
+        sketch_dir (str): Checkpoint directory
+
+    Returns:
+        List[Dict]: See SpaceSaving.top()
+    """
+    end = end or datetime.date.today()
+    merged = None
+    for offset in range(days):
+        path = daily_sketch_path(end - datetime.timedelta(days=offset), sketch_dir)
+        if os.path.exists(path):
+            sketch = SpaceSaving.load(path)
+            merged = sketch if merged is None else merged.merge(sketch)
+    return merged.top(k) if merged is not None else []
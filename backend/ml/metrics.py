@@ -0,0 +1,275 @@
+"""
+Latency Metrics
+
+Minimal in-process counters and latency histograms rendered in the
+Prometheus text exposition format (served by the API on /metrics).
+
+Metrics are enabled unless METRICS_ENABLED=0. When disabled, timers are a
+shared no-op context manager and observations return immediately, so the
+instrumented hot paths pay only an attribute lookup.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional, Tuple
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Seconds; covers sub-millisecond cache hits up to slow BigQuery calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _NoopTimer:
+    """Stand-in for _Timer when metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _Timer:
+    """Context manager that observes its elapsed time on a histogram."""
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram._observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+
+    Args:
+        name (str): Metric name (exposed with a '_total' suffix)
+        documentation (str): HELP text
+        labelnames (Tuple[str, ...]): Label names, values are passed to inc()
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = f"{name}_total"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram with optional labels.
+
+    Args:
+        name (str): Metric name (seconds)
+        documentation (str): HELP text
+        labelnames (Tuple[str, ...]): Label names, values are passed to time()/observe()
+        buckets (Tuple[float, ...]): Upper bounds in seconds
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def time(self, *labels: str):
+        """Context manager timing its block (a no-op when metrics are disabled)."""
+        if not ENABLED:
+            return _NOOP_TIMER
+        return _Timer(self, labels)
+
+    def observe(self, value: float, *labels: str):
+        if ENABLED:
+            self._observe(labels, value)
+
+    def _observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = {labels: ([*counts], total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+class Callback:
+    """
+    Metric whose value is read from a function at scrape time.
+
+    Args:
+        name (str): Metric name
+        documentation (str): HELP text
+        fn (Callable[[], float]): Returns the current value
+        kind (str): 'gauge' or 'counter'
+    """
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        yield f"{self.name} {_format_value(value)}"
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            str: Exposition text (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def callback(name: str, documentation: str, fn: Callable[[], float], kind: str = "gauge") -> Callback:
+    return REGISTRY.register(Callback(name, documentation, fn, kind))
+
+
+def timed(metric: Histogram, *labels: str, errors: Optional[Counter] = None):
+    """
+    Decorator timing every call of a function (and counting its exceptions).
+
+    Args:
+        metric (Histogram): Histogram to observe on
+        *labels (str): Label values for the histogram and error counter
+        errors (Counter): Incremented when the call raises (optional)
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            try:
+                with metric.time(*labels):
+                    return fn(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(1, *labels)
+                raise
+        return wrapper
+    return decorate
+
+
+# Shared instruments
+PREDICT_STAGE_SECONDS = histogram(
+    "trend_predict_stage_seconds",
+    "Latency of each stage of a trend success prediction",
+    ("stage",))
+PREDICTIONS = counter(
+    "trend_predictions",
+    "Trend success predictions served")
+BIGQUERY_SECONDS = histogram(
+    "bigquery_call_seconds",
+    "Latency of BigQuery calls including result iteration",
+    ("operation",))
+BIGQUERY_ERRORS = counter(
+    "bigquery_call_errors",
+    "BigQuery calls that raised",
+    ("operation",))
+HTTP_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "API request latency by route",
+    ("method", "route", "status"))
@@ -0,0 +1,366 @@
+"""
+Trend Success Model Artifact
+
+Versioned on-disk format for the trend success model. An artifact is a
+directory holding:
+
+- manifest.json: format version, model type, feature names, scaler parameters,
+  training-data hash and the shape/dtype/checksum of every array file
+- *.npy: the numeric arrays (tree nodes, leaf values, coefficients), stored
+  uncompressed so every API worker can memory-map them read-only and share
+  the same page-cache pages instead of unpickling a private copy
+- estimator.pkl: the full scikit-learn estimator and scaler, only loaded when
+  the model is retrained
+
+Serving only needs numpy: load_artifact() returns predict-only models that
+evaluate the memory-mapped arrays directly.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+ESTIMATOR_FILE = "estimator.pkl"
+
+
+class ArtifactError(ValueError):
+    """Raised when a model artifact is missing, incompatible or corrupt."""
+
+
+class CompactScaler:
+    """Predict-only StandardScaler built from the manifest parameters."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class CompactLinearModel:
+    """Predict-only linear model over (memory-mapped) coefficients."""
+
+    def __init__(self, coef: np.ndarray, intercept: float):
+        self.coef_ = coef
+        self.intercept_ = float(intercept)
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class CompactTreeEnsemble:
+    """
+    Predict-only tree ensemble over flattened, memory-mapped node arrays.
+
+    All trees are concatenated into shared node arrays and evaluated together,
+    one tree level per step, for every input row at once.
+
+    Args:
+        roots (np.ndarray): Root node index of each tree
+        left (np.ndarray): Left child index per node (-1 for leaves)
+        right (np.ndarray): Right child index per node (-1 for leaves)
+        feature (np.ndarray): Split feature per node (negative for leaves)
+        threshold (np.ndarray): Split threshold per node
+        value (np.ndarray): Leaf value per node
+        combine (str): 'mean' (forest) or 'sum' (boosting)
+        init (float): Boosting initial prediction
+        learning_rate (float): Boosting shrinkage
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, value,
+                 combine: str = 'mean', init: float = 0.0, learning_rate: float = 1.0):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.combine = combine
+        self.init = float(init)
+        self.learning_rate = float(learning_rate)
+
+    def predict(self, X) -> np.ndarray:
+        # scikit-learn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        while True:
+            feature = self.feature[node]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, feature] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+
+        leaf_values = self.value[node]
+        if self.combine == 'mean':
+            return leaf_values.mean(axis=1)
+        return self.init + self.learning_rate * leaf_values.sum(axis=1)
+
+
+def hash_file(path: str) -> Optional[str]:
+    """
+    SHA-256 of a file's contents.
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        str: Hex digest, or None if the file does not exist
+    """
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_array(array: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(array).tobytes()).hexdigest()
+
+
+def _flatten_trees(trees: List) -> Dict[str, np.ndarray]:
+    roots, left, right, feature, threshold, value = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        tree_ = tree.tree_
+        roots.append(offset)
+        left.append(np.where(tree_.children_left < 0, -1, tree_.children_left + offset))
+        right.append(np.where(tree_.children_right < 0, -1, tree_.children_right + offset))
+        feature.append(tree_.feature)
+        threshold.append(tree_.threshold)
+        value.append(tree_.value[:, 0, 0])
+        offset += tree_.node_count
+    return {
+        'roots': np.asarray(roots, dtype=np.int64),
+        'left': np.concatenate(left).astype(np.int64),
+        'right': np.concatenate(right).astype(np.int64),
+        'feature': np.concatenate(feature).astype(np.int64),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'value': np.concatenate(value).astype(np.float64)
+    }
+
+
+def export_arrays(model) -> Tuple[str, Dict[str, np.ndarray], Dict[str, object]]:
+    """
+    Split a fitted estimator into a model type, numeric arrays and scalar parameters.
+
+    Args:
+        model: Fitted RandomForestRegressor, GradientBoostingRegressor or linear model
+
+    Returns:
+        Tuple[str, Dict[str, np.ndarray], Dict[str, object]]: Model type, arrays and
+        parameters ('pickle' with no arrays for unsupported estimators)
+    """
+    name = type(model).__name__
+    if name == 'RandomForestRegressor' and getattr(model, 'n_outputs_', 1) == 1:
+        return 'random_forest', _flatten_trees(model.estimators_), {'combine': 'mean'}
+    if name == 'GradientBoostingRegressor' and model.loss == 'squared_error':
+        if model.init_ == 'zero':
+            init = 0.0
+        elif hasattr(model.init_, 'constant_'):
+            init = float(np.ravel(model.init_.constant_)[0])
+        else:
+            return 'pickle', {}, {}
+        params = {'combine': 'sum', 'init': init, 'learning_rate': float(model.learning_rate)}
+        return 'gradient_boosting', _flatten_trees(model.estimators_[:, 0]), params
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_') and np.ndim(model.coef_) == 1:
+        return 'linear', {'coef': np.asarray(model.coef_, dtype=np.float64)}, {'intercept': float(model.intercept_)}
+    return 'pickle', {}, {}
+
+
+def save_artifact(
+    path: str,
+    model,
+    scaler,
+    feature_names: List[str],
+    metadata: Dict,
+    training_data_hash: Optional[str] = None,
+    linear_state: Optional[Dict] = None
+):
+    """
+    Write a model artifact directory, replacing any existing one atomically.
+
+    Args:
+        path (str): Artifact directory
+        model: Fitted scikit-learn estimator
+        scaler: Fitted StandardScaler
+        feature_names (List[str]): Feature column order
+        metadata (Dict): Training metadata (model name, timestamps, watermark)
+        training_data_hash (str): SHA-256 of the training data file
+        linear_state (Dict): Accumulated linear-model statistics for retraining
+    """
+    model_type, arrays, params = export_arrays(model)
+    staging = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    array_entries = {}
+    for name, array in arrays.items():
+        filename = f"{name}.npy"
+        np.save(os.path.join(staging, filename), np.ascontiguousarray(array), allow_pickle=False)
+        array_entries[name] = {
+            'file': filename,
+            'shape': list(array.shape),
+            'dtype': str(array.dtype),
+            'sha256': _hash_array(array)
+        }
+
+    with open(os.path.join(staging, ESTIMATOR_FILE), 'wb') as f:
+        pickle.dump({'model': model, 'scaler': scaler, 'linear_state': linear_state}, f)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.datetime.now().isoformat(),
+        'model_type': model_type,
+        'estimator_class': type(model).__name__,
+        'feature_names': list(feature_names),
+        'n_features': len(feature_names),
+        'scaler': {
+            'mean': np.asarray(scaler.mean_, dtype=np.float64).tolist(),
+            'scale': np.asarray(scaler.scale_, dtype=np.float64).tolist()
+        },
+        'params': params,
+        'training_data_hash': training_data_hash,
+        'metadata': metadata,
+        'arrays': array_entries,
+        'estimator_sha256': hash_file(os.path.join(staging, ESTIMATOR_FILE))
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    # Swap in the new artifact; workers holding maps of the old files keep them until they
+    # reload (TrendSuccessPredictor.reload_if_changed() sees the new manifest)
+    previous = f"{path.rstrip(os.sep)}.old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, previous)
+    os.replace(staging, path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def read_manifest(path: str) -> Dict:
+    """
+    Read and validate an artifact manifest.
+
+    Args:
+        path (str): Artifact directory
+
+    Returns:
+        Dict: Parsed manifest
+
+    Raises:
+        ArtifactError: If the manifest is missing, unreadable or inconsistent
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ArtifactError(f"No manifest found in {path}")
+    except json.JSONDecodeError as e:
+        raise ArtifactError(f"Corrupt manifest {manifest_path}: {e}")
+
+    required = ('format_version', 'model_type', 'feature_names', 'n_features', 'scaler', 'arrays', 'params')
+    missing = [key for key in required if key not in manifest]
+    if missing:
+        raise ArtifactError(f"Manifest {manifest_path} is missing {missing}")
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format {manifest['format_version']} (expected {FORMAT_VERSION})")
+    n_features = manifest['n_features']
+    if (len(manifest['feature_names']) != n_features
+            or len(manifest['scaler']['mean']) != n_features
+            or len(manifest['scaler']['scale']) != n_features):
+        raise ArtifactError(f"Manifest {manifest_path} has inconsistent feature dimensions")
+    return manifest
+
+
+def _load_array(path: str, name: str, entry: Dict, mmap: bool, verify: bool) -> np.ndarray:
+    file_path = os.path.join(path, entry['file'])
+    try:
+        array = np.load(file_path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read array '{name}' from {file_path}: {e}")
+    if list(array.shape) != entry['shape'] or str(array.dtype) != entry['dtype']:
+        raise ArtifactError(
+            f"Array '{name}' is {array.dtype}{list(array.shape)}, manifest says {entry['dtype']}{entry['shape']}")
+    if verify and _hash_array(array) != entry['sha256']:
+        raise ArtifactError(f"Checksum mismatch for array '{name}'")
+    return array
+
+
+def load_artifact(path: str, mmap: bool = True, verify: bool = False) -> Dict:
+    """
+    Load the predict-only model and scaler from an artifact.
+
+    Args:
+        path (str): Artifact directory
+        mmap (bool): Memory-map the arrays read-only instead of reading them
+        verify (bool): Also verify every array checksum (reads all pages)
+
+    Returns:
+        Dict: 'model', 'scaler', 'feature_names' and 'manifest'
+
+    Raises:
+        ArtifactError: If the artifact fails validation
+    """
+    manifest = read_manifest(path)
+    arrays = {name: _load_array(path, name, entry, mmap, verify) for name, entry in manifest['arrays'].items()}
+    params = manifest['params']
+    model_type = manifest['model_type']
+
+    if model_type in ('random_forest', 'gradient_boosting'):
+        expected = {'roots', 'left', 'right', 'feature', 'threshold', 'value'}
+        if set(arrays) != expected:
+            raise ArtifactError(f"Tree artifact needs arrays {sorted(expected)}, found {sorted(arrays)}")
+        if arrays['feature'].size and arrays['feature'].max() >= manifest['n_features']:
+            raise ArtifactError("Tree splits reference features beyond n_features")
+        model = CompactTreeEnsemble(**arrays, **params)
+    elif model_type == 'linear':
+        if 'coef' not in arrays or arrays['coef'].shape != (manifest['n_features'],):
+            raise ArtifactError("Linear artifact coefficients do not match n_features")
+        model = CompactLinearModel(arrays['coef'], params['intercept'])
+    elif model_type == 'pickle':
+        model = load_estimator(path)['model']
+    else:
+        raise ArtifactError(f"Unknown model type '{model_type}'")
+
+    return {
+        'model': model,
+        'scaler': CompactScaler(manifest['scaler']['mean'], manifest['scaler']['scale']),
+        'feature_names': manifest['feature_names'],
+        'manifest': manifest
+    }
+
+
+def load_estimator(path: str) -> Dict:
+    """
+    Load the full scikit-learn estimator, scaler and linear statistics for retraining.
+
+    Args:
+        path (str): Artifact directory
+
+    Returns:
+        Dict: 'model', 'scaler' and 'linear_state'
+
+    Raises:
+        ArtifactError: If the estimator file is missing or does not match the manifest
+    """
+    manifest = read_manifest(path)
+    estimator_path = os.path.join(path, ESTIMATOR_FILE)
+    if hash_file(estimator_path) != manifest.get('estimator_sha256'):
+        raise ArtifactError(f"Estimator file {estimator_path} is missing or does not match the manifest")
+    with open(estimator_path, 'rb') as f:
+        return pickle.load(f)
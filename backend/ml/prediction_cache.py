@@ -0,0 +1,189 @@
+"""
+Prediction Cache
+
+Bounded LRU cache for trend success predictions with single-flight request
+coalescing: when several threads ask for the same key at once, only the
+first computes it and the others wait for (and share) its result.
+
+Also provides audio_fingerprint(), a content hash of an audio file that is
+memoized by path, size and modification time so repeated requests for the
+same clip do not re-read it.
+"""
+
+import hashlib
+import os
+import stat as stat_module
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+
+class _InFlight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with single-flight computation.
+
+    Args:
+        maxsize (int): Maximum number of cached results (0 disables caching,
+            concurrent identical requests are still coalesced)
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """
+        Return the cached value for `key`, computing it at most once.
+
+        Args:
+            key (Hashable): Normalized cache key
+            compute (Callable): Produces the value on a miss
+
+        Returns:
+            The cached or freshly computed value (shared between callers, do not mutate)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.error is None and self.maxsize > 0:
+                    self._entries[key] = call.result
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            call.event.set()
+        return call.result
+
+    def get(self, key: Hashable, default=None):
+        """
+        Return the cached value for `key` without computing it.
+
+        Counts a hit when found; a miss is only counted by get_or_compute().
+
+        Args:
+            key (Hashable): Normalized cache key
+            default: Returned when the key is not cached
+
+        Returns:
+            The cached value or `default`
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def clear(self):
+        """Drop all cached results (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache counters.
+
+        Returns:
+            Dict[str, float]: hits, misses, coalesced, size, maxsize and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
+
+
+_fingerprints = OrderedDict()
+_fingerprints_lock = threading.Lock()
+_FINGERPRINT_CACHE_SIZE = 4096
+# Larger files are keyed by name instead of being hashed on the request path
+FINGERPRINT_MAX_BYTES = int(os.getenv("AUDIO_FINGERPRINT_MAX_BYTES", str(256 * 2**20)))
+
+
+def audio_fingerprint(audio_path: Optional[str]) -> Optional[str]:
+    """
+    Content hash of an audio file, memoized by (path, size, mtime).
+
+    Missing files are keyed by basename, matching the simulated audio
+    features that are derived from the file name. So are paths that are not
+    regular files (directories, FIFOs, devices, which could block or fail a
+    read), files over FINGERPRINT_MAX_BYTES and files that cannot be read.
+
+    Args:
+        audio_path (str): Path to the audio file
+
+    Returns:
+        str: 'sha1:<digest>' for readable regular files, 'name:<basename>'
+        otherwise, None when no audio was given
+    """
+    if not audio_path:
+        return None
+    name_key = f"name:{os.path.basename(audio_path)}"
+    try:
+        stat = os.stat(audio_path)
+    except OSError:
+        return name_key
+    if not stat_module.S_ISREG(stat.st_mode) or stat.st_size > FINGERPRINT_MAX_BYTES:
+        return name_key
+
+    memo_key = (os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+    with _fingerprints_lock:
+        if memo_key in _fingerprints:
+            _fingerprints.move_to_end(memo_key)
+            return _fingerprints[memo_key]
+
+    digest = hashlib.sha1()
+    try:
+        with open(audio_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return name_key
+    fingerprint = f"sha1:{digest.hexdigest()}"
+
+    with _fingerprints_lock:
+        _fingerprints[memo_key] = fingerprint
+        while len(_fingerprints) > _FINGERPRINT_CACHE_SIZE:
+            _fingerprints.popitem(last=False)
+    return fingerprint
@@ -0,0 +1,166 @@
+"""
+Analyzed-Videos Schema
+
+Compact in-memory dtypes for the video frames passed between transform(),
+enrichment and training, so the same rows take a fraction of the memory of
+the object/float64 columns pandas infers by default:
+
+- low-cardinality strings (source, demographics, language, creator) are
+  categoricals: one small integer code per row plus one copy of each value
+- counts (likes, shares, comments, views) are nullable integers (Int32, or
+  Int64 when a value needs it), so YouTube's missing shares stay <NA>
+  instead of turning the column into float64
+- scores and durations are float32
+- free text (ids, descriptions, URLs, transcriptions) is Arrow-backed
+  strings, which pandas 3 uses by default and pandas 2 needs asked for
+- tags are one Arrow list<string> column (offsets plus values) instead of a
+  Python list of Python strings per row; needs pyarrow, otherwise the tags
+  stay Python lists
+
+CSV remains the exchange format: to_csv_frame() writes tags as the list
+repr the rest of the pipeline (and the BigQuery table) expects, and
+read_videos() reads a CSV back into the compact schema. The ETL run report
+records the per-column memory of the frame after each stage (RunReport.frame).
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+CATEGORY_COLUMNS = ("source", "demographics", "language", "creator")
+COUNT_COLUMNS = ("likes", "shares", "comments", "views")
+FLOAT_COLUMNS = ("duration", "sentiment_transcription", "sentiment_tags")
+TEXT_COLUMNS = ("video_id", "description", "url", "transcription")
+# column -> parse as UTC; the enrichment timestamp is naive local time
+TIME_COLUMNS = {"publish_time": True, "timestamp": False}
+TAGS_COLUMN = "tags"
+
+# Tags layout for normalize_sources(tags_format=...)
+TAGS_FORMAT = "arrow" if pa is not None else "list"
+TAGS_DTYPE = pd.ArrowDtype(pa.list_(pa.string())) if pa is not None else None
+# Missing text stays NaN, as with object columns
+TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan) if pa is not None else None
+
+# Counts never narrower than Int32, so sums of a few columns cannot overflow
+_INT_DTYPES = (("Int32", np.iinfo(np.int32)), ("Int64", np.iinfo(np.int64)))
+
+
+def compact_int(values: pd.Series) -> pd.Series:
+    """
+    Nullable integer series in the narrowest of Int32/Int64 that fits.
+
+    Non-numeric values become <NA>; columns holding fractional values are
+    returned as float64 unchanged.
+
+    Args:
+        values (pd.Series): Count column
+
+    Returns:
+        pd.Series: Int32/Int64 (or float64) series
+    """
+    if values.dtype.name in ("Int32", "Int64"):
+        return values
+    numbers = pd.to_numeric(values, errors="coerce")
+    present = numbers.dropna()
+    if len(present) and not np.array_equal(present, np.floor(present)):
+        return numbers.astype("float64")
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype, info in _INT_DTYPES:
+        if info.min <= low and high <= info.max:
+            return numbers.astype(dtype)
+    return numbers.astype("float64")
+
+
+def tags_array(values: Iterable) -> pd.Series:
+    """
+    Tags as an Arrow list<string> column.
+
+    Args:
+        values (Iterable): Lists, arrays, list repr strings or missing values
+            (see ml.enrichment.parse_tags); missing values become []
+
+    Returns:
+        pd.Series: ArrowDtype(list<string>) series (Python lists without pyarrow)
+    """
+    from ml.enrichment import parse_tags
+
+    index = values.index if isinstance(values, pd.Series) else None
+    lists = [[str(tag) for tag in parse_tags(tags)] for tags in values]
+    if pa is None:
+        return pd.Series(lists, index=index, dtype=object)
+    return pd.Series(pd.arrays.ArrowExtensionArray(pa.array(lists, type=pa.list_(pa.string()))), index=index)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the known video columns to their compact dtypes.
+
+    Columns that are missing or already compact are left alone, so this is
+    cheap to call at every stage boundary.
+
+    Args:
+        df (pd.DataFrame): Frame in the transform/analyzed-videos schema
+
+    Returns:
+        pd.DataFrame: Frame with compact dtypes (other columns shared, not copied)
+    """
+    out = df.copy(deep=False)
+    for column in CATEGORY_COLUMNS:
+        if column in out and not isinstance(out[column].dtype, pd.CategoricalDtype):
+            out[column] = out[column].astype("category")
+    for column in COUNT_COLUMNS:
+        if column in out:
+            out[column] = compact_int(out[column])
+    for column in FLOAT_COLUMNS:
+        if column in out and out[column].dtype != np.float32:
+            out[column] = pd.to_numeric(out[column], errors="coerce").astype(np.float32)
+    for column in TEXT_COLUMNS:
+        if TEXT_DTYPE is not None and column in out and out[column].dtype != TEXT_DTYPE:
+            out[column] = out[column].astype(TEXT_DTYPE)
+    for column, utc in TIME_COLUMNS.items():
+        if column in out and not pd.api.types.is_datetime64_any_dtype(out[column]):
+            out[column] = pd.to_datetime(out[column], errors="coerce", utc=utc, format="mixed")
+    if TAGS_COLUMN in out and out[TAGS_COLUMN].dtype != (TAGS_DTYPE or object):
+        out[TAGS_COLUMN] = tags_array(out[TAGS_COLUMN])
+    return out
+
+
+def to_csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame ready for to_csv(): Arrow tags written as Python list reprs.
+
+    Args:
+        df (pd.DataFrame): Compact frame
+
+    Returns:
+        pd.DataFrame: Frame whose CSV matches the list-of-strings layout
+    """
+    if TAGS_COLUMN not in df or TAGS_DTYPE is None or df[TAGS_COLUMN].dtype != TAGS_DTYPE:
+        return df
+    out = df.copy(deep=False)
+    out[TAGS_COLUMN] = [repr(tags if isinstance(tags, list) else []) for tags in df[TAGS_COLUMN].tolist()]
+    return out
+
+
+def read_videos(path: str, **kwargs) -> pd.DataFrame:
+    """
+    Read an analyzed-videos CSV into the compact schema.
+
+    Args:
+        path (str): CSV path
+        **kwargs: Passed to pd.read_csv
+
+    Returns:
+        pd.DataFrame: Frame with compact dtypes
+    """
+    dtype = {column: "category" for column in CATEGORY_COLUMNS}
+    dtype["video_id"] = str
+    dtype.update(kwargs.pop("dtype", {}))
+    return apply_schema(pd.read_csv(path, dtype=dtype, **kwargs))
+
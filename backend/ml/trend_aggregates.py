@@ -0,0 +1,380 @@
+"""
+Sliding-Window Trend Aggregates
+
+Maintains video counts and engagement sums (likes, views, comments, shares)
+per hashtag, keyword, creator and audio over sliding windows (1h, 24h and
+7d by default), broken down by source and demographic.
+
+Rows are added to hourly buckets and to a running total per window. When
+the event-time watermark (the latest publish hour seen) moves forward, the
+buckets that slid out of each window are subtracted from its total, so an
+ETL load costs time proportional to the new rows and the hours that
+expired, never to the history. After each update the top-k of every
+(window, dimension, source, demographic) slice is materialized, so reads
+are dictionary lookups.
+
+Updates are idempotent per video: the ids counted in each hourly bucket
+are kept (and expire with the bucket), so a retried or re-run load of the
+same extract adds nothing twice.
+
+The state is saved as JSON between ETL runs (see data_pipeline.load).
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ml.enrichment import parse_tags
+
+AGGREGATES_PATH = "ml/data/trend_aggregates.json"
+DEFAULT_WINDOWS = ("1h", "24h", "7d")
+DIMENSIONS = ("hashtag", "keyword", "creator", "audio")
+METRICS = ("videos", "likes", "views", "comments", "shares")
+ANY = "*"
+STATE_VERSION = 1
+
+_WINDOW_UNITS = {"h": 1, "d": 24, "w": 24 * 7}
+
+
+def window_hours(window: str) -> int:
+    """
+    Parse a window like '1h', '24h', '7d' or '2w' into hours.
+
+    Args:
+        window (str): Window specification
+
+    Returns:
+        int: Window length in hours
+    """
+    match = re.fullmatch(r"(\d+)([hdw])", window.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid window '{window}', expected e.g. '1h', '24h' or '7d'")
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+
+
+def _add(target: Dict, key: Tuple, values: List[float], sign: int = 1):
+    current = target.get(key)
+    if current is None:
+        if sign < 0:
+            return
+        target[key] = list(values)
+        return
+    for i, value in enumerate(values):
+        current[i] += sign * value
+    if current[0] <= 0:
+        del target[key]
+
+
+def contributions(df: pd.DataFrame, time_column: str = "publish_time") -> pd.DataFrame:
+    """
+    Explode analyzed video rows into per-(hour, dimension, value) contributions.
+
+    Hashtags are '#'-prefixed tags, keywords the other tags (YouTube), audio
+    the optional 'audio' column. Tags are lower-cased so case variants merge.
+
+    Args:
+        df (pd.DataFrame): Analyzed video rows
+        time_column (str): Event-time column
+
+    Returns:
+        pd.DataFrame: hour, dimension, value, source, demographic and METRICS columns,
+        summed per group
+    """
+    df = df.reset_index(drop=True)
+    hours = pd.to_datetime(df[time_column], errors="coerce", utc=True, format="mixed")
+    base = pd.DataFrame({
+        "hour": (hours - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(hours=1),
+        "source": df["source"].astype(object).fillna("unknown").astype(str).str.lower() if "source" in df else "unknown",
+        "demographic": df["demographics"].astype(object).fillna("unknown").astype(str) if "demographics" in df else "unknown",
+        "videos": 1
+    }, index=df.index)
+    for metric in METRICS[1:]:
+        base[metric] = pd.to_numeric(df[metric], errors="coerce").fillna(0) if metric in df else 0.0
+    base = base[hours.notna()]
+    if base.empty:
+        return pd.DataFrame(columns=["hour", "dimension", "value", "source", "demographic", *METRICS])
+
+    parts = []
+    if "tags" in df:
+        tags = df.loc[base.index, "tags"].map(parse_tags).explode().dropna().astype(str).str.strip().str.lower()
+        tags = tags[tags != ""]
+        tagged = base.loc[tags.index].assign(value=tags.values)
+        is_hashtag = tagged["value"].str.startswith("#")
+        parts.append(tagged[is_hashtag].assign(dimension="hashtag"))
+        parts.append(tagged[~is_hashtag].assign(dimension="keyword"))
+    for dimension, column in (("creator", "creator"), ("audio", "audio")):
+        if column in df:
+            values = df.loc[base.index, column]
+            present = values.notna() & (values.astype(str).str.strip() != "")
+            parts.append(base[present].assign(value=values[present].astype(str).str.strip(), dimension=dimension))
+
+    exploded = pd.concat(parts, ignore_index=True) if parts else base.iloc[:0].assign(value="", dimension="")
+    return exploded.groupby(["hour", "dimension", "value", "source", "demographic"], as_index=False)[list(METRICS)].sum()
+
+
+class TrendAggregates:
+    """
+    Sliding-window counts and engagement sums per trend dimension.
+
+    Args:
+        windows (Iterable[str]): Window specifications, e.g. ('1h', '24h', '7d')
+        top_k (int): Entries materialized per (window, dimension, source, demographic) slice
+        rank_by (str): Metric the materialized top-k is ranked by
+        time_column (str): Event-time column of the ingested rows
+    """
+
+    def __init__(self, windows: Iterable[str] = DEFAULT_WINDOWS, top_k: int = 50,
+                 rank_by: str = "videos", time_column: str = "publish_time"):
+        if rank_by not in METRICS:
+            raise ValueError(f"rank_by must be one of {METRICS}")
+        self.windows = {window: window_hours(window) for window in windows}
+        self.top_k = top_k
+        self.rank_by = rank_by
+        self.time_column = time_column
+        self.watermark: Optional[int] = None
+        self.late_rows = 0
+        # hour -> key -> metrics, key = (dimension, value, source, demographic)
+        self.buckets: Dict[int, Dict[Tuple, List[float]]] = {}
+        self.totals: Dict[str, Dict[Tuple, List[float]]] = {window: {} for window in self.windows}
+        # hour -> video ids already counted in that bucket
+        self.seen: Dict[int, set] = {}
+        self._top: Dict[Tuple[str, str, str, str], List[Dict]] = {}
+
+    @property
+    def horizon(self) -> int:
+        """Hours of buckets kept (the longest window)."""
+        return max(self.windows.values())
+
+    def window_start(self, window: str) -> Optional[int]:
+        """First hour included in `window` at the current watermark."""
+        if self.watermark is None:
+            return None
+        return self.watermark - self.windows[window] + 1
+
+    @staticmethod
+    def _keys(dimension: str, value: str, source: str, demographic: str) -> Tuple[Tuple, ...]:
+        # Each contribution also counts towards the all-sources / all-demographics slices
+        return ((dimension, value, source, demographic), (dimension, value, ANY, demographic),
+                (dimension, value, source, ANY), (dimension, value, ANY, ANY))
+
+    def update(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Add newly loaded rows and slide the windows forward.
+
+        Rows whose video_id is already counted (in its publish hour's bucket,
+        or earlier in `df`) are skipped.
+
+        Args:
+            df (pd.DataFrame): New analyzed video rows
+
+        Returns:
+            Dict[str, int]: Contributions added, late contributions dropped,
+            duplicate videos skipped and hours expired from the windows
+        """
+        df, ids, duplicates = self._unseen(df)
+        rows = contributions(df, self.time_column)
+        if rows.empty:
+            return {"added": 0, "late": 0, "duplicates": duplicates, "expired_hours": 0}
+
+        new_watermark = int(rows["hour"].max())
+        old_starts = {window: self.window_start(window) for window in self.windows}
+        if self.watermark is None or new_watermark > self.watermark:
+            target_watermark = new_watermark
+        else:
+            target_watermark = self.watermark
+        oldest_kept = target_watermark - self.horizon + 1
+
+        added = late = 0
+        for hour, dimension, value, source, demographic, *values in rows.itertuples(index=False):
+            hour = int(hour)
+            values = [float(v) for v in values]
+            if hour < oldest_kept:
+                late += 1
+                continue
+            bucket = self.buckets.setdefault(hour, {})
+            for key in self._keys(dimension, value, source, demographic):
+                _add(bucket, key, values)
+                for window, total in self.totals.items():
+                    # Rows already outside a window's current range are only kept for longer windows
+                    start = old_starts[window]
+                    if start is None or hour >= start:
+                        _add(total, key, values)
+            added += 1
+        self.late_rows += late
+        for hour, video_id in ids:
+            if hour >= oldest_kept:
+                self.seen.setdefault(hour, set()).add(video_id)
+
+        expired = self._advance(target_watermark, old_starts)
+        self._materialize()
+        return {"added": added, "late": late, "duplicates": duplicates, "expired_hours": expired}
+
+    def _unseen(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Tuple[int, str]], int]:
+        """Rows of `df` not counted yet, their (hour, video_id) pairs and the number skipped."""
+        if "video_id" not in df or df.empty:
+            return df, [], 0
+        hours = pd.to_datetime(df[self.time_column], errors="coerce", utc=True, format="mixed")
+        hours = (hours - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(hours=1)
+        video_ids = df["video_id"].astype(str)
+        keep = ~video_ids.duplicated().to_numpy()
+        ids = []
+        for i, (hour, video_id) in enumerate(zip(hours, video_ids)):
+            if not keep[i] or pd.isna(hour):
+                continue
+            hour = int(hour)
+            if video_id in self.seen.get(hour, ()):
+                keep[i] = False
+            else:
+                ids.append((hour, video_id))
+        return df[keep], ids, int((~keep).sum())
+
+    def _advance(self, watermark: int, old_starts: Dict[str, Optional[int]]) -> int:
+        """Move the watermark and subtract buckets that left each window."""
+        self.watermark = watermark
+        expired = 0
+        for window, total in self.totals.items():
+            old_start, new_start = old_starts[window], self.window_start(window)
+            if old_start is None:
+                # First update: totals include everything added so far, drop what is already out of range
+                old_start = min(self.buckets) if self.buckets else new_start
+            for hour in range(old_start, new_start):
+                for key, values in self.buckets.get(hour, {}).items():
+                    _add(total, key, values, sign=-1)
+                expired += 1 if hour in self.buckets else 0
+        oldest_kept = watermark - self.horizon + 1
+        for hour in [hour for hour in self.buckets if hour < oldest_kept]:
+            del self.buckets[hour]
+        for hour in [hour for hour in self.seen if hour < oldest_kept]:
+            del self.seen[hour]
+        return expired
+
+    def _materialize(self):
+        slices = defaultdict(list)
+        rank = METRICS.index(self.rank_by)
+        for window, total in self.totals.items():
+            for (dimension, value, source, demographic), values in total.items():
+                slices[(window, dimension, source, demographic)].append((values[rank], value, values))
+        self._top = {
+            key: [dict(value=value, **dict(zip(METRICS, values)))
+                  for _, value, values in heapq.nlargest(self.top_k, entries, key=lambda entry: (entry[0], entry[1]))]
+            for key, entries in slices.items()
+        }
+
+    def top(self, window: str, dimension: str, source: Optional[str] = None,
+            demographic: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """
+        Materialized top trends of one slice.
+
+        Args:
+            window (str): One of the configured windows
+            dimension (str): 'hashtag', 'keyword', 'creator' or 'audio'
+            source (str): e.g. 'tiktok' or 'youtube' (all if None)
+            demographic (str): e.g. 'gen z' (all if None)
+            limit (int): Number of entries (at most top_k)
+
+        Returns:
+            List[Dict]: value and METRICS per entry, ranked by `rank_by`
+        """
+        if window not in self.windows:
+            raise ValueError(f"Unknown window '{window}', expected one of {list(self.windows)}")
+        entries = self._top.get((window, dimension, source or ANY, demographic or ANY), [])
+        return [dict(entry) for entry in entries[:limit]]
+
+    def get(self, window: str, dimension: str, value: str, source: Optional[str] = None,
+            demographic: Optional[str] = None) -> Dict[str, float]:
+        """
+        Counts and engagement sums of one value in a window.
+
+        Returns:
+            Dict[str, float]: METRICS (zeros if the value has no rows in the window)
+        """
+        if dimension in ("hashtag", "keyword"):
+            value = value.strip().lower()
+        values = self.totals[window].get((dimension, value, source or ANY, demographic or ANY))
+        return dict(zip(METRICS, values or [0] * len(METRICS)))
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": STATE_VERSION,
+            "windows": list(self.windows),
+            "top_k": self.top_k,
+            "rank_by": self.rank_by,
+            "time_column": self.time_column,
+            "watermark": self.watermark,
+            "late_rows": self.late_rows,
+            "buckets": {str(hour): [[*key, *values] for key, values in bucket.items()]
+                        for hour, bucket in self.buckets.items()},
+            "totals": {window: [[*key, *values] for key, values in total.items()]
+                       for window, total in self.totals.items()},
+            "seen": {str(hour): sorted(ids) for hour, ids in self.seen.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "TrendAggregates":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported aggregates state version: {state.get('version')}")
+        aggregates = cls(state["windows"], state["top_k"], state["rank_by"], state["time_column"])
+        aggregates.watermark = state["watermark"]
+        aggregates.late_rows = state["late_rows"]
+        aggregates.buckets = {int(hour): {tuple(row[:4]): row[4:] for row in rows}
+                              for hour, rows in state["buckets"].items()}
+        aggregates.totals = {window: {tuple(row[:4]): row[4:] for row in rows}
+                             for window, rows in state["totals"].items()}
+        # States saved before video ids were tracked have none
+        aggregates.seen = {int(hour): set(ids) for hour, ids in state.get("seen", {}).items()}
+        aggregates._materialize()
+        return aggregates
+
+    def save(self, path: str = AGGREGATES_PATH):
+        """Write the state as JSON (atomically replacing the previous file)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = AGGREGATES_PATH, **kwargs) -> "TrendAggregates":
+        """
+        Load saved state, or start empty if there is none.
+
+        Args:
+            path (str): State file
+            **kwargs: Constructor arguments for a fresh instance
+        """
+        if not os.path.exists(path):
+            return cls(**kwargs)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+_shared = {"path": None, "mtime": None, "aggregates": None}
+_shared_lock = threading.Lock()
+
+
+def shared_aggregates(path: str = AGGREGATES_PATH) -> Optional[TrendAggregates]:
+    """
+    Process-wide read-only view of the saved aggregates for API and MCP reads.
+
+    Reloaded only when the state file changes.
+
+    Args:
+        path (str): State file written by the ETL load
+
+    Returns:
+        TrendAggregates: Loaded aggregates, or None if none have been saved yet
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _shared_lock:
+        if _shared["path"] != path or _shared["mtime"] != mtime:
+            _shared.update(path=path, mtime=mtime, aggregates=TrendAggregates.load(path))
+        return _shared["aggregates"]
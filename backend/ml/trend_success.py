@@ -19,42 +19,168 @@ import numpy as np
 import os
 import sys
 import pickle
+import copy
+import argparse
 import warnings
 from typing import Dict, List, Tuple, Optional, Union
 import datetime
 import json
 import re
+import time
 from pathlib import Path
 
-# Machine Learning imports
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.preprocessing import StandardScaler, LabelEncoder, OneHotEncoder
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
+import hashlib
+import importlib
+import threading
 
-# Audio processing imports
-try:
-    import librosa
-    import soundfile as sf
-    AUDIO_PROCESSING_AVAILABLE = True
-except ImportError:
-    print("Warning: librosa not available. Audio processing will be simulated.")
-    AUDIO_PROCESSING_AVAILABLE = False
+# scikit-learn, librosa and transformers are imported on first use (see
+# _optional_import and the training methods) so that serving a saved model
+# only pays for numpy and pandas at import time.
 
-# NLP imports
-try:
-    from transformers import pipeline
-    NLP_AVAILABLE = True
-except ImportError:
-    print("Warning: transformers not available. Using basic text features.")
-    NLP_AVAILABLE = False
+sys.path.append(".")
+from ml.model_artifact import ArtifactError, MANIFEST_FILE, save_artifact, load_artifact, load_estimator, hash_file
+from ml.prediction_cache import PredictionCache, audio_fingerprint
+from ml.metrics import PREDICT_STAGE_SECONDS, PREDICTIONS
+from ml.audio_store import shared_store as shared_audio_store
 
 warnings.filterwarnings('ignore')
 
+MODEL_PATH = "ml/models/trend_success_model"
+LEGACY_MODEL_PATH = "ml/models/trend_success_model.pkl"
+# Seconds between checks for a retrained model on disk (see reload_if_changed)
+MODEL_RELOAD_SECONDS = float(os.getenv("MODEL_RELOAD_SECONDS", "30"))
+FEATURE_SAMPLE_RATE = 22050
+
+_OPTIONAL_MODULES = {}
+_OPTIONAL_WARNINGS = {
+    'librosa': "Warning: librosa not available. Audio processing will be simulated.",
+    'transformers': "Warning: transformers not available. Using basic text features."
+}
+
+def _optional_import(name: str):
+    """
+    Import an optional heavy dependency on first use.
+    
+    Args:
+        name (str): Module name ('librosa' or 'transformers')
+        
+    Returns:
+        The module, or None if it is not installed
+    """
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except ImportError:
+            print(_OPTIONAL_WARNINGS.get(name, f"Warning: {name} not available."))
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+def _stable_hash(text: str) -> int:
+    """Process-independent hash (Python's hash() of str is randomized per process)."""
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16)
+
+def _evaluate_fold(name: str, estimator, X: np.ndarray, y: np.ndarray, train_idx: np.ndarray, test_idx: np.ndarray) -> Dict:
+    """
+    Fit one candidate on one CV fold and time it.
+    
+    Args:
+        name (str): Candidate name
+        estimator: Unfitted estimator (cloned before fitting)
+        X (np.ndarray): Scaled feature matrix
+        y (np.ndarray): Target vector
+        train_idx (np.ndarray): Row indices to fit on
+        test_idx (np.ndarray): Row indices to score
+        
+    Returns:
+        Dict: R², fit/predict seconds and single-row latency (ms), or the error
+    """
+    from sklearn.base import clone
+    from sklearn.metrics import r2_score
+    
+    result = {'name': name, 'error': None}
+    try:
+        model = clone(estimator)
+        start = time.perf_counter()
+        model.fit(X[train_idx], y[train_idx])
+        result['fit_time'] = time.perf_counter() - start
+        
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=1)
+        start = time.perf_counter()
+        y_pred = model.predict(X[test_idx])
+        result['predict_time'] = time.perf_counter() - start
+        result['r2'] = r2_score(y[test_idx], y_pred) if len(test_idx) > 1 else float('nan')
+        result['test_idx'] = test_idx
+        result['y_pred'] = y_pred
+        
+        # Median single-row latency, as seen by the prediction API
+        row = X[test_idx[:1]]
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            model.predict(row)
+            timings.append(time.perf_counter() - start)
+        result['latency_ms'] = float(np.median(timings)) * 1000
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def _incremental_model_types() -> Tuple[type, ...]:
+    """Estimator classes that train_incremental() can update in place."""
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+    return (RandomForestRegressor, GradientBoostingRegressor, Ridge, LinearRegression)
+
+def _latest_timestamp(df: pd.DataFrame) -> Optional[str]:
+    """Latest analysis `timestamp` in the frame as an ISO string (None if absent)."""
+    if 'timestamp' not in df.columns:
+        return None
+    latest = pd.to_datetime(df['timestamp'], errors='coerce').max()
+    return None if pd.isna(latest) else latest.isoformat()
+
+def _linear_state(X: np.ndarray, y: np.ndarray, state: Optional[Dict] = None) -> Dict:
+    """
+    Accumulate the sufficient statistics of a linear least-squares fit.
+    
+    Args:
+        X (np.ndarray): Scaled feature matrix
+        y (np.ndarray): Target vector
+        state (Dict): Previously accumulated statistics to add to
+        
+    Returns:
+        Dict: Row count, feature/target sums, X^T X and X^T y
+    """
+    if state is None:
+        n_features = X.shape[1]
+        state = {'n': 0, 'x_sum': np.zeros(n_features), 'y_sum': 0.0,
+                 'xtx': np.zeros((n_features, n_features)), 'xty': np.zeros(n_features)}
+    return {
+        'n': state['n'] + len(X),
+        'x_sum': state['x_sum'] + X.sum(axis=0),
+        'y_sum': state['y_sum'] + float(y.sum()),
+        'xtx': state['xtx'] + X.T @ X,
+        'xty': state['xty'] + X.T @ y
+    }
+
+def _solve_linear_state(state: Dict, alpha: float = 0.0) -> Tuple[np.ndarray, float]:
+    """
+    Solve (ridge) least squares with an unpenalized intercept from accumulated statistics.
+    
+    Args:
+        state (Dict): Statistics from _linear_state()
+        alpha (float): L2 penalty (0 for ordinary least squares)
+        
+    Returns:
+        Tuple[np.ndarray, float]: Coefficients and intercept
+    """
+    n = state['n']
+    x_mean = state['x_sum'] / n
+    y_mean = state['y_sum'] / n
+    gram = state['xtx'] - n * np.outer(x_mean, x_mean) + alpha * np.eye(len(x_mean))
+    cross = state['xty'] - n * x_mean * y_mean
+    coef = np.linalg.lstsq(gram, cross, rcond=None)[0]
+    return coef, float(y_mean - x_mean @ coef)
+
 class TrendSuccessPredictor:
     def __init__(self, data_path: str = None):
         """
@@ -65,23 +191,126 @@ class TrendSuccessPredictor:
         """
         self.data_path = data_path or "ml/data/analyzed_videos_with_demographics.csv"
         self.model = None
-        self.scaler = StandardScaler()
-        self.text_vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-        self.platform_encoder = LabelEncoder()
-        self.audience_encoder = LabelEncoder()
-        self.demographics_encoder = LabelEncoder()
+        self.scaler = None
         self.feature_names = []
         self.is_trained = False
+        self.metadata = {}
+        self.linear_state = None
+        # Where the model was loaded from and its on-disk stamp, to pick up retrains
+        self.model_path = None
+        self._model_stamp = None
+        self._last_reload_check = 0.0
+        self._reload_lock = threading.Lock()
         
-        # Initialize NLP pipeline if available
-        if NLP_AVAILABLE:
-            try:
-                self.sentiment_analyzer = pipeline("sentiment-analysis")
-            except Exception as e:
-                print(f"Warning: Could not initialize sentiment analyzer: {e}")
-                self.sentiment_analyzer = None
-        else:
-            self.sentiment_analyzer = None
+        # The NLP pipeline is built on first use (or by warm_up())
+        self._sentiment_analyzer = None
+        self._sentiment_loaded = False
+        self._load_lock = threading.Lock()
+        self.prediction_cache = PredictionCache(int(os.getenv("PREDICTION_CACHE_SIZE", "1024")))
+        # Model-independent per-input caches: recipes share keywords and audio
+        # tracks far more often than whole requests
+        self.sentiment_cache = PredictionCache(int(os.getenv("SENTIMENT_CACHE_SIZE", "16384")))
+        self.audio_feature_cache = PredictionCache(int(os.getenv("AUDIO_FEATURE_CACHE_SIZE", "4096")))
+    
+    @property
+    def sentiment_analyzer(self):
+        """Hugging Face sentiment pipeline, built on first access (None if unavailable)."""
+        if not self._sentiment_loaded:
+            with self._load_lock:
+                if not self._sentiment_loaded:
+                    transformers = _optional_import('transformers')
+                    if transformers is not None:
+                        try:
+                            self._sentiment_analyzer = transformers.pipeline("sentiment-analysis")
+                        except Exception as e:
+                            print(f"Warning: Could not initialize sentiment analyzer: {e}")
+                    self._sentiment_loaded = True
+        return self._sentiment_analyzer
+    
+    @sentiment_analyzer.setter
+    def sentiment_analyzer(self, analyzer):
+        self._sentiment_analyzer = analyzer
+        self._sentiment_loaded = True
+    
+    def warm_up(self, model_path: str = MODEL_PATH) -> Dict[str, float]:
+        """
+        Load the model and the heavy dependencies ahead of the first request.
+        
+        Args:
+            model_path (str): Model artifact to load if no model is loaded yet
+            
+        Returns:
+            Dict[str, float]: Seconds spent on each warm-up step
+        """
+        timings = {}
+        start = time.perf_counter()
+        if not self.is_trained:
+            self.load_model(model_path)
+        timings['model'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        _ = self.sentiment_analyzer
+        timings['sentiment'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        _optional_import('librosa')
+        timings['audio'] = time.perf_counter() - start
+        
+        if self.is_trained:
+            # Page in the model arrays and run every code path once
+            start = time.perf_counter()
+            self.predict_trend_success("warm up #warmup", None, "TikTok", ["All Ages"])
+            timings['predict'] = time.perf_counter() - start
+        return timings
+    
+    @staticmethod
+    def _resolve_model_path(filepath: str) -> str:
+        if not os.path.exists(filepath) and os.path.exists(LEGACY_MODEL_PATH):
+            return LEGACY_MODEL_PATH
+        return filepath
+    
+    @staticmethod
+    def model_stamp(filepath: str) -> Optional[Tuple[int, int]]:
+        """
+        (inode, mtime) of a model's manifest (or legacy pickle), None if missing.
+        
+        save_artifact() swaps in a new directory with a new manifest, so the
+        stamp changes with every saved model.
+        """
+        path = os.path.join(filepath, MANIFEST_FILE) if os.path.isdir(filepath) else filepath
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+    
+    def reload_if_changed(self, min_interval: float = MODEL_RELOAD_SECONDS) -> bool:
+        """
+        Reload the model when the file it was loaded from has been replaced.
+        
+        Checks the manifest's stamp at most every `min_interval` seconds, so
+        it is cheap enough to call on every request. load_model() clears the
+        prediction cache, whose keys hold the previous model version.
+        
+        Args:
+            min_interval (float): Seconds between checks
+            
+        Returns:
+            bool: Whether a new model was loaded
+        """
+        if self.model_path is None or time.monotonic() - self._last_reload_check < min_interval:
+            return False
+        with self._reload_lock:
+            if time.monotonic() - self._last_reload_check < min_interval:
+                return False
+            self._last_reload_check = time.monotonic()
+            path = self._resolve_model_path(self.model_path)
+            stamp = self.model_stamp(path)
+            if stamp is None or stamp == self._model_stamp:
+                return False
+            self.load_model(self.model_path)
+            # A failed load keeps the current model and is retried at the next check
+            return self._model_stamp == stamp
     
     def calculate_success_score(self, row: pd.Series) -> float:
         # Extract metrics with safe defaults and handle NaN/None values
@@ -155,11 +384,9 @@ class TrendSuccessPredictor:
         # Sentiment analysis
         if self.sentiment_analyzer:
             try:
-                sentiment = self.sentiment_analyzer(text[:512])[0]  # Limit text length
-                score = sentiment['score']
-                if sentiment['label'] == 'NEGATIVE':
-                    score = -score
-                features['sentiment_score'] = score
+                snippet = text[:512]  # Limit text length
+                features['sentiment_score'] = self.sentiment_cache.get_or_compute(
+                    snippet, lambda: self._sentiment_score(snippet))
             except Exception:
                 features['sentiment_score'] = 0.0
         else:
@@ -167,6 +394,26 @@ class TrendSuccessPredictor:
         
         return features
     
+    def _sentiment_score(self, text: str) -> float:
+        """Signed sentiment of a text from the NLP pipeline (negative for NEGATIVE labels)."""
+        with PREDICT_STAGE_SECONDS.time('sentiment'):
+            sentiment = self.sentiment_analyzer(text)[0]
+        score = sentiment['score']
+        return -score if sentiment['label'] == 'NEGATIVE' else score
+    
+    def audio_features(self, audio_path: str) -> Dict[str, float]:
+        """
+        extract_audio_features() cached by the audio file's content hash.
+        
+        Args:
+            audio_path (str): Path to audio file
+            
+        Returns:
+            Dict[str, float]: Audio features (shared between callers, do not mutate)
+        """
+        return self.audio_feature_cache.get_or_compute(
+            audio_fingerprint(audio_path), lambda: self.extract_audio_features(audio_path))
+    
     def extract_audio_features(self, audio_path: str) -> Dict[str, float]:
         """
         Extract features from audio file.
@@ -188,11 +435,12 @@ class TrendSuccessPredictor:
             'pitch_variance': 100
         }
         
-        # Generate simulated features if librosa not available or file doesn't exist
-        if not AUDIO_PROCESSING_AVAILABLE or not os.path.exists(audio_path):
+        # Generate simulated features if librosa not available or the path is not a regular file
+        librosa = _optional_import('librosa') if audio_path and os.path.isfile(audio_path) else None
+        if librosa is None:
             if audio_path:
                 # Generate pseudo-random features based on filename hash
-                hash_val = abs(hash(os.path.basename(audio_path))) % 1000
+                hash_val = _stable_hash(os.path.basename(audio_path)) % 1000
                 default_features.update({
                     'audio_duration': 15 + (hash_val % 45),  # 15-60 seconds
                     'tempo': 80 + (hash_val % 80),  # 80-160 BPM
@@ -205,8 +453,9 @@ class TrendSuccessPredictor:
             return default_features
         
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_path, duration=30)  # Load first 30 seconds
+            # First 30 seconds from the shared decode-once store, at librosa's default rate
+            sr = FEATURE_SAMPLE_RATE
+            y = shared_audio_store().load(audio_path, sr=sr, duration=30)
             
             # Extract features
             features = {
@@ -226,7 +475,7 @@ class TrendSuccessPredictor:
             print(f"Warning: Could not process audio file {audio_path}: {e}")
             # Generate simulated features when real processing fails
             if audio_path:
-                hash_val = abs(hash(os.path.basename(audio_path))) % 1000
+                hash_val = _stable_hash(os.path.basename(audio_path)) % 1000
                 default_features.update({
                     'audio_duration': 15 + (hash_val % 45),  # 15-60 seconds
                     'tempo': 80 + (hash_val % 80),  # 80-160 BPM
@@ -314,8 +563,10 @@ class TrendSuccessPredictor:
         Returns:
             pd.DataFrame: Loaded data
         """
+        from ml.schema import read_videos
+        
         try:
-            df = pd.read_csv(self.data_path)
+            df = read_videos(self.data_path)
             print(f"Loaded {len(df)} records from {self.data_path}")
             return df
         except FileNotFoundError:
@@ -325,7 +576,69 @@ class TrendSuccessPredictor:
             print(f"Error loading data: {e}")
             sys.exit(1)
     
-    def train(self, test_size: float = 0.2, random_state: int = 42) -> Dict[str, float]:
+    def _candidate_models(self, random_state: int, n_jobs: int, early_stopping_rounds: Optional[int]) -> Dict[str, object]:
+        """
+        Build the unfitted candidate models considered by train().
+        
+        Args:
+            random_state (int): Random seed for the stochastic models
+            n_jobs (int): Threads used by the forest
+            early_stopping_rounds (int): Stop boosting after this many stages without
+                validation improvement (None disables early stopping)
+            
+        Returns:
+            Dict[str, object]: Candidate name -> unfitted estimator
+        """
+        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.linear_model import LinearRegression, Ridge
+        
+        return {
+            'Random Forest': RandomForestRegressor(n_estimators=50, random_state=random_state, n_jobs=n_jobs),
+            'Gradient Boosting': GradientBoostingRegressor(
+                n_estimators=50 if early_stopping_rounds is None else 200,
+                n_iter_no_change=early_stopping_rounds,
+                validation_fraction=0.1,
+                random_state=random_state
+            ),
+            'Ridge Regression': Ridge(alpha=1.0),
+            'Linear Regression': LinearRegression()
+        }
+    
+    def train(
+        self,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        cv_folds: int = 5,
+        n_jobs: int = -1,
+        early_stopping_rounds: Optional[int] = 10,
+        latency_budget_ms: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Train the candidate models and keep the best one.
+        
+        Candidates are scored with k-fold cross-validation on the training split;
+        every (candidate, fold) pair is fitted concurrently with joblib. The model
+        with the best mean CV R² among those whose single-row prediction latency is
+        within `latency_budget_ms` is refit on the full training split.
+        
+        Args:
+            test_size (float): Fraction of rows held out for the final metrics
+            random_state (int): Random seed for splitting and the stochastic models
+            cv_folds (int): Number of cross-validation folds
+            n_jobs (int): Parallel jobs for model selection and forest training
+            early_stopping_rounds (int): Boosting early-stopping patience (None disables it)
+            latency_budget_ms (float): Max single-row prediction latency for the chosen model
+            
+        Returns:
+            Dict[str, float]: Metrics of the chosen model plus per-candidate CV results
+        """
+        from joblib import Parallel, delayed
+        from sklearn.base import clone
+        from sklearn.linear_model import LinearRegression, Ridge
+        from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+        from sklearn.model_selection import train_test_split, KFold
+        from sklearn.preprocessing import StandardScaler
+        
         print("🚀 Starting model training...")
         
         # Load data
@@ -349,46 +662,88 @@ class TrendSuccessPredictor:
             )
         
         # Scale features
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
-        # Try multiple models and select the best one
-        models = {
-            'Random Forest': RandomForestRegressor(n_estimators=50, random_state=random_state),
-            'Gradient Boosting': GradientBoostingRegressor(n_estimators=50, random_state=random_state),
-            'Ridge Regression': Ridge(alpha=1.0),
-            'Linear Regression': LinearRegression()
-        }
+        # Cross-validation folds (fall back to the holdout split on tiny datasets)
+        n_splits = min(cv_folds, len(X_train))
+        if n_splits >= 2:
+            folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X_train_scaled))
+            X_eval, y_eval = X_train_scaled, y_train
+        else:
+            n_splits = 1
+            X_eval = np.vstack([X_train_scaled, X_test_scaled])
+            y_eval = np.concatenate([y_train, y_test])
+            folds = [(np.arange(len(X_train_scaled)), np.arange(len(X_train_scaled), len(X_eval)))]
         
-        best_model = None
-        best_score = float('-inf')
-        best_name = ""
+        models = self._candidate_models(random_state, n_jobs, early_stopping_rounds)
+        print(f"Evaluating {len(models)} candidates with {n_splits}-fold CV (n_jobs={n_jobs})...")
         
-        for name, model in models.items():
-            try:
-                # Train model
-                model.fit(X_train_scaled, y_train)
-                
-                # Evaluate
-                y_pred = model.predict(X_test_scaled)
-                score = r2_score(y_test, y_pred)
-                
-                print(f"{name} R² Score: {score:.4f}")
-                
-                if score > best_score:
-                    best_score = score
-                    best_model = model
-                    best_name = name
-                    
-            except Exception as e:
-                print(f"Error training {name}: {e}")
-        
-        if best_model is None:
+        fold_results = Parallel(n_jobs=n_jobs)(
+            delayed(_evaluate_fold)(name, model, X_eval, y_eval, train_idx, test_idx)
+            for name, model in models.items()
+            for train_idx, test_idx in folds
+        )
+        
+        candidates = {}
+        for name in models:
+            results = [r for r in fold_results if r['name'] == name]
+            errors = [r['error'] for r in results if r['error']]
+            if errors:
+                print(f"Error training {name}: {errors[0]}")
+                continue
+            scores = [r['r2'] for r in results if not np.isnan(r['r2'])]
+            if not scores:
+                # Single-row folds: score the pooled out-of-fold predictions instead
+                pooled_idx = np.concatenate([r['test_idx'] for r in results])
+                scores = [r2_score(y_eval[pooled_idx], np.concatenate([r['y_pred'] for r in results]))]
+            candidates[name] = {
+                'cv_r2': float(np.mean(scores)),
+                'cv_r2_std': float(np.std(scores)),
+                'fit_time': float(np.mean([r['fit_time'] for r in results])),
+                'predict_time': float(np.mean([r['predict_time'] for r in results])),
+                'latency_ms': float(np.median([r['latency_ms'] for r in results]))
+            }
+        
+        if not candidates:
             print("No model could be trained successfully")
             sys.exit(1)
         
+        print(f"{'Model':<20} {'CV R²':>8} {'± std':>7} {'fit s':>8} {'predict s':>10} {'latency ms':>11}")
+        for name, result in candidates.items():
+            print(f"{name:<20} {result['cv_r2']:>8.4f} {result['cv_r2_std']:>7.4f} "
+                  f"{result['fit_time']:>8.3f} {result['predict_time']:>10.4f} {result['latency_ms']:>11.3f}")
+        
+        eligible = candidates
+        if latency_budget_ms is not None:
+            eligible = {name: r for name, r in candidates.items() if r['latency_ms'] <= latency_budget_ms}
+            if not eligible:
+                fastest = min(candidates, key=lambda name: candidates[name]['latency_ms'])
+                print(f"Warning: no model meets the {latency_budget_ms} ms latency budget, using fastest ({fastest})")
+                eligible = {fastest: candidates[fastest]}
+        
+        best_name = max(eligible, key=lambda name: eligible[name]['cv_r2'])
+        best_model = clone(models[best_name])
+        best_model.fit(X_train_scaled, y_train)
+        if 'n_jobs' in best_model.get_params():
+            # Single-row serving is faster without a thread pool per predict call
+            best_model.set_params(n_jobs=1)
+        
         self.model = best_model
         self.is_trained = True
+        self.prediction_cache.clear()
+        self.linear_state = _linear_state(X_train_scaled, y_train) if isinstance(best_model, (Ridge, LinearRegression)) else None
+        now = datetime.datetime.now().isoformat()
+        self.metadata = {
+            'model_name': best_name,
+            'trained_at': now,
+            'last_full_fit': now,
+            'incremental_updates': 0,
+            'trained_through': _latest_timestamp(df),
+            'n_training_rows': len(df),
+            'training_data_hash': hash_file(self.data_path)
+        }
         
         # Calculate final metrics
         y_pred_train = self.model.predict(X_train_scaled)
@@ -396,12 +751,16 @@ class TrendSuccessPredictor:
         
         metrics = {
             'best_model': best_name,
+            'cv_folds': n_splits,
+            'cv_r2': candidates[best_name]['cv_r2'],
+            'latency_ms': candidates[best_name]['latency_ms'],
             'train_r2': r2_score(y_train, y_pred_train),
             'test_r2': r2_score(y_test, y_pred_test),
             'train_mse': mean_squared_error(y_train, y_pred_train),
             'test_mse': mean_squared_error(y_test, y_pred_test),
             'train_mae': mean_absolute_error(y_train, y_pred_train),
-            'test_mae': mean_absolute_error(y_test, y_pred_test)
+            'test_mae': mean_absolute_error(y_test, y_pred_test),
+            'candidates': candidates
         }
         
         print(f"\nTraining completed! Best model: {best_name}")
@@ -411,6 +770,154 @@ class TrendSuccessPredictor:
         
         return metrics
     
+    def needs_full_refit(self, full_refit_every: int = 7, full_refit_days: int = 7) -> bool:
+        """
+        Check whether the scheduled full refit is due.
+        
+        Args:
+            full_refit_every (int): Max incremental updates between full refits
+            full_refit_days (int): Max days between full refits
+            
+        Returns:
+            bool: True if the next retrain should fit from scratch
+        """
+        if not self.is_trained or not self.metadata.get('last_full_fit'):
+            return True
+        if not isinstance(self.model, _incremental_model_types()):
+            return True
+        if self.metadata.get('incremental_updates', 0) >= full_refit_every:
+            return True
+        last_full_fit = datetime.datetime.fromisoformat(self.metadata['last_full_fit'])
+        return datetime.datetime.now() - last_full_fit >= datetime.timedelta(days=full_refit_days)
+    
+    def select_new_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Select rows analyzed after the model's training watermark.
+        
+        Args:
+            df (pd.DataFrame): Training data
+            
+        Returns:
+            pd.DataFrame: Rows newer than metadata['trained_through'] (all rows if unknown)
+        """
+        trained_through = self.metadata.get('trained_through')
+        if not trained_through or 'timestamp' not in df.columns:
+            return df
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce')
+        return df[timestamps > pd.Timestamp(trained_through)]
+    
+    def compare_models(self, reference_model, reference_scaler, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+        """
+        Drift metrics between a reference model and the current model.
+        
+        Args:
+            reference_model: Previously served (e.g. incrementally updated) model
+            reference_scaler: Scaler the reference model was trained with
+            X (np.ndarray): Unscaled feature matrix
+            y (np.ndarray): Target vector
+            
+        Returns:
+            Dict[str, float]: Mean absolute prediction gap, correlation and both models' R²/MAE
+        """
+        from sklearn.metrics import r2_score, mean_absolute_error
+        
+        reference_pred = reference_model.predict(reference_scaler.transform(X))
+        current_pred = self.model.predict(self.scaler.transform(X))
+        correlation = np.corrcoef(reference_pred, current_pred)[0, 1] if len(X) > 1 else float('nan')
+        return {
+            'prediction_mae': float(np.mean(np.abs(reference_pred - current_pred))),
+            'prediction_max_gap': float(np.max(np.abs(reference_pred - current_pred))),
+            'prediction_corr': float(correlation),
+            'reference_r2': float(r2_score(y, reference_pred)) if len(X) > 1 else float('nan'),
+            'current_r2': float(r2_score(y, current_pred)) if len(X) > 1 else float('nan'),
+            'reference_mae': float(mean_absolute_error(y, reference_pred)),
+            'current_mae': float(mean_absolute_error(y, current_pred))
+        }
+    
+    def train_incremental(
+        self,
+        extra_estimators: int = 10,
+        full_refit_every: int = 7,
+        full_refit_days: int = 7,
+        **train_kwargs
+    ) -> Dict[str, object]:
+        """
+        Update the loaded model with only the rows added since it was trained.
+        
+        Forests grow `extra_estimators` warm-started trees on the new rows, boosting
+        adds up to `extra_estimators` stages, and linear models are re-solved exactly
+        from accumulated normal-equation statistics. The scaler is kept frozen. When
+        the scheduled full refit is due, the model is retrained from scratch instead
+        and drift metrics against the incrementally updated model are reported.
+        
+        Args:
+            extra_estimators (int): Trees/stages added per update
+            full_refit_every (int): Max incremental updates between full refits
+            full_refit_days (int): Max days between full refits
+            **train_kwargs: Passed to train() on a full refit
+            
+        Returns:
+            Dict[str, object]: Update metrics ('mode' is 'incremental', 'full' or 'noop')
+        """
+        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.metrics import mean_absolute_error
+        
+        if self.needs_full_refit(full_refit_every, full_refit_days):
+            print("Full refit due, training from scratch...")
+            previous_model, previous_scaler = self.model, copy.deepcopy(self.scaler)
+            metrics = self.train(**train_kwargs)
+            metrics['mode'] = 'full'
+            if previous_model is not None:
+                X, y = self.prepare_features(self.load_data())
+                metrics['drift'] = self.compare_models(previous_model, previous_scaler, X, y)
+                print(f"Drift vs previous model: prediction MAE {metrics['drift']['prediction_mae']:.3f}, "
+                      f"R² {metrics['drift']['reference_r2']:.4f} -> {metrics['drift']['current_r2']:.4f}")
+            return metrics
+        
+        if not hasattr(self.model, 'get_params'):
+            raise ValueError("Incremental training needs the full estimator, load the model with for_training=True")
+        
+        new_df = self.select_new_rows(self.load_data())
+        if new_df.empty:
+            print("No new rows since last training, model unchanged")
+            return {'mode': 'noop', 'new_rows': 0}
+        
+        print(f"🔁 Incremental update with {len(new_df)} new rows...")
+        start = time.perf_counter()
+        X_new, y_new = self.prepare_features(new_df)
+        X_new_scaled = self.scaler.transform(X_new)
+        before = self.model.predict(X_new_scaled)
+        
+        if isinstance(self.model, RandomForestRegressor):
+            self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + extra_estimators)
+            self.model.fit(X_new_scaled, y_new)
+        elif isinstance(self.model, GradientBoostingRegressor):
+            self.model.set_params(warm_start=True, n_estimators=self.model.n_estimators_ + extra_estimators)
+            self.model.fit(X_new_scaled, y_new)
+        else:
+            self.linear_state = _linear_state(X_new_scaled, y_new, self.linear_state)
+            self.model.coef_, self.model.intercept_ = _solve_linear_state(
+                self.linear_state, getattr(self.model, 'alpha', 0.0))
+        
+        after = self.model.predict(X_new_scaled)
+        self.metadata['incremental_updates'] = self.metadata.get('incremental_updates', 0) + 1
+        self.metadata['trained_at'] = datetime.datetime.now().isoformat()
+        self.metadata['trained_through'] = _latest_timestamp(new_df) or self.metadata.get('trained_through')
+        self.metadata['n_training_rows'] = self.metadata.get('n_training_rows', 0) + len(new_df)
+        self.metadata['training_data_hash'] = hash_file(self.data_path)
+        
+        metrics = {
+            'mode': 'incremental',
+            'new_rows': len(new_df),
+            'update_seconds': time.perf_counter() - start,
+            'incremental_updates': self.metadata['incremental_updates'],
+            'new_rows_mae_before': float(mean_absolute_error(y_new, before)),
+            'new_rows_mae_after': float(mean_absolute_error(y_new, after))
+        }
+        print(f"Incremental update #{metrics['incremental_updates']} done in {metrics['update_seconds']:.2f}s")
+        print(f"New rows MAE: {metrics['new_rows_mae_before']:.2f} -> {metrics['new_rows_mae_after']:.2f}")
+        return metrics
+    
     def predict_trend_success(
         self,
         keyword: str,
@@ -425,7 +932,100 @@ class TrendSuccessPredictor:
             target_audience = ["All Ages"]
         
         # Normalize inputs
-        platform = platform.lower()
+        platform, demographics = self.normalize_request(platform, target_audience)
+        normalized_keyword = ' '.join(keyword.split())
+        
+        # Identical normalized requests share one cached (and coalesced) computation
+        with PREDICT_STAGE_SECONDS.time('total'):
+            key = (normalized_keyword, platform, demographics, audio_fingerprint(audio_path), self.model_version)
+            scored = self.prediction_cache.get_or_compute(
+                key, lambda: self._score(normalized_keyword, audio_path, platform, demographics))
+        PREDICTIONS.inc()
+        
+        return self._result(keyword, audio_path, platform, target_audience, demographics, scored)
+    
+    def predict_many(self, requests: List[Dict]) -> List[Dict[str, Union[float, str, Dict]]]:
+        """
+        Predict trend success for several recipes at once.
+        
+        Cached recipes are answered from the prediction cache; the rest are
+        featurized, scaled and scored by the model in one batch.
+        
+        Args:
+            requests (List[Dict]): Recipes with 'keyword' and optional 'audio_path',
+                'platform' (default 'TikTok') and 'target_audience' (default ['All Ages'])
+            
+        Returns:
+            List[Dict]: One prediction per request, in the same shape as predict_trend_success()
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        with PREDICT_STAGE_SECONDS.time('total'):
+            normalized = []
+            for request in requests:
+                keyword = request['keyword']
+                audio_path = request.get('audio_path')
+                target_audience = request.get('target_audience') or ["All Ages"]
+                platform, demographics = self.normalize_request(request.get('platform', "TikTok"), target_audience)
+                normalized_keyword = ' '.join(keyword.split())
+                key = (normalized_keyword, platform, demographics, audio_fingerprint(audio_path), self.model_version)
+                normalized.append((key, keyword, normalized_keyword, audio_path, platform, target_audience, demographics))
+            
+            # Score every distinct uncached recipe in one model call, then publish through the cache
+            cached, missing = {}, {}
+            for key, _, normalized_keyword, audio_path, platform, _, demographics in normalized:
+                if key in cached or key in missing:
+                    continue
+                scored = self.prediction_cache.get(key)
+                if scored is None:
+                    missing[key] = (normalized_keyword, audio_path, platform, demographics)
+                else:
+                    cached[key] = scored
+            batch = dict(zip(missing, self._score_batch(list(missing.values())))) if missing else {}
+            
+            results = []
+            for key, keyword, _, audio_path, platform, target_audience, demographics in normalized:
+                if key in cached:
+                    scored = cached[key]
+                else:
+                    scored = self.prediction_cache.get_or_compute(key, lambda key=key: batch[key])
+                results.append(self._result(keyword, audio_path, platform, target_audience, demographics, scored))
+        PREDICTIONS.inc(len(results))
+        return results
+    
+    def _result(self, keyword: str, audio_path: Optional[str], platform: str, target_audience: List[str],
+                demographics: str, scored: Dict) -> Dict[str, Union[float, str, Dict]]:
+        """Detailed prediction result for one request from its (shared) cached score."""
+        return {
+            'success_score': scored['success_score'],
+            'confidence': 'Medium' if self._training_rows() > 10 else 'Low',
+            'input_analysis': {
+                'keyword': keyword,
+                'platform': platform.title(),
+                'target_audience': target_audience,
+                'predicted_demographics': demographics.title(),
+                'keyword_length': len(keyword),
+                'keyword_word_count': len(keyword.split()),
+                'hashtag_count': keyword.count('#')
+            },
+            'audio_analysis': dict(scored['audio_analysis']) if audio_path else None,
+            'recommendations': list(scored['recommendations'])
+        }
+    
+    @staticmethod
+    def normalize_request(platform: str, target_audience: List[str]) -> Tuple[str, str]:
+        """
+        Map a requested platform and audience list to the model's categories.
+        
+        Args:
+            platform (str): Platform name, e.g. 'YouTube Shorts'
+            target_audience (List[str]): Audience labels, e.g. ['Gen-Z']
+            
+        Returns:
+            Tuple[str, str]: Platform ('tiktok', 'youtube', 'instagram') and
+            demographics ('gen z', 'millennial', 'all age')
+        """
         platform_map = {
             'youtube shorts': 'youtube',
             'youtube': 'youtube',
@@ -433,7 +1033,7 @@ class TrendSuccessPredictor:
             'instagram reels': 'instagram',
             'instagram': 'instagram'
         }
-        platform = platform_map.get(platform, 'tiktok')
+        platform = platform_map.get(platform.lower(), 'tiktok')
         
         # Determine demographics from target audience
         audience_lower = [aud.lower() for aud in target_audience]
@@ -443,9 +1043,41 @@ class TrendSuccessPredictor:
             demographics = 'millennial'
         else:
             demographics = 'all age'
+        return platform, demographics
+    
+    @property
+    def model_version(self) -> str:
+        """Identifier of the loaded model, part of every prediction cache key."""
+        return str(self.metadata.get('trained_at') or self.metadata.get('training_data_hash') or id(self.model))
+    
+    def _score(self, keyword: str, audio_path: Optional[str], platform: str, demographics: str) -> Dict:
+        """
+        Compute the model score, audio analysis and recommendations for normalized inputs.
         
+        Args:
+            keyword (str): Normalized keyword text
+            audio_path (str): Path to the audio file (optional)
+            platform (str): Normalized platform
+            demographics (str): Normalized demographics bucket
+            
+        Returns:
+            Dict: success_score, audio_analysis and recommendations
+        """
+        return self._score_batch([(keyword, audio_path, platform, demographics)])[0]
+    
+    def _score_batch(self, items: List[Tuple[str, Optional[str], str, str]]) -> List[Dict]:
+        """
+        Score several normalized (keyword, audio_path, platform, demographics) inputs
+        with one feature extraction, scaling and model call.
+        
+        Args:
+            items (List[Tuple]): Normalized inputs, as passed to _score()
+            
+        Returns:
+            List[Dict]: success_score, audio_analysis and recommendations per input
+        """
         # Create input dataframe
-        input_data = {
+        input_data = [{
             'description': keyword,
             'transcription': '',
             'source': platform,
@@ -457,50 +1089,53 @@ class TrendSuccessPredictor:
             'views': 1,
             'comments': 0,
             'shares': 0
-        }
+        } for keyword, _, platform, demographics in items]
         
-        df_input = pd.DataFrame([input_data])
+        df_input = pd.DataFrame(input_data)
         
         # Extract features
-        X, _ = self.prepare_features(df_input)
+        with PREDICT_STAGE_SECONDS.time('prepare_features'):
+            X, _ = self.prepare_features(df_input)
         
         # Scale features
-        X_scaled = self.scaler.transform(X)
+        with PREDICT_STAGE_SECONDS.time('scale'):
+            X_scaled = self.scaler.transform(X)
         
         # Make prediction
-        prediction = self.model.predict(X_scaled)[0]
-        
-        # Ensure prediction is within valid range
-        prediction = max(0, min(100, prediction))
-        
-        # Extract audio features if provided
-        audio_features = {}
-        if audio_path:
-            audio_features = self.extract_audio_features(audio_path)
-            # Adjust prediction based on audio features
-            tempo_boost = min((audio_features['tempo'] - 100) / 100, 0.2)  # Up to 20% boost for high tempo
-            energy_boost = audio_features['energy'] * 0.1  # Up to 10% boost for high energy
-            prediction += (tempo_boost + energy_boost) * 10
-            prediction = max(0, min(100, prediction))
-        
-        # Create detailed result
-        result = {
-            'success_score': round(prediction, 2),
-            'confidence': 'Medium' if len(self.load_data()) > 10 else 'Low',
-            'input_analysis': {
-                'keyword': keyword,
-                'platform': platform.title(),
-                'target_audience': target_audience,
-                'predicted_demographics': demographics.title(),
-                'keyword_length': len(keyword),
-                'keyword_word_count': len(keyword.split()),
-                'hashtag_count': keyword.count('#')
-            },
-            'audio_analysis': audio_features if audio_path else None,
-            'recommendations': self._generate_recommendations(prediction, keyword, platform, demographics)
-        }
+        with PREDICT_STAGE_SECONDS.time('model_predict'):
+            predictions = self.model.predict(X_scaled)
         
-        return result
+        scored = []
+        for (keyword, audio_path, platform, demographics), prediction in zip(items, predictions):
+            # Ensure prediction is within valid range
+            prediction = max(0, min(100, prediction))
+            
+            # Extract audio features if provided
+            audio_features = {}
+            if audio_path:
+                with PREDICT_STAGE_SECONDS.time('audio_features'):
+                    audio_features = self.audio_features(audio_path)
+                # Adjust prediction based on audio features
+                tempo_boost = min((audio_features['tempo'] - 100) / 100, 0.2)  # Up to 20% boost for high tempo
+                energy_boost = audio_features['energy'] * 0.1  # Up to 10% boost for high energy
+                prediction += (tempo_boost + energy_boost) * 10
+                prediction = max(0, min(100, prediction))
+            
+            with PREDICT_STAGE_SECONDS.time('recommendations'):
+                recommendations = self._generate_recommendations(prediction, keyword, platform, demographics)
+            
+            scored.append({
+                'success_score': round(float(prediction), 2),
+                'audio_analysis': audio_features,
+                'recommendations': recommendations
+            })
+        return scored
+    
+    def _training_rows(self) -> int:
+        """Number of rows the model was trained on (read from the data file once if unknown)."""
+        if self.metadata.get('n_training_rows') is None:
+            self.metadata['n_training_rows'] = len(self.load_data())
+        return self.metadata['n_training_rows']
     
     def _generate_recommendations(
         self,
@@ -544,56 +1179,105 @@ class TrendSuccessPredictor:
         
         return recommendations
     
-    def save_model(self, filepath: str = "ml/models/trend_success_model.pkl"):
+    def save_model(self, filepath: str = MODEL_PATH):
         """
-        Save the trained model to disk.
+        Save the trained model to disk as a versioned artifact directory.
         
         Args:
-            filepath (str): Path to save the model
+            filepath (str): Artifact directory to write
         """
         if not self.is_trained:
             raise ValueError("Model must be trained before saving")
+        if not hasattr(self.model, 'get_params'):
+            raise ValueError("Predict-only models cannot be saved, load the model with for_training=True")
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        model_data = {
-            'model': self.model,
-            'scaler': self.scaler,
-            'feature_names': self.feature_names,
-            'is_trained': self.is_trained
-        }
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(model_data, f)
+        save_artifact(
+            filepath,
+            self.model,
+            self.scaler,
+            self.feature_names,
+            self.metadata,
+            training_data_hash=self.metadata.get('training_data_hash'),
+            linear_state=self.linear_state
+        )
         
         print(f"Model saved to {filepath}")
     
-    def load_model(self, filepath: str = "ml/models/trend_success_model.pkl"):
+    def load_model(self, filepath: str = MODEL_PATH, for_training: bool = False):
         """
         Load a trained model from disk.
         
+        Artifact directories are validated and their arrays memory-mapped
+        read-only, so all workers on a host share one copy of the model. Legacy
+        pickle files are still accepted.
+        
         Args:
-            filepath (str): Path to the saved model
+            filepath (str): Artifact directory (or legacy .pkl file)
+            for_training (bool): Load the full scikit-learn estimator so it can be
+                retrained, instead of the predict-only memory-mapped model
         """
+        requested_path = filepath
+        filepath = self._resolve_model_path(filepath)
+        
+        start = time.perf_counter()
+        # Stamp taken before reading, so a swap during the load is seen by the next check
+        stamp = self.model_stamp(filepath)
         try:
-            with open(filepath, 'rb') as f:
-                model_data = pickle.load(f)
-            
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.feature_names = model_data['feature_names']
-            self.is_trained = model_data['is_trained']
+            if os.path.isdir(filepath):
+                artifact = load_artifact(filepath)
+                manifest = artifact['manifest']
+                self.feature_names = artifact['feature_names']
+                self.metadata = manifest.get('metadata') or {}
+                self.metadata['training_data_hash'] = manifest.get('training_data_hash')
+                if for_training:
+                    estimator = load_estimator(filepath)
+                    self.model = estimator['model']
+                    self.scaler = estimator['scaler']
+                    self.linear_state = estimator.get('linear_state')
+                else:
+                    self.model = artifact['model']
+                    self.scaler = artifact['scaler']
+                self.is_trained = True
+            else:
+                with open(filepath, 'rb') as f:
+                    model_data = pickle.load(f)
+                
+                self.model = model_data['model']
+                self.scaler = model_data['scaler']
+                self.feature_names = model_data['feature_names']
+                self.is_trained = model_data['is_trained']
+                self.metadata = model_data.get('metadata', {})
+                self.linear_state = model_data.get('linear_state')
             
+            self.prediction_cache.clear()
+            self.model_path, self._model_stamp = requested_path, stamp
+            self._last_reload_check = time.monotonic()
+            PREDICT_STAGE_SECONDS.observe(time.perf_counter() - start, 'model_load')
             print(f"Model loaded from {filepath}")
             
         except FileNotFoundError:
             print(f"Error: Model file {filepath} not found")
+        except ArtifactError as e:
+            print(f"Error: Invalid model artifact {filepath}: {e}")
         except Exception as e:
             print(f"Error loading model: {e}")
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the trend success model")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the saved model with rows added since it was trained")
+    parser.add_argument("--extra-estimators", type=int, default=10,
+                        help="Trees/boosting stages added per incremental update")
+    parser.add_argument("--full-refit-every", type=int, default=7,
+                        help="Incremental updates allowed before a full refit")
+    parser.add_argument("--full-refit-days", type=int, default=7,
+                        help="Days allowed between full refits")
+    args = parser.parse_args(argv)
+    
     print("Trend Success Predictor")
     print("=" * 50)
     
@@ -601,7 +1285,15 @@ def main():
     predictor = TrendSuccessPredictor()
     
     # Train the model
-    metrics = predictor.train()
+    if args.incremental:
+        predictor.load_model(for_training=True)
+        metrics = predictor.train_incremental(
+            extra_estimators=args.extra_estimators,
+            full_refit_every=args.full_refit_every,
+            full_refit_days=args.full_refit_days
+        )
+    else:
+        metrics = predictor.train()
     
     # Save the model
     predictor.save_model()
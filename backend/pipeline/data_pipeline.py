@@ -1,16 +1,22 @@
 import os
 import pandas as pd
-import yt_dlp as youtube_dl
-import whisper
 from datetime import datetime
-import numpy as np
 from dotenv import load_dotenv
 from google.cloud import bigquery
 import sys
 
 sys.path.append(".")
-from ml.sentiment_analysis import main as tag_videos
-from ml.demographics_analysis import main as get_demographics
+from ml.enrichment import main as enrich_videos, default_enrichers
+from ml.trend_aggregates import TrendAggregates, AGGREGATES_PATH
+from ml.heavy_hitters import update_daily_sketch
+from ml.schema import apply_schema, to_csv_frame, TAGS_FORMAT
+from ml.audio_store import shared_store as shared_audio_store
+from pipeline.normalize import normalize_sources, FINAL_COLUMNS
+from pipeline.stt import load_transcribers
+from pipeline.video_fetch import VideoFetcher
+from pipeline.transcription import SegmentTranscriber, WORKERS as TRANSCRIBE_WORKERS
+from pipeline.run_report import RunReport, frame_bytes, file_bytes
+from google_bigquery.main import get_client
 
 load_dotenv()
 
@@ -19,137 +25,111 @@ TIKTOK_CSV = "pipeline/data/tiktok_collected_liked_videos.csv"
 YOUTUBE_CSV = "pipeline/data/USvideos.csv"
 AUDIO_DIR = "pipeline/audios"
 OUTPUT_DIR = "ml/data"
+REPORT_DIR = "ml/data/run_reports"
 
 # Ensure directories exist
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-client = bigquery.Client.from_service_account_json(os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
+def _report(report):
+    """Use the caller's run report, or a throwaway one when called standalone."""
+    return report if report is not None else RunReport()
 
-def extract_hashtags(text):
-    """Extract hashtags from text"""
-    if pd.isna(text):
-        return []
-    return [tag.strip() for tag in str(text).split() if tag.startswith('#')]
-
-def get_video_info(url: str):
-    """Get video information using yt-dlp"""
-    ydl_opts = {
-        "format": "bestaudio/best",
-        "noplaylist": True,
-        "quiet": True
-    }
-    
-    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-        try:
-            result = ydl.extract_info(url, download=False)
-            return result
-        except:
-            return None
-
-def extract():
+def extract(report: RunReport = None):
     """Extract data from sources"""
-    # Load TikTok data
-    tiktok_df = pd.read_csv(TIKTOK_CSV, nrows=5)
-    
-    # Load YouTube data
-    youtube_df = pd.read_csv(YOUTUBE_CSV, nrows=1)
+    report = _report(report)
+    with report.stage("extract") as stage:
+        # Load TikTok data
+        tiktok_df = pd.read_csv(TIKTOK_CSV, nrows=5)
+        
+        # Load YouTube data
+        youtube_df = pd.read_csv(YOUTUBE_CSV, nrows=1)
+        stage.add(rows=len(tiktok_df) + len(youtube_df),
+                  bytes=frame_bytes(tiktok_df) + frame_bytes(youtube_df))
+    report.frame("extract_tiktok", tiktok_df)
+    report.frame("extract_youtube", youtube_df)
     
     return tiktok_df, youtube_df
 
-def transform(tiktok_df, youtube_df):
+def transform(tiktok_df, youtube_df, report: RunReport = None):
     """Transform extracted data"""
-    # Transform TikTok data
-    tiktok_columns = {
-        'user_name': 'creator',
-        'video_id': 'video_id',
-        'video_desc': 'description',
-        'video_time': 'publish_time',
-        'video_length': 'duration',
-        'video_link': 'url',
-        'n_likes': 'likes',
-        'n_shares': 'shares',
-        'n_comments': 'comments',
-        'n_plays': 'views'
-    }
-    
-    tiktok_df = tiktok_df[tiktok_columns.keys()].rename(columns=tiktok_columns)
-    tiktok_df['source'] = 'tiktok'
-    tiktok_df['transcription'] = None
-    tiktok_df['tags'] = tiktok_df['description'].apply(extract_hashtags)
-    tiktok_df['publish_time'] = pd.to_datetime(tiktok_df['publish_time'], unit='s', utc=True)
-
-    # Transform YouTube data
-    youtube_columns = {
-        'video_id': 'video_id',
-        'title': 'description',
-        'channel_title': 'creator',
-        'publish_time': 'publish_time',
-        'views': 'views',
-        'likes': 'likes',
-        'comment_count': 'comments',
-        'tags': 'tags'
-    }
-    
-    youtube_df = youtube_df[youtube_columns.keys()].rename(columns=youtube_columns)
-    youtube_df['tags'] = youtube_df['tags'].apply(lambda x: [] if pd.isna(x) else str(x).split('|'))
-    youtube_df['shares'] = np.nan
-    youtube_df['source'] = 'youtube'
-    youtube_df['url'] = 'https://youtube.com/watch?v=' + youtube_df['video_id']
-    youtube_df['publish_time'] = pd.to_datetime(youtube_df['publish_time'])
+    report = _report(report)
+    # Map both sources onto the unified schema (columnar, see pipeline/normalize.py)
+    with report.stage("normalize", rows=len(tiktok_df) + len(youtube_df)) as stage:
+        combined_df = normalize_sources(tiktok_df, youtube_df, tags_format=TAGS_FORMAT)
+        stage.add(bytes=frame_bytes(combined_df))
 
     # Process YouTube metadata
-    model = whisper.load_model("base")
+    # Speech-to-text backend (STT_BACKEND / STT_MODEL_SIZE), one transcriber per segment worker
+    with report.stage("stt_load"):
+        transcriber = SegmentTranscriber(load_transcribers(TRANSCRIBE_WORKERS))
+    audio_store = shared_audio_store()
+    
+    # One yt-dlp session for metadata and audio, with cached metadata (see pipeline/video_fetch.py)
+    fetcher = VideoFetcher(AUDIO_DIR)
     
-    def process_single_video(row):
-        info = get_video_info(row['url'])
-        if info:
-            row['duration'] = info.get('duration', None)
+    def process_single_video(idx, row):
+        with report.stage("yt_dlp_fetch", rows=1) as stage:
+            fetched = fetcher.fetch(row['video_id'], row['url'])
+            stage.add(bytes=fetched.downloaded_bytes, cache_hits=int(fetched.cached))
+        if fetched.info:
+            combined_df.at[idx, 'duration'] = fetched.info.get('duration', None)
             try:
-                audio_path = f"{AUDIO_DIR}/{row['video_id']}.m4a"
-                if not os.path.exists(audio_path):
-                    ydl_opts = {
-                        "format": "bestaudio/best",
-                        "outtmpl": audio_path,
-                        "quiet": True
-                    }
-                    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([row['url']])
-                
-                if os.path.exists(audio_path):
-                    result = model.transcribe(audio_path, fp16=False)
-                    row['transcription'] = result["text"]
+                audio_path = fetched.audio_path
+                if audio_path:
+                    # Decoded once and memory-mapped; scoring reuses the same samples
+                    with report.stage("audio_decode", rows=1, bytes=file_bytes(audio_path)):
+                        audio = audio_store.samples(audio_path)
+                    with report.stage("transcription", rows=1, bytes=audio.nbytes) as stage:
+                        result = transcriber.transcribe(audio, audio_store.sample_rate)
+                        stage.add(audio_seconds=result.transcribed_seconds, segments=result.segments)
+                    combined_df.at[idx, 'transcription'] = result.text
             except:
-                row['transcription'] = None
-        return row
+                combined_df.at[idx, 'transcription'] = None
     
-    youtube_df = youtube_df.apply(process_single_video, axis=1)
-
-    # Combine datasets
-    combined_df = pd.concat([tiktok_df, youtube_df], ignore_index=True)
-    
-    # Ensure consistent column order
-    final_columns = [
-        'video_id', 'creator', 'description', 'publish_time', 'duration',
-        'url', 'likes', 'shares', 'comments', 'views', 'source',
-        'transcription', 'tags'
-    ]
+    youtube_rows = combined_df[combined_df['source'] == 'youtube']
+    for idx, row in youtube_rows[['video_id', 'url']].iterrows():
+        process_single_video(idx, row)
+    fetcher.close()
+    transcriber.close()
+    print(f"✓ yt-dlp: {fetcher.stats}")
     
-    return combined_df[final_columns]
+    # Compact dtypes (categoricals, nullable ints, Arrow tags) for the rest of the run
+    with report.stage("schema", rows=len(combined_df)):
+        combined_df = apply_schema(combined_df[FINAL_COLUMNS])
+    report.frame("transform", combined_df)
+    return combined_df
 
-def load(df, dataset_id="analyzed_data", table_id="trends"):
+def load(df, dataset_id="analyzed_data", table_id="trends", report: RunReport = None):
     """Load data into BigQuery"""
-    # Tag videos with sentiment
-    df = tag_videos(df)
-
-    # Get demographics
-    df = get_demographics(df)
+    report = _report(report)
+    # Tag videos with sentiment, demographics and language in one pass
+    timings = {}
+    with report.stage("enrichment", rows=len(df), bytes=frame_bytes(df)) as enrichment:
+        df = enrich_videos(df, default_enrichers(os.getenv("SENTIMENT_BACKEND", "vader")), timings=timings)
+    # The enrichers share one pass, so each reports its own time and the pass's peak memory
+    for name, seconds in timings.items():
+        report.record(name, seconds, rows=len(df), peak_rss=enrichment.peak_rss)
+    report.frame("enrichment", df)
+    
+    # Slide the windowed trend aggregates forward with just this load's rows
+    with report.stage("aggregates", rows=len(df)):
+        aggregates = TrendAggregates.load(AGGREGATES_PATH)
+        aggregates.update(df)
+        aggregates.save(AGGREGATES_PATH)
+    
+    # Fixed-memory top tags: today's checkpointed Space-Saving sketch
+    with report.stage("tag_sketch", rows=len(df)):
+        update_daily_sketch(df, capacity=int(os.getenv("TAG_SKETCH_CAPACITY", "1000")))
     
     output_path = "ml/data/analyzed_videos_with_demographics.csv"
-    df.to_csv(output_path, index=False)
+    with report.stage("csv_write", rows=len(df)) as stage:
+        to_csv_frame(df).to_csv(output_path, index=False)
+        stage.add(bytes=file_bytes(output_path))
     print(f"Combined data saved to {output_path}")
 
     # Ensure dataset exists
+    client = get_client()
     dataset_ref = f"{client.project}.{dataset_id}"
     try:
         client.get_dataset(dataset_ref)
@@ -167,25 +147,36 @@ def load(df, dataset_id="analyzed_data", table_id="trends"):
         skip_leading_rows=1,
         autodetect=True,
         write_disposition="WRITE_APPEND",
+        schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
     )
     
-    with open(output_path, "rb") as f:
-        job = client.load_table_from_file(f, table_ref, job_config=job_config)
-    job.result()
+    with report.stage("bigquery_load", bytes=file_bytes(output_path)) as stage:
+        with open(output_path, "rb") as f:
+            job = client.load_table_from_file(f, table_ref, job_config=job_config)
+        job.result()
+        stage.add(rows=job.output_rows or 0)
     print(f"Loaded {job.output_rows} rows into {dataset_id}:{table_id}.")
 
 def main():
+    report = RunReport("etl")
+    
     # Extract
     print("Extracting data...")
-    tiktok_df, youtube_df = extract()
+    tiktok_df, youtube_df = extract(report)
     
     # Transform
     print("Transforming data...")
-    combined_df = transform(tiktok_df, youtube_df)
+    with report.stage("transform") as stage:
+        combined_df = transform(tiktok_df, youtube_df, report)
+        stage.add(rows=len(combined_df), bytes=frame_bytes(combined_df))
     
     # Load
     print("Loading data...")
-    load(combined_df)
+    load(combined_df, report=report)
+    
+    report.print_summary()
+    report.save(REPORT_DIR)
+    return report.to_dict()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""
+Columnar Source Normalization
+
+Maps the raw TikTok and YouTube frames onto the unified video schema used
+by the rest of the pipeline (FINAL_COLUMNS), without per-row Python
+functions: hashtags are extracted with vectorized whitespace splitting and
+prefix matching, YouTube tags with a vectorized split on '|', URLs with
+string concatenation and timestamps with vectorized parsing.
+
+pyarrow compute kernels are used when pyarrow is installed (they release
+the GIL, so chunks are normalized in parallel threads); otherwise the same
+steps run on pandas string methods. Both paths produce identical output,
+including Python lists in the 'tags' column. Building those per-row lists
+is the dominant cost at millions of rows; with tags_format='arrow' the tags
+stay in a single Arrow list column (offsets plus values) instead.
+
+The media step (yt-dlp metadata, audio download, Whisper transcription)
+stays in data_pipeline.transform(), after normalization.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+FINAL_COLUMNS = [
+    'video_id', 'creator', 'description', 'publish_time', 'duration',
+    'url', 'likes', 'shares', 'comments', 'views', 'source',
+    'transcription', 'tags'
+]
+
+TIKTOK_COLUMNS = {
+    'user_name': 'creator',
+    'video_id': 'video_id',
+    'video_desc': 'description',
+    'video_time': 'publish_time',
+    'video_length': 'duration',
+    'video_link': 'url',
+    'n_likes': 'likes',
+    'n_shares': 'shares',
+    'n_comments': 'comments',
+    'n_plays': 'views'
+}
+
+YOUTUBE_COLUMNS = {
+    'video_id': 'video_id',
+    'title': 'description',
+    'channel_title': 'creator',
+    'publish_time': 'publish_time',
+    'views': 'views',
+    'likes': 'likes',
+    'comment_count': 'comments',
+    'tags': 'tags'
+}
+
+YOUTUBE_URL_PREFIX = 'https://youtube.com/watch?v='
+CHUNK_ROWS = 200_000
+
+# Tokens that start with '#': a '#' at the start or after whitespace, up to the next whitespace
+_HASHTAG_PATTERN = r'(?<!\S)#\S*'
+
+
+def _as_strings(values: pd.Series) -> pd.Series:
+    """String-dtype series (non-strings stringified, missing values as NA)."""
+    return values.astype("string")
+
+
+def _arrow_lists(lists, mask=None):
+    """
+    Arrow list array with nulls as empty lists, optionally keeping only the
+    values where `mask` (aligned with the flattened values) is true.
+    """
+    values = pc.list_flatten(lists)
+    parents = pc.list_parent_indices(lists).to_numpy()
+    if mask is not None:
+        keep = mask.to_numpy(zero_copy_only=False)
+        values = values.filter(mask)
+        parents = parents[keep]
+    counts = np.bincount(parents, minlength=len(lists))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    return pa.ListArray.from_arrays(pa.array(offsets), values)
+
+
+def _tags_output(lists, index: pd.Index, tags_format: str):
+    if tags_format == 'arrow':
+        return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=index)
+    return lists.to_pylist()
+
+
+def extract_hashtags_column(texts: pd.Series, tags_format: str = 'list'):
+    """
+    Hashtags of every text, like extract_hashtags() applied per row.
+
+    Args:
+        texts (pd.Series): Descriptions (missing values give [])
+        tags_format (str): 'list' for Python lists, 'arrow' for an Arrow list column
+
+    Returns:
+        One list of '#'-prefixed tokens per row
+    """
+    strings = _as_strings(texts)
+    if pa is not None:
+        tokens = pc.utf8_split_whitespace(pa.array(strings, type=pa.string()))
+        hashtags = _arrow_lists(tokens, pc.starts_with(pc.list_flatten(tokens), '#'))
+        return _tags_output(hashtags, texts.index, tags_format)
+    return strings.fillna('').astype(object).str.findall(_HASHTAG_PATTERN).tolist()
+
+
+def split_tags_column(tags: pd.Series, separator: str = '|', tags_format: str = 'list'):
+    """
+    Split separator-joined tag strings, like str(x).split('|') per row.
+
+    Args:
+        tags (pd.Series): Tag strings (missing values give [])
+        separator (str): Tag separator
+        tags_format (str): 'list' for Python lists, 'arrow' for an Arrow list column
+
+    Returns:
+        One list of tags per row
+    """
+    strings = _as_strings(tags)
+    if pa is not None:
+        split = _arrow_lists(pc.split_pattern(pa.array(strings, type=pa.string()), separator))
+        return _tags_output(split, tags.index, tags_format)
+    split = strings.fillna('').astype(object).str.split(separator, regex=False)
+    return [parts if present else [] for parts, present in zip(split, strings.notna())]
+
+
+def normalize_tiktok(df: pd.DataFrame, tags_format: str = 'list') -> pd.DataFrame:
+    """
+    Raw TikTok rows in the unified schema.
+
+    Args:
+        df (pd.DataFrame): tiktok_collected_liked_videos rows
+        tags_format (str): 'list' or 'arrow' (see module docstring)
+
+    Returns:
+        pd.DataFrame: Rows with FINAL_COLUMNS
+    """
+    out = df[list(TIKTOK_COLUMNS)].rename(columns=TIKTOK_COLUMNS)
+    out['source'] = 'tiktok'
+    out['transcription'] = None
+    out['tags'] = extract_hashtags_column(out['description'], tags_format)
+    out['publish_time'] = pd.to_datetime(out['publish_time'], unit='s', utc=True)
+    return out[FINAL_COLUMNS]
+
+
+def normalize_youtube(df: pd.DataFrame, tags_format: str = 'list') -> pd.DataFrame:
+    """
+    Raw YouTube rows in the unified schema (duration and transcription are
+    filled in by the media step).
+
+    Args:
+        df (pd.DataFrame): USvideos rows
+        tags_format (str): 'list' or 'arrow' (see module docstring)
+
+    Returns:
+        pd.DataFrame: Rows with FINAL_COLUMNS
+    """
+    out = df[list(YOUTUBE_COLUMNS)].rename(columns=YOUTUBE_COLUMNS)
+    out['tags'] = split_tags_column(out['tags'], tags_format=tags_format)
+    out['shares'] = np.nan
+    out['source'] = 'youtube'
+    video_ids = out['video_id'].astype(str)
+    if pa is not None:
+        urls = pc.binary_join_element_wise(YOUTUBE_URL_PREFIX, pa.array(video_ids, type=pa.string()), '')
+        out['url'] = urls.to_pylist()
+    else:
+        out['url'] = YOUTUBE_URL_PREFIX + video_ids
+    out['publish_time'] = pd.to_datetime(out['publish_time'], format='ISO8601')
+    out['duration'] = np.nan
+    out['transcription'] = None
+    return out[FINAL_COLUMNS]
+
+
+def _chunks(df: pd.DataFrame, rows: int) -> List[pd.DataFrame]:
+    return [df.iloc[start:start + rows] for start in range(0, len(df), rows)] or [df]
+
+
+def normalize_sources(tiktok_df: pd.DataFrame, youtube_df: pd.DataFrame, n_threads: Optional[int] = None,
+                      chunk_rows: int = CHUNK_ROWS, tags_format: str = 'list') -> pd.DataFrame:
+    """
+    Normalize both sources into one frame, chunked across threads.
+
+    Args:
+        tiktok_df (pd.DataFrame): Raw TikTok rows
+        youtube_df (pd.DataFrame): Raw YouTube rows
+        n_threads (int): Worker threads (CPU count if None; 1 runs inline)
+        chunk_rows (int): Rows per chunk
+        tags_format (str): 'list' for Python lists (the pipeline schema) or 'arrow'
+            for an Arrow list column (requires pyarrow)
+
+    Returns:
+        pd.DataFrame: TikTok rows followed by YouTube rows, with FINAL_COLUMNS
+    """
+    if tags_format not in ('list', 'arrow'):
+        raise ValueError(f"Unknown tags_format: {tags_format}")
+    if tags_format == 'arrow' and pa is None:
+        raise ImportError("tags_format='arrow' requires pyarrow")
+    tasks = [(normalize_tiktok, chunk) for chunk in _chunks(tiktok_df, chunk_rows)]
+    tasks += [(normalize_youtube, chunk) for chunk in _chunks(youtube_df, chunk_rows)]
+    n_threads = n_threads or os.cpu_count() or 1
+    if n_threads == 1 or len(tasks) == 1:
+        parts = [fn(chunk, tags_format) for fn, chunk in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            parts = list(pool.map(lambda task: task[0](task[1], tags_format), tasks))
+    return pd.concat(parts, ignore_index=True)
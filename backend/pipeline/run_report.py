@@ -0,0 +1,276 @@
+"""
+ETL Run Report
+
+Records wall time, rows, bytes and peak resident memory for each stage of
+an ETL run and writes them as a JSON report next to the pipeline outputs.
+
+Stages are timed with RunReport.stage() (a context manager that can be
+entered repeatedly, e.g. once per downloaded video, and accumulates) or
+recorded directly with RunReport.record() when the timing was measured
+elsewhere. While any stage is active a background thread samples the
+process RSS so each stage reports the peak it reached. RunReport.frame()
+adds the per-column memory and dtypes of the frame a stage hands on.
+"""
+
+import datetime
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes.
+
+    Uses psutil when installed, /proc/self/statm on Linux and the process
+    peak from getrusage as a last resort.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return process_peak_rss()
+
+
+def process_peak_rss() -> int:
+    """Peak resident set size of this process since start, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def frame_bytes(df) -> int:
+    """In-memory size of a DataFrame including object columns, in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_by_column(df) -> Dict[str, Dict[str, object]]:
+    """Deep in-memory size (bytes) and dtype of each column of a DataFrame."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {column: {"dtype": str(df[column].dtype), "bytes": int(usage[column])} for column in df.columns}
+
+
+def file_bytes(path: str) -> int:
+    """Size of a file in bytes (0 if it does not exist)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements of one named stage."""
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    peak_rss: int = 0
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    def add(self, rows: int = 0, bytes: int = 0, **extra):
+        """
+        Count processed rows/bytes (and any extra numeric fields) for this stage.
+
+        Args:
+            rows (int): Rows processed
+            bytes (int): Bytes processed
+            **extra: Additional counters to accumulate, e.g. audio_seconds
+        """
+        self.rows += int(rows or 0)
+        self.bytes += int(bytes or 0)
+        for key, value in extra.items():
+            self.extra[key] = self.extra.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "calls": self.calls,
+            "seconds": round(self.seconds, 6),
+            "rows": self.rows,
+            "rows_per_second": round(self.rows / self.seconds, 3) if self.seconds > 0 else None,
+            "bytes": self.bytes,
+            "mb_per_second": round(self.bytes / 2**20 / self.seconds, 3) if self.seconds > 0 else None,
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            **self.extra
+        }
+
+
+class RunReport:
+    """
+    Per-stage timing, throughput and memory of one ETL run (or Airflow task).
+
+    Args:
+        name (str): Report name, e.g. 'etl' or the Airflow task id
+        run_id (str): Run identifier (a timestamp-based id if None)
+        sample_interval (float): Seconds between RSS samples while a stage is active
+    """
+
+    def __init__(self, name: str = "etl", run_id: Optional[str] = None, sample_interval: float = 0.05):
+        self.name = name
+        self.run_id = run_id or f"{datetime.datetime.now():%Y%m%dT%H%M%S}_{uuid.uuid4().hex[:6]}"
+        self.sample_interval = sample_interval
+        self.started_at = datetime.datetime.now()
+        self.stages: Dict[str, StageStats] = {}
+        self.frames: Dict[str, Dict[str, object]] = {}
+        self._active: Dict[int, StageStats] = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def _get(self, name: str) -> StageStats:
+        if name not in self.stages:
+            self.stages[name] = StageStats(name)
+        return self.stages[name]
+
+    def _sample(self):
+        while True:
+            rss = current_rss()
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+                for stats in self._active.values():
+                    stats.peak_rss = max(stats.peak_rss, rss)
+            time.sleep(self.sample_interval)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0, bytes: int = 0):
+        """
+        Time a block as (part of) a stage.
+
+        Args:
+            name (str): Stage name; repeated blocks with the same name accumulate
+            rows (int): Rows processed, if known up front
+            bytes (int): Bytes processed, if known up front
+
+        Yields:
+            StageStats: Call add() on it to count rows/bytes found inside the block
+        """
+        token = object()
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.peak_rss = max(stats.peak_rss, current_rss())
+            self._active[id(token)] = stats
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+                self._sampler.start()
+        stats.add(rows, bytes)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - start
+            rss = current_rss()
+            with self._lock:
+                stats.seconds += elapsed
+                stats.peak_rss = max(stats.peak_rss, rss)
+                del self._active[id(token)]
+
+    def record(self, name: str, seconds: float, rows: int = 0, bytes: int = 0,
+               peak_rss: Optional[int] = None, **extra) -> StageStats:
+        """
+        Add a stage measured elsewhere (e.g. per-enricher time inside a fused pass).
+
+        Args:
+            name (str): Stage name
+            seconds (float): Wall time
+            rows (int): Rows processed
+            bytes (int): Bytes processed
+            peak_rss (int): Peak RSS in bytes (current RSS if None)
+            **extra: Additional counters
+
+        Returns:
+            StageStats: The updated stage
+        """
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.peak_rss = max(stats.peak_rss, peak_rss if peak_rss is not None else current_rss())
+        stats.add(rows, bytes, **extra)
+        return stats
+
+    def frame(self, name: str, df) -> Dict[str, object]:
+        """
+        Record the memory layout of the frame a stage produced.
+
+        Args:
+            name (str): Stage name
+            df (pd.DataFrame): Frame handed to the next stage
+
+        Returns:
+            Dict[str, object]: rows, total bytes and per-column dtype/bytes
+        """
+        columns = memory_by_column(df)
+        layout = {
+            "rows": len(df),
+            "bytes": sum(column["bytes"] for column in columns.values()),
+            "columns": columns
+        }
+        with self._lock:
+            self.frames[name] = layout
+        return layout
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        JSON-serializable report.
+
+        Returns:
+            Dict[str, object]: Run metadata, process peak RSS, per-stage stats
+            and the recorded frame layouts
+        """
+        return {
+            "name": self.name,
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.datetime.now().isoformat(),
+            "process_peak_rss_mb": round(process_peak_rss() / 2**20, 1),
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "frames": self.frames
+        }
+
+    def save(self, directory: str) -> str:
+        """
+        Write the report as JSON.
+
+        Args:
+            directory (str): Output directory (created if missing)
+
+        Returns:
+            str: Path of the written report
+        """
+        os.makedirs(directory, exist_ok=True)
+        safe_run_id = re.sub(r"[^A-Za-z0-9_.-]", "_", self.run_id)
+        path = os.path.join(directory, f"{safe_run_id}_{self.name}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"✓ Run report saved to {path}")
+        return path
+
+    def print_summary(self):
+        print(f"📊 {self.name} run {self.run_id}")
+        print(f"   {'stage':<16} {'seconds':>9} {'rows':>8} {'rows/s':>10} {'MB':>9} {'peak RSS MB':>12}")
+        for name, stats in self.stages.items():
+            rate = f"{stats.rows / stats.seconds:>10.1f}" if stats.seconds > 0 else f"{'-':>10}"
+            print(f"   {name:<16} {stats.seconds:>9.3f} {stats.rows:>8} {rate} "
+                  f"{stats.bytes / 2**20:>9.2f} {stats.peak_rss / 2**20:>12.1f}")
+        for name, layout in self.frames.items():
+            print(f"   frame after {name}: {layout['rows']} rows, {layout['bytes'] / 2**20:.2f} MB")
@@ -0,0 +1,216 @@
+"""
+Speech-to-Text Backends
+
+The ETL transcribes through an STTBackend instead of calling Whisper
+directly, so the engine and model size are configuration:
+
+- 'whisper': openai-whisper on PyTorch (fp32 on CPU), the original setup
+- 'faster-whisper': the same Whisper models on CTranslate2 with int8
+  weights on CPU, several times the throughput per core; one loaded model
+  serves concurrent requests (num_workers), so the segment workers share it
+
+Backends take mono float32 samples at 16 kHz (the audio store's rate) and
+return the text. Select with STT_BACKEND, STT_MODEL_SIZE and, for
+faster-whisper, STT_COMPUTE_TYPE; compare them on local audio with
+benchmarks/stt_compare.py.
+"""
+
+import os
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+DEFAULT_BACKEND = os.getenv("STT_BACKEND", "whisper")
+DEFAULT_MODEL_SIZE = os.getenv("STT_MODEL_SIZE", "base")
+DEFAULT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+
+
+class STTBackend:
+    """
+    Base class for speech-to-text engines.
+
+    Subclasses load their model in load() and implement transcribe().
+    Backends whose loaded model can run several transcriptions at once set
+    `thread_safe`, so callers can share one instance between threads.
+
+    Args:
+        model_size (str): Model name, e.g. 'tiny', 'base', 'small', 'medium'
+        workers (int): Concurrent transcriptions the instance should serve
+        language (str): Spoken language code, or None to detect it
+    """
+    name: str = 'stt'
+    thread_safe: bool = False
+
+    def __init__(self, model_size: str = DEFAULT_MODEL_SIZE, workers: int = 1, language: Optional[str] = None):
+        self.model_size = model_size
+        self.workers = max(1, workers)
+        self.language = language
+        self.model = None
+
+    def load(self) -> "STTBackend":
+        """Load the model (idempotent); returns the backend."""
+        if self.model is None:
+            self.model = self._load()
+        return self
+
+    def _load(self):
+        raise NotImplementedError
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        """
+        Transcribe one clip.
+
+        Args:
+            samples (np.ndarray): Mono float32 samples at 16 kHz
+
+        Returns:
+            str: Transcribed text
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, clips: List[np.ndarray]) -> List[str]:
+        """
+        Transcribe several clips, in order.
+
+        Args:
+            clips (List[np.ndarray]): Mono float32 samples at 16 kHz
+
+        Returns:
+            List[str]: One text per clip
+        """
+        return [self.transcribe(clip) for clip in clips]
+
+    def describe(self) -> Dict[str, object]:
+        return {"backend": self.name, "model_size": self.model_size}
+
+
+class WhisperBackend(STTBackend):
+    """
+    openai-whisper on PyTorch (fp16 only on GPU).
+
+    Not thread-safe: each worker loads its own model. With several workers,
+    PyTorch's intra-op threads are split between them (cpu_count // workers)
+    so the models do not oversubscribe the cores.
+    """
+    name = 'whisper'
+
+    def __init__(self, model_size: str = DEFAULT_MODEL_SIZE, workers: int = 1,
+                 language: Optional[str] = None, device: Optional[str] = None):
+        super().__init__(model_size, workers, language)
+        self.device = device
+
+    def _load(self):
+        import whisper
+        if self.workers > 1:
+            import torch
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.workers))
+        return whisper.load_model(self.model_size, device=self.device)
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        self.load()
+        fp16 = str(self.model.device).startswith("cuda")
+        result = self.model.transcribe(np.asarray(samples, dtype=np.float32), fp16=fp16, language=self.language)
+        return result["text"]
+
+
+class FasterWhisperBackend(STTBackend):
+    """
+    Whisper on CTranslate2 (faster-whisper), int8 on CPU by default.
+
+    Args:
+        compute_type (str): 'int8', 'int8_float32', 'float32', ... (see CTranslate2)
+        cpu_threads (int): Threads per transcription (0: CTranslate2 default)
+        batch_size (int): Chunks of a long clip decoded together with the
+            batched pipeline (1 disables batching)
+        beam_size (int): Beam width (Whisper's default is 5; 1 is greedy and fastest)
+    """
+    name = 'faster-whisper'
+    thread_safe = True
+
+    def __init__(self, model_size: str = DEFAULT_MODEL_SIZE, workers: int = 1, language: Optional[str] = None,
+                 compute_type: str = DEFAULT_COMPUTE_TYPE, cpu_threads: int = 0, batch_size: int = 1,
+                 beam_size: int = 5, device: str = "cpu"):
+        super().__init__(model_size, workers, language)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.batch_size = batch_size
+        self.beam_size = beam_size
+        self.device = device
+        self._batched = None
+
+    def _load(self):
+        from faster_whisper import WhisperModel
+        model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type,
+                             cpu_threads=self.cpu_threads, num_workers=self.workers)
+        if self.batch_size > 1:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self._batched = BatchedInferencePipeline(model=model)
+            except ImportError:
+                print("Warning: this faster-whisper version has no batched pipeline; batch_size ignored")
+        return model
+
+    def transcribe(self, samples: np.ndarray) -> str:
+        self.load()
+        audio = np.asarray(samples, dtype=np.float32)
+        if self._batched is not None:
+            segments, _ = self._batched.transcribe(audio, language=self.language, beam_size=self.beam_size,
+                                                   batch_size=self.batch_size)
+        else:
+            segments, _ = self.model.transcribe(audio, language=self.language, beam_size=self.beam_size)
+        # segments is a lazy generator: decoding happens while it is consumed
+        return "".join(segment.text for segment in segments).strip()
+
+    def describe(self) -> Dict[str, object]:
+        return {**super().describe(), "compute_type": self.compute_type, "batch_size": self.batch_size,
+                "beam_size": self.beam_size}
+
+
+BACKENDS: Dict[str, Type[STTBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, model_size: Optional[str] = None, **kwargs) -> STTBackend:
+    """
+    Instantiate a backend by name (not loaded yet).
+
+    Args:
+        name (str): Key of BACKENDS (STT_BACKEND if None)
+        model_size (str): Model size (STT_MODEL_SIZE if None)
+        **kwargs: Backend options, e.g. workers, compute_type, batch_size
+
+    Returns:
+        STTBackend: The backend
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. Available: {sorted(BACKENDS)}")
+    return BACKENDS[name](model_size or DEFAULT_MODEL_SIZE, **kwargs)
+
+
+def load_transcribers(workers: int = 1, name: Optional[str] = None, model_size: Optional[str] = None,
+                      **kwargs) -> List:
+    """
+    One transcribe callable per concurrent worker.
+
+    Thread-safe backends load one model serving all workers; others load a
+    model per worker (each told the worker count, to share the cores).
+
+    Args:
+        workers (int): Concurrent transcriptions
+        name (str): Backend name (STT_BACKEND if None)
+        model_size (str): Model size (STT_MODEL_SIZE if None)
+        **kwargs: Backend options
+
+    Returns:
+        List[Callable]: `workers` callables mapping samples to text
+    """
+    workers = max(1, workers)
+    backend = create_backend(name, model_size, workers=workers, **kwargs).load()
+    if backend.thread_safe:
+        return [backend.transcribe] * workers
+    backends = [backend] + [create_backend(name, model_size, workers=workers, **kwargs).load()
+                            for _ in range(workers - 1)]
+    return [each.transcribe for each in backends]
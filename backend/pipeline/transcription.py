@@ -0,0 +1,204 @@
+"""
+Segmented Transcription
+
+Splits long audio at silences into segments of at most `segment_seconds`,
+transcribes the segments in parallel threads (one model instance per
+thread) and stitches the texts back in order, so one long YouTube video no
+longer occupies a worker for the whole track. Silence is found with a
+frame-energy detector: frames whose RMS is more than `silence_db` below the
+loudest frame are silent, and segments start and end at silent runs of at
+least `min_silence_ms`. Speech with no usable pause is cut hard at the
+segment limit, and silent stretches between segments are not transcribed.
+
+Optionally only the first `max_seconds` of a video are transcribed; the
+enrichment stage only needs enough text for sentiment and demographics.
+
+A transcriber is any callable mapping float32 samples at the audio store's
+sample rate to text, e.g. a Whisper model's transcribe wrapped to return
+result["text"].
+"""
+
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pipeline.stt import BACKENDS, DEFAULT_BACKEND
+
+SEGMENT_SECONDS = float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "30"))
+MAX_SECONDS = float(os.getenv("TRANSCRIBE_MAX_SECONDS", "0")) or None
+# Segments in flight per video. A backend that is not thread-safe ('whisper')
+# loads one model per worker, each costing its full memory (~0.5 GB for
+# 'base', ~2 GB for 'small', ~5 GB for 'medium' on CPU) and sharing the cores,
+# so it defaults to 1; a thread-safe one ('faster-whisper') shares one model
+_SHARED_MODEL = getattr(BACKENDS.get(DEFAULT_BACKEND), "thread_safe", False)
+WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", str(min(4, os.cpu_count() or 1) if _SHARED_MODEL else 1)))
+
+
+@dataclass
+class TranscriptionResult:
+    """Stitched text of one audio track and what was transcribed."""
+    text: str
+    segments: int
+    transcribed_seconds: float
+    total_seconds: float
+
+
+def frame_energy(samples: np.ndarray, sample_rate: int, frame_ms: float = 30.0) -> Tuple[np.ndarray, int]:
+    """
+    RMS of consecutive non-overlapping frames.
+
+    Args:
+        samples (np.ndarray): Mono samples
+        sample_rate (int): Sample rate
+        frame_ms (float): Frame length in milliseconds
+
+    Returns:
+        Tuple[np.ndarray, int]: Per-frame RMS and the frame length in samples
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(samples) // frame
+    frames = np.asarray(samples[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    if len(samples) > n_frames * frame:
+        tail = np.asarray(samples[n_frames * frame:], dtype=np.float32)
+        rms = np.append(rms, np.sqrt(np.mean(np.square(tail))))
+    return rms, frame
+
+
+def split_on_silence(samples: np.ndarray, sample_rate: int, segment_seconds: float = SEGMENT_SECONDS,
+                     min_silence_ms: float = 300.0, silence_db: float = 35.0,
+                     frame_ms: float = 30.0) -> List[Tuple[int, int]]:
+    """
+    Cut audio into segments no longer than `segment_seconds`, at silences where possible.
+
+    Args:
+        samples (np.ndarray): Mono samples
+        sample_rate (int): Sample rate
+        segment_seconds (float): Maximum segment length
+        min_silence_ms (float): Shortest pause used as a cut point
+        silence_db (float): Frames this many dB below the loudest frame are silent
+        frame_ms (float): Energy frame length
+
+    Returns:
+        List[Tuple[int, int]]: (start, stop) sample offsets in order, skipping silent stretches
+    """
+    if len(samples) == 0:
+        return []
+    rms, frame = frame_energy(samples, sample_rate, frame_ms)
+    peak = float(rms.max())
+    if peak <= 0:
+        return []
+    silent = rms < peak * 10 ** (-silence_db / 20)
+
+    # Silent runs (in frames) long enough to cut at
+    edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+    run_starts, run_stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    min_run = max(1, int(min_silence_ms / frame_ms))
+    runs = [(a, b) for a, b in zip(run_starts, run_stops) if b - a >= min_run]
+
+    # Voiced regions between the runs
+    regions, position = [], 0
+    for a, b in runs:
+        if a > position:
+            regions.append((position, a))
+        position = b
+    if position < len(rms):
+        regions.append((position, len(rms)))
+
+    # Pack consecutive regions into segments, hard-splitting regions longer than the limit
+    max_frames = max(1, int(segment_seconds * 1000 / frame_ms))
+    segments: List[Tuple[int, int]] = []
+    current: Optional[List[int]] = None
+    for a, b in regions:
+        while b - a > max_frames:
+            if current is not None:
+                segments.append(tuple(current))
+                current = None
+            segments.append((a, a + max_frames))
+            a += max_frames
+        if current is not None and b - current[0] <= max_frames:
+            current[1] = b
+        else:
+            if current is not None:
+                segments.append(tuple(current))
+            current = [a, b]
+    if current is not None:
+        segments.append(tuple(current))
+
+    return [(a * frame, min(b * frame, len(samples))) for a, b in segments]
+
+
+class SegmentTranscriber:
+    """
+    Transcribes tracks in silence-split segments across a pool of transcribers.
+
+    Each transcriber (e.g. one loaded Whisper model) handles one segment at a
+    time, since a model's decoding state is not safe to share between
+    threads; the number of transcribers is the number of segments in flight.
+
+    Args:
+        transcribers (Sequence[Callable]): Callables mapping samples to text
+        segment_seconds (float): Maximum segment length; shorter tracks are
+            transcribed in one call
+        max_seconds (float): Only transcribe this much of each track (all if None)
+    """
+
+    def __init__(self, transcribers: Sequence[Callable[[np.ndarray], str]],
+                 segment_seconds: float = SEGMENT_SECONDS, max_seconds: Optional[float] = MAX_SECONDS):
+        if not transcribers:
+            raise ValueError("at least one transcriber is required")
+        self.workers = len(transcribers)
+        self.segment_seconds = segment_seconds
+        self.max_seconds = max_seconds
+        self._idle = queue.Queue()
+        for transcriber in transcribers:
+            self._idle.put(transcriber)
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="transcribe") if self.workers > 1 else None
+
+    def _transcribe_piece(self, piece: np.ndarray) -> str:
+        transcriber = self._idle.get()
+        try:
+            return transcriber(piece)
+        finally:
+            self._idle.put(transcriber)
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> TranscriptionResult:
+        """
+        Transcribe one track.
+
+        Args:
+            samples (np.ndarray): Mono float32 samples (e.g. from the audio store)
+            sample_rate (int): Sample rate of `samples`
+
+        Returns:
+            TranscriptionResult: Texts of the segments joined in order, segment count and durations
+        """
+        total_seconds = len(samples) / sample_rate
+        if self.max_seconds:
+            samples = samples[:int(self.max_seconds * sample_rate)]
+
+        if len(samples) <= self.segment_seconds * sample_rate:
+            spans = [(0, len(samples))] if len(samples) else []
+        else:
+            spans = split_on_silence(samples, sample_rate, self.segment_seconds)
+
+        pieces = [samples[start:stop] for start, stop in spans]
+        if self._pool is None or len(pieces) <= 1:
+            texts = [self._transcribe_piece(piece) for piece in pieces]
+        else:
+            texts = list(self._pool.map(self._transcribe_piece, pieces))
+
+        return TranscriptionResult(
+            text=" ".join(text.strip() for text in texts if text and text.strip()),
+            segments=len(pieces),
+            transcribed_seconds=sum(len(piece) for piece in pieces) / sample_rate,
+            total_seconds=total_seconds
+        )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
@@ -0,0 +1,180 @@
+"""
+YouTube Video Fetcher
+
+Resolves a video's metadata and downloads its audio with a single
+extract_info(download=True) call on one long-lived YoutubeDL session,
+instead of one session to read the metadata and a second to download.
+
+Per-video results are cached as small JSON files: metadata (duration,
+title, ...) for `ttl` seconds, and dead videos (removed, private,
+unavailable) as negative entries for `negative_ttl` seconds so they are not
+retried every run. Re-runs over known videos whose audio is already on
+disk make no network requests. Transient failures (timeouts,
+throttling, server and network errors) are not cached.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+METADATA_CACHE_DIR = "pipeline/cache/video_metadata"
+METADATA_TTL = float(os.getenv("VIDEO_METADATA_TTL_DAYS", "30")) * 86400
+NEGATIVE_TTL = float(os.getenv("VIDEO_NEGATIVE_TTL_DAYS", "7")) * 86400
+CACHE_VERSION = 1
+
+# Fields of the yt-dlp info dict worth keeping
+METADATA_FIELDS = ("id", "title", "duration", "channel", "uploader", "upload_date",
+                   "view_count", "like_count", "comment_count", "ext", "abr", "asr")
+
+# yt-dlp's messages for videos that will not come back on retry
+_PERMANENT_ERROR = re.compile(
+    r"video unavailable|private video|this video has been removed|this video is no longer available|"
+    r"account .{0,80}terminated|video does not exist|copyright (claim|grounds)|members-only|"
+    r"join this channel to get access|sign in to confirm your age", re.IGNORECASE)
+# Server, throttling and network errors, never cached even if the message
+# also matches _PERMANENT_ERROR
+_TRANSIENT_ERROR = re.compile(
+    r"HTTP Error (5\d\d|429)|too many requests|timed? ?out|connection|temporary failure|"
+    r"name resolution|network is unreachable|incomplete read|ssl", re.IGNORECASE)
+
+
+def is_permanent_error(message: str) -> bool:
+    """Whether a yt-dlp error message means the video is gone for good."""
+    return bool(_PERMANENT_ERROR.search(message)) and not _TRANSIENT_ERROR.search(message)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one video."""
+    video_id: str
+    info: Optional[Dict]
+    audio_path: Optional[str]
+    cached: bool
+    downloaded_bytes: int = 0
+    error: Optional[str] = None
+
+
+class VideoFetcher:
+    """
+    Metadata and audio for YouTube videos, one request per uncached video.
+
+    Args:
+        audio_dir (str): Directory of downloaded audio ({video_id}.m4a)
+        cache_dir (str): Directory of the per-video metadata cache
+        ttl (float): Seconds metadata stays fresh
+        negative_ttl (float): Seconds a dead video is skipped
+        ydl_options (Dict): Extra YoutubeDL options
+    """
+
+    def __init__(self, audio_dir: str, cache_dir: str = METADATA_CACHE_DIR, ttl: float = METADATA_TTL,
+                 negative_ttl: float = NEGATIVE_TTL, ydl_options: Optional[Dict] = None):
+        self.audio_dir = audio_dir
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.options = {
+            "format": "bestaudio/best",
+            "noplaylist": True,
+            "quiet": True,
+            "outtmpl": os.path.join(audio_dir, "%(id)s.m4a"),
+            **(ydl_options or {})
+        }
+        self.stats = {"cache_hits": 0, "negative_hits": 0, "requests": 0, "downloads": 0, "errors": 0}
+        self._ydl = None
+        self._lock = threading.Lock()
+
+    def audio_path(self, video_id: str) -> str:
+        return os.path.join(self.audio_dir, f"{video_id}.m4a")
+
+    def _cache_path(self, video_id: str) -> str:
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", str(video_id))
+        return os.path.join(self.cache_dir, f"{safe_id}.json")
+
+    def cached(self, video_id: str) -> Optional[Dict]:
+        """
+        The fresh cache entry of a video, if any.
+
+        Returns:
+            Dict: {'ok', 'fetched_at', 'info' | 'error'} or None when missing or expired
+        """
+        try:
+            with open(self._cache_path(video_id)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        ttl = self.ttl if entry.get("ok") else self.negative_ttl
+        return entry if time.time() - entry.get("fetched_at", 0) < ttl else None
+
+    def _store(self, video_id: str, entry: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(video_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "fetched_at": time.time(), **entry}, f)
+        os.replace(tmp_path, path)
+
+    def _session(self):
+        # One YoutubeDL for the whole run: extractors and the HTTP session are reused
+        if self._ydl is None:
+            import yt_dlp
+            self._ydl = yt_dlp.YoutubeDL(self.options)
+        return self._ydl
+
+    def fetch(self, video_id: str, url: str) -> FetchResult:
+        """
+        Metadata and local audio path of a video, downloading only what is missing.
+
+        Args:
+            video_id (str): Video id (names the audio and cache files)
+            url (str): Video URL
+
+        Returns:
+            FetchResult: info is None for dead or unreachable videos
+        """
+        audio_path = self.audio_path(video_id)
+        have_audio = os.path.exists(audio_path)
+        entry = self.cached(video_id)
+        if entry is not None:
+            if not entry["ok"]:
+                self.stats["negative_hits"] += 1
+                return FetchResult(video_id, None, None, cached=True, error=entry.get("error"))
+            if have_audio:
+                self.stats["cache_hits"] += 1
+                return FetchResult(video_id, entry["info"], audio_path, cached=True)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            try:
+                info = self._session().extract_info(url, download=not have_audio)
+            except Exception as e:
+                message = str(e)
+                self.stats["errors"] += 1
+                if is_permanent_error(message):
+                    self._store(video_id, {"ok": False, "error": message[:500]})
+                return FetchResult(video_id, None, None, cached=False, error=message)
+
+        downloaded_bytes = 0
+        if not have_audio:
+            # outtmpl names the file by the extractor's id; keep the pipeline's {video_id}.m4a naming
+            downloaded = self.audio_path(info.get("id", video_id))
+            if downloaded != audio_path and os.path.exists(downloaded):
+                os.replace(downloaded, audio_path)
+            if os.path.exists(audio_path):
+                downloaded_bytes = os.path.getsize(audio_path)
+                self.stats["downloads"] += 1
+
+        metadata = {field: info.get(field) for field in METADATA_FIELDS if info.get(field) is not None}
+        self._store(video_id, {"ok": True, "info": metadata})
+        return FetchResult(video_id, metadata, audio_path if os.path.exists(audio_path) else None,
+                           cached=False, downloaded_bytes=downloaded_bytes)
+
+    def close(self):
+        if self._ydl is not None:
+            self._ydl.close()
+            self._ydl = None